@@ -5,16 +5,23 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import Depends, FastAPI
 from fastapi.security import HTTPBearer
 
-from app.api.middleware import authenticate_request, firebase_app, init_firebase
+from app.api.middleware import authenticate_request, init_firebase, token_verifier
 from app.api.routes import (
     auth_route,
     category_router,
     listings_router,
     profile_router,
+    system_router,
     users_route,
 )
 from app.api.routes.listings import user_alerts
+from app.core.config import config
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import metrics_endpoint, record_request_metrics
+from app.core.profiling import RequestProfiler
+from app.db.database import async_session
 from app.schedulers.run_user_searches import notify_user_search_alerts
+from app.services.category.category_registry import category_registry
 
 security = HTTPBearer()
 sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
@@ -26,7 +33,7 @@ async def connect(sid, environ, auth):
     if not token:
         return False  # odmietne pripojenie
     try:
-        user = auth.verify_id_token(token, firebase_app)
+        user = await token_verifier.verify(token)
     except:
         return False
 
@@ -50,6 +57,10 @@ async def disconnect(sid):
 async def lifespan(app: FastAPI):
     # Perform startup tasks
     init_firebase()
+    # categories are validated in memory, load them before the first request
+    async with async_session() as session:
+        await category_registry.load(session)
+
     scheduler = AsyncIOScheduler()
     # scheduler.add_job(notify_user_search_alerts, "interval", seconds=10)
     scheduler.add_job(notify_user_search_alerts, "interval", minutes=2)
@@ -57,12 +68,21 @@ async def lifespan(app: FastAPI):
     scheduler.start()
     app.state.scheduler = scheduler  # Store the scheduler in app state for access
 
+    loop_monitor = None
+    if config.loop_lag_monitor:
+        loop_monitor = LoopLagMonitor(
+            interval=config.loop_lag_interval, threshold=config.loop_lag_threshold
+        )
+        loop_monitor.start()
+
     # TESTING
     # asyncio.create_task(notify_user_search_alerts())
     yield
 
     # Cleanup
     scheduler.shutdown()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
 
 
 app = FastAPI(dependencies=[Depends(security)], lifespan=lifespan)
@@ -73,4 +93,14 @@ app.include_router(listings_router)
 app.include_router(profile_router)
 app.include_router(user_alerts.router)
 app.include_router(category_router)
+app.include_router(system_router)
+if config.profiling_allowed_emails:
+    # added before the authentication, so it runs after it and knows the user
+    app.middleware("http")(
+        RequestProfiler(config.profiling_allowed_emails, config.profiling_dir)
+    )
 app.middleware("http")(authenticate_request)
+# added last, so it runs first and times the authentication as well
+app.middleware("http")(record_request_metrics)
+# Prometheus scrape endpoint, outside of the API schema and authentication
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
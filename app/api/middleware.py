@@ -2,25 +2,29 @@ import os
 
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from firebase_admin import _apps, auth, credentials, initialize_app
 
-firebase_app = None
+from app.api.token_verifier import TokenVerifier
+from app.core.metrics import time_external_call
+from app.providers import providers
 
 
 def init_firebase():
-    global firebase_app
-    if not _apps:
-        cred = credentials.Certificate("./mtaa-project-service-account.json")
-        firebase_app = initialize_app(
-            cred,
-            # https://firebase.google.com/docs/storage/admin/start
-            {"storageBucket": "mtaa-project-5235a.firebasestorage.app"},
-            # {"storageBucket": "mtaa-project-5235a.appspot.com"}   # ⬅ správne
-        )
+    providers.initialize()
+
+
+def verify_firebase_token(token: str) -> dict:
+    with time_external_call("auth", "verify_id_token"):
+        return providers.auth.verify_id_token(token)
+
+
+token_verifier = TokenVerifier(verify_firebase_token)
 
 
 async def authenticate_request(request: Request, call_next):
-    if request.url.path.startswith(("/docs", "/openapi.json", "/redoc")):
+    # the scrape endpoint only, not every path starting with /metrics
+    if request.url.path == "/metrics" or request.url.path.startswith(
+        ("/docs", "/openapi.json", "/redoc")
+    ):
         return await call_next(request)
 
     auth_header = request.headers.get("Authorization")
@@ -42,7 +46,7 @@ async def authenticate_request(request: Request, call_next):
             request.state.user = {"email": "test@example.com"}
             return await call_next(request)
 
-        user = auth.verify_id_token(token, firebase_app)
+        user = await token_verifier.verify(token)
         request.state.user = user
         return await call_next(request)
     except Exception as e:
@@ -1,3 +1,4 @@
 from .categories_route import router as category_router
 from .listings import router as listings_router
 from .profile_route import router as profile_router
+from .system_route import router as system_router
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from sqlmodel import select
 
 from app.api.dependencies import get_async_session
 from app.models.category_model import Category
+from app.services.category.category_registry import category_registry
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
-@router.get("/", response_model=list[Category])
+@router.get(
+    "/",
+    response_model=list[Category],
+    description="Served from the in-memory category registry. "
+    "Send the returned ETag in If-None-Match to get 304 Not Modified when nothing changed.",
+)
 async def get_categories(
     *,
+    request: Request,
     session: AsyncSession = Depends(get_async_session),
 ):
-    response = await session.execute(select(Category))
-    return response.scalars().all()
+    body, etag = await category_registry.get_body(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,13 +1,11 @@
 from datetime import UTC, datetime, timedelta
-from typing import Annotated, List, Tuple
+from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic_extra_types.coordinate import Latitude, Longitude
-from sqlalchemy import null
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import func
-from sqlmodel import asc, desc, select
+from sqlmodel import select
 
 from app.api.dependencies import get_async_session
 from app.models.address_model import Address
@@ -26,7 +24,16 @@ from app.schemas.listing_schema import (
     ListingQueryParameters,
     SellerInfoCard,
 )
+from app.services.category.category_registry import category_registry
+from app.services.category.exceptions import CategoryNotFound
+from app.services.listing.exceptions import InvalidCursor
 from app.services.listing.listing_service import ListingService
+from app.services.listing.pagination import (
+    NULLABLE_SORT_KEYS,
+    decode_cursor,
+    encode_cursor,
+    get_keyset_condition,
+)
 from app.services.user.user_service import UserService
 
 router = APIRouter()
@@ -48,9 +55,7 @@ async def create_listing(
     user_latitude: Latitude | None = None,
     user_longitude: Longitude | None = None,
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_user()
 
     # check that listing status is not removed or sold
     if new_listing_data.listing_status != ListingStatus.ACTIVE:
@@ -76,14 +81,17 @@ async def create_listing(
     # check that categories exist and collect them
     category_objs = []
     if new_listing_data.category_ids is not None:
-        for category_id in new_listing_data.category_ids:
-            category = await session.get(Category, category_id)
-            if not category:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category with ID {category_id} not found.",
-                )
-            category_objs.append(category)
+        try:
+            await category_registry.validate_ids(session, new_listing_data.category_ids)
+        except CategoryNotFound as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
+        result = await session.execute(
+            select(Category).where(Category.id.in_(new_listing_data.category_ids))
+        )
+        category_objs = result.scalars().all()
     # create listing instance
     listing = Listing(
         title=new_listing_data.title,
@@ -129,7 +137,7 @@ async def create_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=False,
         seller=SellerInfoCard(
             id=current_user.id,
             firstname=current_user.firstname,
@@ -170,75 +178,20 @@ async def get_my_listings(
     - `page`: 1-based page index
     - `limit`: number of items per page
     """
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
+    # TODO: make up mind on what to do with listing status. Might filter out sold listings as well
+    # return only posted listings that are not removed
     stmt = (
-        select(Listing)
+        listing_service.get_card_query(current_user.id)
         .where(Listing.seller_id == current_user.id)
         .where(Listing.listing_status != ListingStatus.REMOVED)
-        .options(
-            selectinload(Listing.address),
-            selectinload(Listing.categories),
-            selectinload(Listing.seller),
-            selectinload(Listing.images),
-        )
+        .order_by(Listing.id)
         .offset((page - 1) * limit)
         .limit(limit)
     )
     result = await session.execute(stmt)
-    listings: list[Listing] = result.scalars().all()
-
-    response: list[ListingCardProfile] = []
-    for listing in listings:
-        presigned = listing_service.get_presigned_urls(listing.images)
-        data = listing.model_dump(
-            exclude_none=True,
-            exclude={"address_id", "seller_id", "updated_at", "created_at"},
-        )
-        # choose the first image or empty
-        data.setdefault("image_path", presigned[0] if presigned else "")
-        card = ListingCardProfile.model_validate(data)
-        # shorten description for the card
-        response.append(card)
-
-    return response
-
-    # TODO: make up mind on what to do with listing status. Might filter out sold listings as well
-    # return only posted listings that are not removed
-    result = await session.execute(
-        select(Listing)
-        .where(Listing.seller_id == current_user.id)
-        .where(Listing.listing_status != ListingStatus.REMOVED)
-        .options(
-            selectinload(Listing.address),
-            selectinload(Listing.categories),
-            selectinload(Listing.seller),
-            selectinload(Listing.images),
-        )
-    )
-
-    listings: list[Listing] = result.scalars().all()
-    listing_result: list[ListingCardProfile] = []
-    for listing in listings:
-        presigned_urls = listing_service.get_presigned_urls(listing.images)
-        listing_data = listing.model_dump(
-            exclude_none=True,
-            exclude={
-                "address_id",
-                "seller_id",
-                "updated_at",
-                "created_at",
-            },  # exclude these fields because they are forbidden in pydantic model
-        )
-        # set title image
-        main_image = presigned_urls[0] if len(presigned_urls) > 0 else ""
-        listing_data.setdefault("image_path", main_image)
-        # listing_data.setdefault("address", listing.address)
-
-        listing_card = ListingCardProfile.model_validate(listing_data)
-        listing_card.description = listing_card.description[:15] + "..."
-        listing_result.append(listing_card)
 
-    return listing_result
+    return [listing_service.build_card_profile(row) for row in result.all()]
 
 
 # TESTED for using limit, offset, offer_types, listing_status
@@ -246,32 +199,28 @@ async def get_my_listings(
     "/",
     response_model=List[ListingCardDetails],
     summary="Filter and list listings",
-    description="Retrieve listings by categories, price range, offer type, .... Listings with status REMOVED are excluded.",
+    description="Retrieve listings by categories, price range, offer type, .... Listings with status REMOVED are excluded. "
+    "When more results are available, the X-Next-Cursor response header contains a cursor for the next page.",
 )
 async def get_listings_by_params(
     *,
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
     params: Annotated[ListingQueryParameters, Depends()],
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
-
-    print("#" * 40)
-    print(params.model_dump(exclude_none=True))
-    print("#" * 40)
+    current_user = await user_service.get_current_identity()
 
     # check that categories exists
     if params.category_ids is not None:
-        for category_id in params.category_ids:
-            category = await session.get(Category, category_id)
-            if not category:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category with ID {category_id} not found.",
-                )
+        try:
+            await category_registry.validate_ids(session, params.category_ids)
+        except CategoryNotFound as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
 
     # LISTING STATUS FROM FRONTEND CANNOT BE REMOVED
     # if params.listing_status == ListingStatus.REMOVED:
@@ -287,10 +236,17 @@ async def get_listings_by_params(
         "price",
         "rating",
         "location",
+        "relevance",
     ]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid sort_by parameter. Allowed values are: created_at, updated_at, price, rating, location.",
+            detail="Invalid sort_by parameter. Allowed values are: created_at, updated_at, price, rating, location, relevance.",
+        )
+
+    if params.sort_by == "relevance" and params.search is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sorting by relevance requires the search parameter.",
         )
 
     # check that user coordinates are provided if max_distance is set or sorting by location
@@ -302,148 +258,67 @@ async def get_listings_by_params(
             detail="Both user latitude and longitude must be provided for location-based filtering.",
         )
 
-    # Get the rating subquery from user_service
-    rating_subquery = user_service.get_seller_rating_subquery()
-    rating_val = func.coalesce(rating_subquery.c.avg_rating, 0).label("seller_rating")
-
-    # build query
-    query = (
-        select(Listing, rating_val)
-        .outerjoin(
-            rating_subquery,
-            rating_subquery.c.seller_id == Listing.seller_id,
+    if (params.user_latitude is None) != (params.user_longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Both user latitude and longitude must be provided for location-based filtering.",
         )
-        .options(
-            selectinload(Listing.seller),
-            selectinload(Listing.categories),
-            selectinload(Listing.address),
-            selectinload(Listing.images),
+
+    if params.sort_order not in ("asc", "desc"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sort_order parameter. Allowed values are: asc, desc.",
         )
-        .where(
-            Listing.listing_status.in_([ListingStatus.ACTIVE, ListingStatus.RENTED]),
-        )  # only available and possibly available listings
+
+    query, sort_expr = listing_service.get_search_query(current_user.id, params)
+    coordinates = (
+        (params.user_latitude, params.user_longitude)
+        if params.user_latitude is not None
+        else None
     )
 
-    # Filtering:
-    if params.category_ids is not None:
-        query = query.where(
-            Listing.categories.any(Category.id.in_(params.category_ids))
-        )
-    if params.offer_type is not None:
-        query = query.where(Listing.offer_type == params.offer_type)
-    if params.sale_min is not None:
-        query = query.where(Listing.price >= params.sale_min)
-    if params.sale_max is not None and params.sale_max > 0:
-        query = query.where(Listing.price <= params.sale_max)
-
-    if params.search is not None:
-        query = query.where(
-            (
-                Listing.title.ilike(f"%{params.search}%")
-                # | (Listing.description.ilike(f"%{params.search}%"))
+    # Pagination:
+    if params.cursor is not None:
+        # keyset pagination continues after the last row of the previous page
+        try:
+            last_value, last_id = decode_cursor(
+                params.cursor, params.sort_by, params.sort_order, coordinates
             )
-        )
-    if params.min_rating is not None:
-        query = query.where(rating_val >= params.min_rating)
-    if params.country is not None:
-        query = query.where(Listing.address.has(Address.country == params.country))
-    if params.city is not None:
-        query = query.where(
-            Listing.address.has(Address.city.ilike(f"%{params.city}%"))
-        )  # partial match
-    if params.street is not None:
-        query = query.where(Listing.address.has(Address.street == params.street))
-    if params.time_from is not None:
-        query = query.where(
-            func.date_trunc("second", Listing.created_at)
-            >= func.date_trunc("second", params.time_from)
-        )  # second precision for created_at filtering
-
-    # Location filtering and calculating:
-    if params.user_latitude is not None or params.user_longitude is not None:
-        if params.user_latitude is None or params.user_longitude is None:
+        except InvalidCursor as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Both user latitude and longitude must be provided for location-based filtering.",
+                detail=str(e),
             )
-
-        distance_subquery = listing_service.get_listing_distance_subquery(
-            params.user_latitude, params.user_longitude
-        )
-        query = query.outerjoin(
-            distance_subquery, distance_subquery.c.listing_id == Listing.id
-        )
-
-        # Add distance to the select statement
-        query = query.add_columns(distance_subquery.c.distance.label("distance"))
-
-        if params.max_distance is not None:
-            query = query.where(distance_subquery.c.distance <= params.max_distance)
-    else:
-        # fill the distance column with None if user coordinates are not provided
-        query = query.add_columns(null().label("distance"))
-
-    # Sorting:
-    sort_columns = {
-        "created_at": Listing.created_at,
-        "updated_at": Listing.updated_at,
-        "price": Listing.price,
-        "rating": rating_val,
-    }
-    if params.user_latitude is not None and params.user_longitude is not None:
-        sort_columns["location"] = distance_subquery.c.distance
-
-    if params.sort_order == "asc":
-        query = query.order_by(
-            asc(sort_columns.get(params.sort_by, Listing.updated_at))
-        )
-    elif params.sort_order == "desc":
-        query = query.order_by(
-            desc(sort_columns.get(params.sort_by, Listing.updated_at))
-        )
+        query = query.where(
+            get_keyset_condition(
+                sort_expr,
+                Listing.id,
+                params.sort_order,
+                last_value,
+                last_id,
+                nullable=params.sort_by in NULLABLE_SORT_KEYS,
+            )
+        ).limit(params.limit)
     else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid sort_order parameter. Allowed values are: asc, desc.",
-        )
-
-    # Pagination:
-    query = query.limit(params.limit).offset(params.offset)
+        query = query.limit(params.limit).offset(params.offset)
 
     # Execute the query
-    listings = await session.execute(query)
-    listings: Tuple[Listing, int] = listings.all()
-
-    output_listings: List[ListingCardDetails] = []
-
-    # Iterate through the results and create the response
-    for listing, seller_rating, distance in listings:
-        seller_rating = round(seller_rating, 2) if seller_rating else None
-        presigned_urls = listing_service.get_presigned_urls(listing.images)
-        output_listings.append(
-            ListingCardDetails(
-                id=listing.id,
-                title=listing.title,
-                description=listing.description,
-                price=listing.price,
-                listing_status=listing.listing_status,
-                offer_type=listing.offer_type,
-                liked=listing in current_user.favorite_listings,
-                seller=SellerInfoCard(
-                    id=listing.seller.id,
-                    firstname=listing.seller.firstname,
-                    lastname=listing.seller.lastname,
-                    rating=seller_rating,
-                ),
-                address=listing.address,
-                category_ids=[category.id for category in listing.categories],
-                created_at=listing.created_at,
-                image_paths=presigned_urls,
-                distance_from_user=distance,
-            )
+    result = await session.execute(query)
+    rows = result.all()
+
+    # full page means there might be more listings
+    if params.limit > 0 and len(rows) == params.limit:
+        last_row = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            params.sort_by,
+            params.sort_order,
+            last_row.sort_key,
+            last_row.id,
+            coordinates,
         )
 
-    return output_listings
+    # Build the response straight from the rows
+    return [listing_service.build_card_details(row, row.distance) for row in rows]
 
 
 # TESTED for getting specific listing by id
@@ -463,9 +338,7 @@ async def get_listing(
     user_latitude: Latitude | None = None,
     user_longitude: Longitude | None = None,
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     result = await session.execute(
         select(Listing)
@@ -517,7 +390,7 @@ async def get_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
@@ -550,9 +423,7 @@ async def update_listing(
     updated_listing_data: ListingCreate,
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check that listing exists
     result = await session.execute(
@@ -609,6 +480,13 @@ async def update_listing(
         listing.address = primary_address
 
     # update category IDs
+    try:
+        await category_registry.validate_ids(session, updated_listing_data.category_ids)
+    except CategoryNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
     stmt = select(Category).where(Category.id.in_(updated_listing_data.category_ids))
     categories_result = await session.execute(stmt)
     new_categories = categories_result.scalars().all()
@@ -638,7 +516,7 @@ async def update_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
@@ -673,7 +551,7 @@ async def delete_listing(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     # check that listing exists
     listing = await session.get(Listing, listing_id)
@@ -720,9 +598,7 @@ async def buy_listing(
     user_service: UserService = Depends(UserService.get_dependency),
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check that listing exists
     listing = await session.execute(
@@ -779,7 +655,7 @@ async def buy_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
@@ -815,9 +691,7 @@ async def rent_listing(
     user_service: UserService = Depends(UserService.get_dependency),
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check that listing exists
     listing = await session.execute(
@@ -876,7 +750,7 @@ async def rent_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
@@ -912,9 +786,7 @@ async def hide_listing(
     user_service: UserService = Depends(UserService.get_dependency),
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
     # check that listing exists
     listing = await session.execute(
         select(Listing)
@@ -952,7 +824,7 @@ async def hide_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
@@ -988,9 +860,7 @@ async def show_listing(
     user_service: UserService = Depends(UserService.get_dependency),
     listing_service: ListingService = Depends(ListingService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check that listing exists
     listing = await session.execute(
@@ -1029,7 +899,7 @@ async def show_listing(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=await listing_service.is_liked(current_user.id, listing.id),
         seller=SellerInfoCard(
             id=listing.seller.id,
             firstname=listing.seller.firstname,
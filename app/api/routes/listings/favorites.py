@@ -2,13 +2,14 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic_extra_types.coordinate import Latitude, Longitude
-from sqlalchemy import func, null
+from sqlalchemy import null
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from app.api.dependencies import get_async_session
 from app.models.enums.listing_status import ListingStatus
+from app.models.favorite_listing_model import FavoriteListing
 from app.models.listing_model import Listing
 from app.models.user_model import User
 from app.schemas.listing_schema import ListingCardDetails, SellerInfoCard
@@ -33,28 +34,11 @@ async def get_favorite_listings(
     user_latitude: Latitude | None = None,
     user_longitude: Longitude | None = None,
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
-
-    # Get the rating subquery from user_service
-    rating_subquery = user_service.get_seller_rating_subquery()
-    rating_val = func.coalesce(rating_subquery.c.avg_rating, 0).label("seller_rating")
+    current_user = await user_service.get_current_identity()
 
-    query = (
-        select(Listing, rating_val)
-        .outerjoin(rating_subquery, rating_subquery.c.seller_id == Listing.seller_id)
-        .options(
-            selectinload(Listing.address),
-            selectinload(Listing.categories),
-            selectinload(Listing.seller),
-            selectinload(Listing.favorite_by),
-            selectinload(Listing.images),
-        )
-        .where(
-            Listing.favorite_by.any(User.id == current_user.id),
-            Listing.listing_status.in_([ListingStatus.ACTIVE, ListingStatus.RENTED]),
-        )
+    query = listing_service.get_card_query(current_user.id).where(
+        Listing.favorite_by.any(User.id == current_user.id),
+        Listing.listing_status.in_([ListingStatus.ACTIVE, ListingStatus.RENTED]),
     )
 
     if user_latitude is not None or user_longitude is not None:
@@ -75,35 +59,10 @@ async def get_favorite_listings(
         query = query.add_columns(null().label("distance"))
 
     result = await session.execute(query)
-    listings = result.all()
 
-    output_listings: List[ListingCardDetails] = []
-    for listing, seller_rating, distance in listings:
-        seller_rating = round(seller_rating, 2) if seller_rating else None
-        presigned_urls = listing_service.get_presigned_urls(listing.images)
-        output_listings.append(
-            ListingCardDetails(
-                id=listing.id,
-                title=listing.title,
-                description=listing.description,
-                price=listing.price,
-                listing_status=listing.listing_status,
-                offer_type=listing.offer_type,
-                liked=True,
-                seller=SellerInfoCard(
-                    id=listing.seller.id,
-                    firstname=listing.seller.firstname,
-                    lastname=listing.seller.lastname,
-                    rating=seller_rating,
-                ),
-                address=listing.address,
-                category_ids=[category.id for category in listing.categories],
-                created_at=listing.created_at,
-                image_paths=presigned_urls,
-                distance_from_user=distance,
-            )
-        )
-    return output_listings
+    return [
+        listing_service.build_card_details(row, row.distance) for row in result.all()
+    ]
 
 
 # TESTED for adding listing to favorites and listing already in favorites and not existing
@@ -140,18 +99,17 @@ async def add_favorite(
             detail=f"Listing with ID {listing_id} not found.",
         )
 
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check if listing is already in favorites
-    if any(fav.id == listing.id for fav in current_user.favorite_listings):
+    favorite = await session.get(FavoriteListing, (current_user.id, listing.id))
+    if favorite is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Listing with ID {listing_id} is already in your favorites.",
         )
 
-    current_user.favorite_listings.append(listing)
+    session.add(FavoriteListing(user_id=current_user.id, listing_id=listing.id))
     seller_rating = await user_service.get_seller_rating(listing.seller_id)
     presigned_urls = listing_service.get_presigned_urls(listing.images)
 
@@ -162,7 +120,7 @@ async def add_favorite(
         price=listing.price,
         listing_status=listing.listing_status,
         offer_type=listing.offer_type,
-        liked=listing in current_user.favorite_listings,
+        liked=True,
         seller=SellerInfoCard(
             id=listing.seller_id,
             firstname=listing.seller.firstname,
@@ -175,10 +133,7 @@ async def add_favorite(
         image_paths=presigned_urls,
     )
 
-    # add user to DB session
-    session.add(current_user)
     await session.commit()
-    await session.refresh(current_user)
 
     return response
 
@@ -218,18 +173,17 @@ async def remove_favorite(
             detail=f"Listing with ID {listing_id} not found.",
         )
 
-    current_user = await user_service.get_current_user(
-        dependencies=["favorite_listings"]
-    )
+    current_user = await user_service.get_current_identity()
 
     # check that listing is not in favorites
-    if not any(fav.id == listing.id for fav in current_user.favorite_listings):
+    favorite = await session.get(FavoriteListing, (current_user.id, listing.id))
+    if favorite is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Listing with ID {listing_id} is not in your favorites.",
         )
 
-    current_user.favorite_listings.remove(listing)
+    await session.delete(favorite)
     seller_rating = await user_service.get_seller_rating(listing.seller_id)
     presigned_urls = listing_service.get_presigned_urls(listing.images)
     response = ListingCardDetails(
@@ -252,9 +206,6 @@ async def remove_favorite(
         image_paths=presigned_urls,
     )
 
-    # add user to DB session
-    session.add(current_user)
     await session.commit()
-    await session.refresh(current_user)
 
     return response
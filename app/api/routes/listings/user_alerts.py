@@ -4,7 +4,6 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlmodel import desc, select
 
 from app.api.dependencies import get_async_session
-from app.models.category_model import Category
 from app.models.firebase_cloud_token_model import FirebaseCloudToken
 from app.models.user_search_alert_model import UserSearchAlert
 from app.schemas.listing_schema import AlertQuery, AlertQueryCreate
@@ -13,6 +12,8 @@ from app.schemas.user_search_alerts import (
     UserSearchAlertDetail,
     UserSearchAlertGet,
 )
+from app.services.category.category_registry import category_registry
+from app.services.category.exceptions import CategoryNotFound
 from app.services.user.user_service import UserService
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
@@ -29,7 +30,7 @@ async def get_my_alerts(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     # return only posted listings that are not removed
     result = await session.execute(
@@ -65,7 +66,7 @@ async def get_my_alert(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     alert_response = await session.execute(
         select(UserSearchAlert).where(
@@ -110,7 +111,7 @@ async def update_alert(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     alert = await session.execute(
         select(UserSearchAlert).where(
@@ -128,13 +129,13 @@ async def update_alert(
 
     # re-validate categories if provided
     if updated.category_ids is not None:
-        for cid in updated.category_ids:
-            cat = await session.get(Category, cid)
-            if not cat:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category with ID {cid} not found.",
-                )
+        try:
+            await category_registry.validate_ids(session, updated.category_ids)
+        except CategoryNotFound as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
 
     # re-validate sort_by if provided
     if updated.sort_by is not None and updated.sort_by not in {
@@ -226,13 +227,13 @@ async def create_alert(
 
     # check that categories exist
     if new_alert_data.category_ids is not None:
-        for category_id in new_alert_data.category_ids:
-            category = await session.get(Category, category_id)
-            if not category:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Category with ID {category_id} not found.",
-                )
+        try:
+            await category_registry.validate_ids(session, new_alert_data.category_ids)
+        except CategoryNotFound as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
 
     # check that sort_by is valid
     if new_alert_data.sort_by not in ["created_at", "updated_at", "price", "rating"]:
@@ -291,7 +292,7 @@ async def enable_alert(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     # check that alert exists
     alert = await session.get(UserSearchAlert, alert_id)
@@ -330,7 +331,7 @@ async def disable_alert(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     # check that alert exists
     alert = await session.get(UserSearchAlert, alert_id)
@@ -368,7 +369,7 @@ async def delete_alert(
     session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user()
+    current_user = await user_service.get_current_identity()
 
     # check that alert exists
     alert = await session.get(UserSearchAlert, alert_id)
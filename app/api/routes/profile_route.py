@@ -26,24 +26,10 @@ router = APIRouter(tags=["Profile"])
 @router.get("/profile", response_model=ProfileUser)
 async def get_profile(
     *,
-    session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
-    current_user = await user_service.get_current_user(
-        dependencies=["addresses", "purchased_listings", "rented_listings"]
-    )
-
-    user_rating = await user_service.get_seller_rating(current_user.id)
-    user_address = await session.execute(
-        select(Address).where(
-            Address.user_id == current_user.id, Address.is_primary == True
-        )
-    )
-    print("user: ", current_user.id)
-    sold_listings = await user_service.get_sold_listings(current_user.id)
-    rented_listings = await user_service.get_rented_listings(current_user.id)
-
-    user_address = user_address.scalars().one_or_none()
+    profile = await user_service.get_current_user_profile_summary()
+    current_user = profile.user
 
     return ProfileUser(
         id=current_user.id,
@@ -51,10 +37,10 @@ async def get_profile(
         lastname=current_user.lastname,
         phone_number=current_user.phone_number,
         email=current_user.email,
-        rating=user_rating,
-        amount_rent_listing=len(rented_listings),
-        amount_sold_listing=len(sold_listings),
-        address=user_address,
+        rating=profile.rating,
+        amount_rent_listing=profile.rented_count,
+        amount_sold_listing=profile.sold_count,
+        address=profile.address,
     )
 
 
@@ -99,13 +85,10 @@ async def update_profile(
 async def get_user_profile(
     *,
     id: int,
-    session: AsyncSession = Depends(get_async_session),
     user_service: UserService = Depends(UserService.get_dependency),
 ):
     try:
-        user = await user_service.get_user_by_id(
-            id, dependencies=["addresses", "purchased_listings", "rented_listings"]
-        )
+        profile = await user_service.get_profile_summary(id)
     except UserNotFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -116,14 +99,7 @@ async def get_user_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Could not get user.",
         )
-
-    user_rating = await user_service.get_seller_rating(user.id)
-    user_address = await session.execute(
-        select(Address).where(Address.user_id == user.id, Address.is_primary == True)
-    )
-
-    sold_listings = await user_service.get_sold_listings(user.id)
-    user_address = user_address.scalars().one_or_none()
+    user = profile.user
 
     return ProfileUser(
         id=user.id,
@@ -131,10 +107,10 @@ async def get_user_profile(
         lastname=user.lastname,
         phone_number=user.phone_number,
         email=user.email,
-        rating=user_rating,
-        amount_rent_listing=len(user.rented_listings),
-        amount_sold_listing=len(sold_listings),
-        address=user_address,
+        rating=profile.rating,
+        amount_rent_listing=profile.rented_count,
+        amount_sold_listing=profile.sold_count,
+        address=profile.address,
     )
 
 
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app.db.database import get_pool_statistics
+from app.schemas.system_schema import PoolStatistics
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatistics,
+    summary="Get database pool statistics",
+    description="Connections checked out, overflow and time spent waiting for a connection in this worker process.",
+)
+async def get_pool_stats():
+    return PoolStatistics(**get_pool_statistics())
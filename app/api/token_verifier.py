@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+Claims = dict[str, Any]
+
+
+class TokenVerifier:
+    """
+    Verifies ID tokens in a thread pool and caches the decoded claims.
+
+    Verification is blocking RSA work (and sometimes a certificate download), so it
+    must not run on the event loop. Claims are cached by the SHA-256 of the token
+    until the token's `exp`, and concurrent requests with the same token share
+    a single verification.
+    """
+
+    def __init__(
+        self,
+        verify: Callable[[str], Claims],
+        max_size: int = 10_000,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.verify_token = verify
+        self.max_size = max_size
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="token-verifier"
+        )
+
+        # token hash -> (claims, expiration timestamp)
+        self._claims: OrderedDict[str, tuple[Claims, float]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        # do not keep raw tokens in memory longer than needed
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    async def verify(self, token: str) -> Claims:
+        """
+        Returns the decoded claims of a valid token.
+        Raises whatever the underlying verify function raises for invalid tokens.
+        """
+        key = self._token_key(token)
+
+        cached = self._claims.get(key)
+        if cached is not None:
+            claims, expires_at = cached
+            if self.clock() < expires_at:
+                self._claims.move_to_end(key)
+                self.hits += 1
+                return dict(claims)
+            del self._claims[key]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return dict(await asyncio.shield(pending))
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, self.verify_token, token)
+        self._pending[key] = future
+        try:
+            # shielded, so a cancelled request does not fail the others waiting on it
+            claims = await asyncio.shield(future)
+        finally:
+            self._pending.pop(key, None)
+
+        self._store(key, claims)
+        return dict(claims)
+
+    def _store(self, key: str, claims: Claims) -> None:
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= self.clock():
+            return
+
+        self._claims[key] = (claims, float(expires_at))
+        self._claims.move_to_end(key)
+        while len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+
+    def clear(self) -> None:
+        self._claims.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._claims),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
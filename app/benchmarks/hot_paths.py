@@ -0,0 +1,356 @@
+"""
+Microbenchmarks of service-layer hot paths, with results compared to a baseline.
+
+Run with:
+    python -m app.benchmarks.hot_paths --output results.json
+    python -m app.benchmarks.hot_paths --compare app/benchmarks/baselines/hot_paths.json
+    python -m app.benchmarks.hot_paths --save-baseline
+
+Uses an in-memory SQLite database seeded by the dataset generator, or the
+database given by --database-url (seeded only when it has no listings).
+Timings are per call, in microseconds.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+import sqlalchemy
+from pydantic import TypeAdapter
+from sqlalchemy import StaticPool, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api import middleware
+from app.api.token_verifier import TokenVerifier
+from app.models import Listing, User
+from app.models.enums.listing_status import ListingStatus
+from app.models.enums.offer_type import OfferType
+from app.schedulers.alert_matcher import ListingCandidate, find_matching_listings
+from app.schemas.listing_schema import ListingCardDetails, ListingQueryParameters
+from app.seeders.generate_dataset import DatasetConfig, generate_dataset
+from app.services.listing.cards import build_card_details
+from app.services.listing.listing_service import ListingService
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "hot_paths.json"
+PAGE_SIZE = 100
+
+# a search using every filter, the most expensive query to build
+SEARCH_PARAMS = ListingQueryParameters(
+    search="bicykel",
+    category_ids=[1, 2, 3],
+    offer_type=OfferType.BUY,
+    sale_min=10,
+    sale_max=1000,
+    min_rating=3,
+    country="SK",
+    city="Bratislava",
+    time_from=datetime(2025, 1, 1, tzinfo=UTC),
+    user_latitude=48.1486,
+    user_longitude=17.1077,
+    max_distance=25,
+    sort_by="location",
+    sort_order="asc",
+    limit=PAGE_SIZE,
+)
+
+
+class Benchmark:
+    """Runs a callable `number` times per sample and keeps per-call timings."""
+
+    def __init__(self, repeat: int, min_sample_time: float = 0.05) -> None:
+        self.repeat = repeat
+        self.min_sample_time = min_sample_time
+        self.results: dict[str, dict[str, float]] = {}
+
+    def _calibrate(self, run_sample: Callable[[int], float]) -> int:
+        # grow the loop count until one sample takes long enough to time reliably
+        number = 1
+        while run_sample(number) < self.min_sample_time and number < 1_000_000:
+            number *= 2
+        return number
+
+    def _record(self, name: str, samples: List[float], number: int) -> None:
+        per_call = sorted(sample / number * 1e6 for sample in samples)
+        self.results[name] = {
+            "median_us": statistics.median(per_call),
+            "p95_us": per_call[max(int(len(per_call) * 0.95) - 1, 0)],
+            "min_us": per_call[0],
+            "calls_per_sample": number,
+        }
+        print(
+            f"{name:>28}: median {self.results[name]['median_us']:10.2f} us, "
+            f"min {self.results[name]['min_us']:10.2f} us"
+        )
+
+    def run(self, name: str, func: Callable[[], Any]) -> None:
+        def run_sample(number: int) -> float:
+            # as timeit does, garbage collection pauses are left out of the timings
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(number):
+                    func()
+                return time.perf_counter() - start
+            finally:
+                gc.enable()
+
+        number = self._calibrate(run_sample)
+        self._record(name, [run_sample(number) for _ in range(self.repeat)], number)
+
+    async def run_async(self, name: str, func: Callable[[], Awaitable]) -> None:
+        async def run_sample(number: int) -> float:
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(number):
+                    await func()
+                return time.perf_counter() - start
+            finally:
+                gc.enable()
+
+        number = 1
+        while await run_sample(number) < self.min_sample_time and number < 1_000_000:
+            number *= 2
+        samples = [await run_sample(number) for _ in range(self.repeat)]
+        self._record(name, samples, number)
+
+
+def compare_results(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> List[dict]:
+    """
+    Compares median timings with the baseline. A benchmark regressed when it is
+    slower than the baseline by more than `threshold` (0.2 = 20 %).
+    """
+    comparison = []
+    for name, result in results.items():
+        if name not in baseline:
+            comparison.append({"name": name, "status": "new", "ratio": None})
+            continue
+        ratio = result["median_us"] / baseline[name]["median_us"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparison.append({"name": name, "status": status, "ratio": ratio})
+    return comparison
+
+
+def make_request(headers: dict[str, str] | None = None, user: dict | None = None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/listings/",
+        "headers": [
+            (key.lower().encode(), value.encode())
+            for key, value in (headers or {}).items()
+        ],
+        "query_string": b"",
+        "state": {"user": user} if user else {},
+    }
+    return Request(scope)
+
+
+def make_candidates(count: int) -> List[ListingCandidate]:
+    rng = random.Random(0)
+    now = datetime.now(UTC)
+    return [
+        ListingCandidate(
+            id=i,
+            title=f"{rng.choice(['Horsky', 'Detsky', 'Cestny'])} bicykel {i}",
+            description="Zachovaly bicykel, " * 5,
+            price=rng.randrange(10, 2000),
+            offer_type=rng.choice(list(OfferType)),
+            listing_status=ListingStatus.ACTIVE,
+            created_at=now - timedelta(seconds=rng.randrange(600)),
+            seller_rating=rng.uniform(0, 5),
+            category_ids={rng.randrange(1, 15)},
+            city=rng.choice(["Bratislava", "Kosice", "Zilina"]),
+        )
+        for i in range(count)
+    ]
+
+
+ALERT_FILTERS = [
+    {},
+    {"search": "horsky"},
+    {"category_ids": [1, 2, 3], "offer_type": "buy"},
+    {"min_price": 100, "max_price": 500, "min_rating": 3},
+    {"city": "Bratislava", "search": "bicykel"},
+]
+
+
+async def seed_if_empty(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        listings = (await conn.execute(select(func.count(Listing.id)))).scalar_one()
+    if not listings:
+        await generate_dataset(engine, DatasetConfig(users=200, listings=2_000))
+
+
+async def run_benchmarks(
+    engine: AsyncEngine, repeat: int
+) -> dict[str, dict[str, float]]:
+    benchmark = Benchmark(repeat)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as session:
+        user_id = (await session.execute(select(func.min(User.id)))).scalar_one()
+        listing_service = ListingService(
+            session, make_request(user={"email": "bench@example.com"})
+        )
+
+        # query building and compiling of the listing search
+        benchmark.run(
+            "search_query_build",
+            lambda: listing_service.get_search_query(user_id, SEARCH_PARAMS),
+        )
+        query, _ = listing_service.get_search_query(user_id, SEARCH_PARAMS)
+        query = query.limit(PAGE_SIZE)
+        # the cache key is computed on every execution, compiling only on a miss
+        benchmark.run("search_query_cache_key", query._generate_cache_key)
+        benchmark.run(
+            "search_query_compile", lambda: query.compile(dialect=engine.dialect)
+        )
+
+        # a page of listing cards, built from rows and serialized by FastAPI
+        page_params = ListingQueryParameters(limit=PAGE_SIZE, offer_type=OfferType.BUY)
+        page_query, _ = listing_service.get_search_query(user_id, page_params)
+        rows = (await session.execute(page_query.limit(PAGE_SIZE))).all()
+        cards = [build_card_details(row, row.image_paths) for row in rows]
+        benchmark.run(
+            "card_page_build",
+            lambda: [build_card_details(row, row.image_paths) for row in rows],
+        )
+
+        # FastAPI validates the returned cards against the response model and
+        # dumps them to JSON
+        adapter = TypeAdapter(List[ListingCardDetails])
+        benchmark.run(
+            "card_page_serialize",
+            lambda: adapter.dump_json(
+                adapter.validate_python(cards, from_attributes=True)
+            ),
+        )
+
+        benchmark.run(
+            "user_listing_distance",
+            lambda: listing_service.get_user_listing_distance(
+                48.1486, 17.1077, 48.7164, 21.2611
+            ),
+        )
+
+    # alert matching of one scheduler run, every alert against the new listings
+    candidates = make_candidates(500)
+    since = datetime.now(UTC) - timedelta(minutes=5)
+    benchmark.run(
+        "alert_matching",
+        lambda: [
+            find_matching_listings(candidates, product_filters, since)
+            for product_filters in ALERT_FILTERS
+        ],
+    )
+
+    # authentication middleware with a cached token
+    claims = {"email": "bench@example.com", "exp": time.time() + 3600}
+    previous_verifier = middleware.token_verifier
+    middleware.token_verifier = TokenVerifier(lambda token: claims)
+    try:
+
+        async def call_next(request: Request) -> Response:
+            return Response()
+
+        async def authenticate() -> Response:
+            request = make_request({"Authorization": "Bearer bench-token"})
+            return await middleware.authenticate_request(request, call_next)
+
+        await authenticate()
+        await benchmark.run_async("auth_middleware", authenticate)
+    finally:
+        middleware.token_verifier = previous_verifier
+
+    return benchmark.results
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.database_url:
+        engine = create_async_engine(args.database_url)
+    else:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    await seed_if_empty(engine)
+
+    try:
+        results = await run_benchmarks(engine, args.repeat)
+    finally:
+        await engine.dispose()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "dialect": engine.dialect.name,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    output = BASELINE_PATH if args.save_baseline else args.output
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results saved to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(
+            f"\nCompared with {args.compare} "
+            f"({baseline['meta']['python']}, {baseline['meta']['dialect']})"
+        )
+        comparison = compare_results(results, baseline["results"], args.threshold)
+        for row in comparison:
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            print(f"{row['name']:>28}: {ratio:>7} {row['status']}")
+        if any(row["status"] == "regression" for row in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="e.g. postgresql+asyncpg://...")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="file to save the results to")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare to")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"save the results as the stored baseline, {BASELINE_PATH}",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown of the median reported as a regression",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,166 @@
+"""
+Compares the listing card query with the previous selectinload based loading.
+
+Run with:
+    python -m app.benchmarks.listing_cards --listings 2000 --page-size 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+
+from sqlalchemy import StaticPool, event, false, func
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlmodel import SQLModel, select
+
+from app.models import Address, Category, Listing, User
+from app.models.enums.offer_type import OfferType
+from app.models.listing_image import ListingImage
+from app.schemas.listing_schema import ListingCardDetails, SellerInfoCard
+from app.services.listing.cards import build_card_details, get_card_query
+from app.services.user.user_service import UserService
+
+
+async def seed(session, listings: int) -> None:
+    users = [
+        User(firstname=f"User {i}", lastname="Bench", email=f"user{i}@bench.test")
+        for i in range(50)
+    ]
+    categories = [Category(name=f"Category {i}") for i in range(10)]
+    session.add_all([*users, *categories])
+    await session.flush()
+
+    addresses = [Address(postal_code="81101", user_id=user.id) for user in users]
+    session.add_all(addresses)
+    await session.flush()
+
+    for i in range(listings):
+        session.add(
+            Listing(
+                title=f"Listing {i}",
+                description="Benchmark listing " * 10,
+                price=Decimal(i % 500),
+                offer_type=OfferType.BUY,
+                seller_id=users[i % len(users)].id,
+                address_id=addresses[i % len(addresses)].id,
+                categories=[categories[i % 10], categories[(i + 3) % 10]],
+                images=[ListingImage(path=f"listings/{i}/{j}.jpg") for j in range(3)],
+            )
+        )
+    await session.commit()
+
+
+async def load_page_selectinload(session, page_size: int) -> list[ListingCardDetails]:
+    """Listing search before the card query: main query plus four selectinloads."""
+    rating_subquery = UserService.get_seller_rating_subquery()
+    rating_val = func.coalesce(rating_subquery.c.avg_rating, 0).label("seller_rating")
+    result = await session.execute(
+        select(Listing, rating_val)
+        .outerjoin(rating_subquery, rating_subquery.c.seller_id == Listing.seller_id)
+        .options(
+            selectinload(Listing.seller),
+            selectinload(Listing.categories),
+            selectinload(Listing.address),
+            selectinload(Listing.images),
+        )
+        .order_by(Listing.created_at.desc(), Listing.id.desc())
+        .limit(page_size)
+    )
+    return [
+        ListingCardDetails(
+            id=listing.id,
+            title=listing.title,
+            description=listing.description,
+            price=listing.price,
+            listing_status=listing.listing_status,
+            offer_type=listing.offer_type,
+            liked=False,
+            seller=SellerInfoCard(
+                id=listing.seller.id,
+                firstname=listing.seller.firstname,
+                lastname=listing.seller.lastname,
+                rating=round(seller_rating, 2) if seller_rating else None,
+            ),
+            address=listing.address,
+            category_ids=[category.id for category in listing.categories],
+            created_at=listing.created_at,
+            image_paths=[image.path for image in listing.images],
+        )
+        for listing, seller_rating in result.all()
+    ]
+
+
+async def load_page_card_query(session, page_size: int) -> list[ListingCardDetails]:
+    result = await session.execute(
+        get_card_query(false().label("liked"))
+        .order_by(Listing.created_at.desc(), Listing.id.desc())
+        .limit(page_size)
+    )
+    return [build_card_details(row, row.image_paths) for row in result.all()]
+
+
+async def measure(session_factory, engine, loader, page_size: int, repeat: int):
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    timings = []
+    try:
+        for _ in range(repeat):
+            # a new session per page, the same as a request
+            async with session_factory() as session:
+                start = time.perf_counter()
+                cards = await loader(session, page_size)
+                timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(cards) == page_size
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1] * 1000,
+        "queries_per_page": statements / repeat,
+    }
+
+
+async def main(listings: int, page_size: int, repeat: int) -> None:
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with session_factory() as session:
+        await seed(session, listings)
+
+    print(f"{listings} listings, pages of {page_size}, {repeat} runs")
+    for name, loader in [
+        ("selectinload", load_page_selectinload),
+        ("card query", load_page_card_query),
+    ]:
+        # warm up the statement caches
+        await measure(session_factory, engine, loader, page_size, 3)
+        result = await measure(session_factory, engine, loader, page_size, repeat)
+        print(
+            f"{name:>12}: median {result['median_ms']:.2f} ms, "
+            f"p95 {result['p95_ms']:.2f} ms, "
+            f"{result['queries_per_page']:.0f} queries per page"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.listings, args.page_size, args.repeat))
@@ -0,0 +1,363 @@
+"""
+End-to-end load test replaying a weighted mix of API calls at a fixed concurrency.
+
+Run in-process against the ASGI app, on a temporary SQLite database filled by
+the dataset generator:
+    python -m app.benchmarks.load_test --concurrency 16 --duration 30
+
+or against a local Postgres (seeded only when it has no listings):
+    python -m app.benchmarks.load_test --database-url postgresql+asyncpg://...
+
+or against a running server started with TESTING=1 (no query counts):
+    python -m app.benchmarks.load_test --base-url http://localhost:8000
+
+Requests are authenticated by the TESTING auth bypass as test@example.com,
+so that user has to exist. In-process, the fake Firebase providers are used
+unless FIREBASE_PROVIDER is set, add FAKE_FIREBASE_LATENCY and
+FAKE_FIREBASE_ERROR_RATE to see how slow or failing services affect the API.
+"""
+
+import os
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("FIREBASE_PROVIDER", "fake")
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import tempfile
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+import httpx
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app.api.dependencies import get_async_session
+from app.api.main import app
+from app.models import Listing
+from app.seeders.generate_dataset import DatasetConfig, generate_dataset
+
+DEFAULT_MIX = "search=50,detail=25,favorite=10,profile=10,create=5"
+SEARCH_TERMS = ["bicykel", "stôl", "telefón", "notebook", "stan", "gauč"]
+SORTS = ["created_at", "price", "rating", "location"]
+
+# statements executed by the request being sent, counted by an engine listener
+request_queries: ContextVar[list[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def count_query(*_) -> None:
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}, allowed: {', '.join(SCENARIOS)}"
+            )
+        weights[name] = int(weight)
+    return weights
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    queries: List[int] = field(default_factory=list)
+
+
+class LoadTest:
+    """Shared state of the workers: known listings, favorites and the results."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, listing_ids: List[int], category_ids: List[int]
+    ) -> None:
+        self.client = client
+        self.listing_ids = listing_ids
+        self.category_ids = category_ids
+        self.favorites: set[int] = set()
+        # listings with a favorite request in flight, not toggled again meanwhile
+        self.toggling: set[int] = set()
+        self.stats: dict[str, RouteStats] = defaultdict(RouteStats)
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> None:
+        counter = [0]
+        token = request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, url, headers={"Authorization": "Bearer load-test"}, **kwargs
+            )
+            failed = response.is_error
+        except httpx.HTTPError:
+            failed = True
+        finally:
+            request_queries.reset(token)
+
+        stats = self.stats[route]
+        stats.latencies.append(time.perf_counter() - start)
+        stats.queries.append(counter[0])
+        stats.errors += failed
+
+    async def search(self, rng: random.Random) -> None:
+        params = {"offer_type": rng.choice(["buy", "rent"]), "limit": 20}
+        if rng.random() < 0.5:
+            params["search"] = rng.choice(SEARCH_TERMS)
+        if rng.random() < 0.3:
+            params["category_ids"] = rng.choice(self.category_ids)
+        params["sort_by"] = rng.choice(SORTS)
+        if params["sort_by"] == "location" or rng.random() < 0.3:
+            params.update(user_latitude=48.1486, user_longitude=17.1077)
+            if rng.random() < 0.5:
+                params["max_distance"] = rng.choice([5, 25, 100])
+        await self.request("GET /listings/", "GET", "/listings/", params=params)
+
+    async def detail(self, rng: random.Random) -> None:
+        listing_id = rng.choice(self.listing_ids)
+        await self.request(
+            "GET /listings/{listing_id}", "GET", f"/listings/{listing_id}"
+        )
+
+    async def favorite(self, rng: random.Random) -> None:
+        listing_id = rng.choice(self.listing_ids)
+        if listing_id in self.toggling:
+            return
+        self.toggling.add(listing_id)
+        try:
+            url = f"/listings/{listing_id}/favorite"
+            if listing_id in self.favorites:
+                self.favorites.discard(listing_id)
+                await self.request(
+                    "DELETE /listings/{listing_id}/favorite", "DELETE", url
+                )
+            else:
+                self.favorites.add(listing_id)
+                await self.request("PUT /listings/{listing_id}/favorite", "PUT", url)
+        finally:
+            self.toggling.discard(listing_id)
+
+    async def profile(self, rng: random.Random) -> None:
+        await self.request("GET /profile", "GET", "/profile")
+
+    async def create(self, rng: random.Random) -> None:
+        payload = {
+            "title": f"Load test listing {rng.randrange(10**6)}",
+            "description": "Created by the load test",
+            "price": f"{rng.uniform(1, 1000):.2f}",
+            "offer_type": rng.choice(["buy", "rent"]),
+            "address": {"address_type": "profile"},
+            "category_ids": [rng.choice(self.category_ids)],
+            "image_paths": [f"load-test/{rng.randrange(10**6)}.jpg"],
+        }
+        await self.request("POST /listings/", "POST", "/listings/", json=payload)
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, stats in sorted(self.stats.items()):
+            latencies = sorted(stats.latencies)
+            routes[route] = {
+                "requests": len(latencies),
+                "errors": stats.errors,
+                "throughput_rps": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "queries_per_request": sum(stats.queries) / len(stats.queries),
+            }
+        all_latencies = sorted(
+            itertools.chain.from_iterable(s.latencies for s in self.stats.values())
+        )
+        return {
+            "elapsed_s": elapsed,
+            "requests": len(all_latencies),
+            "errors": sum(stats.errors for stats in self.stats.values()),
+            "throughput_rps": len(all_latencies) / elapsed,
+            "p50_ms": percentile(all_latencies, 50) * 1000,
+            "p95_ms": percentile(all_latencies, 95) * 1000,
+            "p99_ms": percentile(all_latencies, 99) * 1000,
+            "routes": routes,
+        }
+
+
+SCENARIOS: dict[str, Callable[[LoadTest, random.Random], Awaitable[None]]] = {
+    "search": LoadTest.search,
+    "detail": LoadTest.detail,
+    "favorite": LoadTest.favorite,
+    "profile": LoadTest.profile,
+    "create": LoadTest.create,
+}
+
+
+async def run_load(
+    load_test: LoadTest,
+    mix: dict[str, int],
+    concurrency: int,
+    duration: float,
+    max_requests: int | None,
+    seed: int,
+) -> float:
+    """Runs the workers until `duration` passes or `max_requests` are sent."""
+    scenarios = [SCENARIOS[name] for name in mix]
+    weights = list(mix.values())
+    sent = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            if max_requests is not None and next(sent) >= max_requests:
+                return
+            scenario = rng.choices(scenarios, weights=weights)[0]
+            await scenario(load_test, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def prepare_database(engine: AsyncEngine, create_schema: bool) -> None:
+    if create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    async with engine.connect() as conn:
+        listings = (await conn.execute(select(func.count(Listing.id)))).scalar_one()
+    if not listings:
+        await generate_dataset(
+            engine,
+            DatasetConfig(
+                users=500, listings=5_000, first_user_email="test@example.com"
+            ),
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        if args.database_url:
+            engine = create_async_engine(
+                args.database_url, pool_size=args.pool_size, max_overflow=0
+            )
+        else:
+            path = Path(tempfile.mkdtemp()) / "load_test.db"
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30}
+            )
+        await prepare_database(engine, create_schema=not args.database_url)
+        event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def get_load_test_session():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = get_load_test_session
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://load.test"
+        )
+
+    async with client:
+        # listings and categories to pick from, read through the API
+        response = await client.get(
+            "/listings/",
+            params={"offer_type": "buy", "limit": 200},
+            headers={"Authorization": "Bearer load-test"},
+        )
+        response.raise_for_status()
+        listing_ids = [listing["id"] for listing in response.json()]
+        response = await client.get(
+            "/categories/", headers={"Authorization": "Bearer load-test"}
+        )
+        response.raise_for_status()
+        category_ids = [category["id"] for category in response.json()]
+
+        load_test = LoadTest(client, listing_ids, category_ids)
+        print(
+            f"Running {args.mix} with {args.concurrency} concurrent clients "
+            f"for {args.duration:.0f} s"
+        )
+        elapsed = await run_load(
+            load_test,
+            args.mix,
+            args.concurrency,
+            args.duration,
+            args.requests,
+            args.seed,
+        )
+
+    if engine is not None:
+        await engine.dispose()
+
+    report = load_test.report(elapsed)
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "target": args.base_url or (engine.dialect.name if engine else None),
+    }
+    print(
+        f"\n{'route':<40}{'requests':>9}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+    )
+    for route, stats in report["routes"].items():
+        queries = f"{stats['queries_per_request']:.1f}" if engine else "-"
+        print(
+            f"{route:<40}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>9.1f}"
+            f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{queries:>9}"
+        )
+    print(
+        f"{'total':<40}{report['requests']:>9}{report['errors']:>8}"
+        f"{report['throughput_rps']:>9.1f}{report['p50_ms']:>9.1f}"
+        f"{report['p95_ms']:>9.1f}{report['p99_ms']:>9.1f}"
+    )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help=f"weighted scenarios, default {DEFAULT_MIX}",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="e.g. postgresql+asyncpg://...")
+    parser.add_argument(
+        "--pool-size", type=int, default=5, help="connection pool size in-process"
+    )
+    parser.add_argument("--base-url", help="URL of a running server")
+    parser.add_argument("--output", type=Path, help="file to save the results to")
+    asyncio.run(main(parser.parse_args()))
@@ -1,5 +1,6 @@
 import os
 from enum import StrEnum
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,6 +25,42 @@ class Settings(BaseSettings):
     testing: str | None = None
     render_env: str = ENVIRONMENT
 
+    # database engine and connection pool
+    # size the pool so that uvicorn workers * (pool_size + max_overflow) stays
+    # below the max_connections of the database
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds, -1 disables recycling
+    db_pool_pre_ping: bool = True
+    db_echo: bool = False  # log every SQL statement
+    db_statement_cache_size: int = 100  # set to 0 behind pgbouncer
+
+    # Firebase auth, storage and messaging, "fake" uses the in-process stand-ins
+    # from app/providers/fake.py for offline load tests
+    firebase_provider: Literal["firebase", "fake"] = "firebase"
+    fake_firebase_latency: float = 0.0  # seconds added to every call
+    fake_firebase_error_rate: float = 0.0  # share of calls failing, 0 to 1
+    # PEM key shared by processes that verify each other's tokens, created if missing
+    fake_firebase_key_path: str | None = None
+    fake_firebase_storage_dir: str | None = None  # blobs on disk instead of in memory
+
+    # statements slower than the threshold are written to a rotating JSON lines
+    # file, the log is disabled without a threshold
+    slow_query_threshold_ms: float | None = None
+    slow_query_log_path: str = "logs/slow_queries.log"
+    slow_query_explain: bool = True  # capture the plan of slow SELECTs
+
+    # event loop lag sampling, logs the stack of calls blocking the loop
+    loop_lag_monitor: bool = False
+    loop_lag_interval: float = 0.05  # seconds between samples
+    loop_lag_threshold: float = 0.1  # seconds blocked before the stack is logged
+
+    # users who may profile their requests with the X-Profile: 1 header, as a
+    # JSON list, the profiler is not installed without any
+    profiling_allowed_emails: list[str] = []
+    profiling_dir: str = "logs/profiles"
+
     model_config = SettingsConfigDict(
         env_file=".env" if ENVIRONMENT != Environment.PRODUCTION else None,
         env_file_encoding="utf-8",
@@ -0,0 +1,101 @@
+"""
+Measures how late the event loop runs a timer. Every request of a worker shares
+one event loop, so a synchronous call in an async handler (a Firebase SDK call,
+hashing, a large JSON encode) delays all of them.
+
+A sampler task sleeps for `interval` and records the lateness of its wake-up in
+`event_loop_lag_seconds`. A watchdog thread notices when the sampler has not
+woken up for longer than `threshold` and logs the stack of the event loop thread
+while it is still blocked, which points at the blocking call.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+
+from app.core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG, Counter, Summary
+
+logger = logging.getLogger("app.loop_monitor")
+
+
+@dataclass
+class BlockedLoop:
+    """The event loop did not run for `duration` seconds, blocked in `stack`."""
+
+    duration: float
+    stack: str
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        lag: Summary = EVENT_LOOP_LAG,
+        blocked: Counter = EVENT_LOOP_BLOCKED,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = lag
+        self.blocked = blocked
+        # the latest stalls, for debugging from a shell
+        self.stalls: deque[BlockedLoop] = deque(maxlen=20)
+
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Starts sampling the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag.observe(max(loop.time() - start - self.interval, 0.0))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            # one report per stall, the heartbeat moves once the loop runs again
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.blocked.inc()
+            self.stalls.append(BlockedLoop(stalled, stack))
+            logger.warning(
+                "Event loop blocked for at least %.3fs in:\n%s", stalled, stack
+            )
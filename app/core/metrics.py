@@ -0,0 +1,398 @@
+"""
+Process-wide metrics in the Prometheus text format, served on /metrics.
+
+Request latency is recorded per route template, database statements per request
+by engine events, and external calls (Firebase) by `time_external_call`.
+Every worker process has its own metrics, the same as the /system/pool statistics.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Sequence
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]: ...
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Gauge read from a function when metrics are collected."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self._function: Callable[[], float] | None = None
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def samples(self) -> List[str]:
+        if self._function is None:
+            return []
+        return [f"{self.name} {_format_value(self._function())}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> (count per bucket, with +Inf last, sum)
+        self._values: dict[tuple[str, ...], tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([], 0))
+            return sum(counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Summary(Metric):
+    """Quantiles of the last `window` observations, with the sum and count of all."""
+
+    type = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        window: int = 1000,
+    ) -> None:
+        super().__init__(name, help)
+        self.quantiles = tuple(quantiles)
+        self._window: deque[float] = deque(maxlen=window)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._window.append(value)
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile of the window, 0 without observations."""
+        with self._lock:
+            values = sorted(self._window)
+        if not values:
+            return 0.0
+        return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            has_values = bool(self._window)
+            total, count = self._sum, self._count
+        lines = []
+        if has_values:
+            for q in self.quantiles:
+                labels = _format_labels((), (), quantile=_format_value(q))
+                lines.append(f"{self.name}{labels} {_format_value(self.quantile(q))}")
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Request latency by route template.",
+        ("method", "route", "status"),
+    )
+)
+REQUEST_QUERIES = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database statements executed per request.",
+        ("method", "route"),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_TIME = registry.register(
+    Histogram(
+        "http_request_db_duration_seconds",
+        "Time spent executing database statements per request.",
+        ("method", "route"),
+    )
+)
+DB_QUERIES = registry.register(
+    Counter("db_queries_total", "Database statements executed.", ("route",))
+)
+DB_QUERY_TIME = registry.register(
+    Counter(
+        "db_query_duration_seconds_total",
+        "Cumulative time spent executing database statements.",
+        ("route",),
+    )
+)
+DB_POOL_WAIT = registry.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time waiting for a database connection from the pool.",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+    )
+)
+DB_POOL_TIMEOUTS = registry.register(
+    Counter(
+        "db_pool_checkout_timeouts_total",
+        "Requests that gave up waiting for a database connection.",
+    )
+)
+DB_POOL_CHECKED_OUT = registry.register(
+    Gauge("db_pool_checked_out", "Connections currently checked out of the pool.")
+)
+DB_POOL_OVERFLOW = registry.register(
+    Gauge("db_pool_overflow", "Connections open above the pool size.")
+)
+EXTERNAL_CALL_LATENCY = registry.register(
+    Histogram(
+        "external_call_duration_seconds",
+        "Latency of calls to external services.",
+        ("service", "operation", "outcome"),
+    )
+)
+EVENT_LOOP_LAG = registry.register(
+    Summary(
+        "event_loop_lag_seconds",
+        "How late the event loop ran a timer, over the recent samples.",
+    )
+)
+EVENT_LOOP_BLOCKED = registry.register(
+    Counter(
+        "event_loop_blocked_total",
+        "Times the event loop was blocked for longer than the threshold.",
+    )
+)
+
+
+@dataclass
+class RequestMetrics:
+    """Database usage of the request being handled."""
+
+    request: Request | None = None
+    queries: int = 0
+    db_time: float = 0.0
+
+    @property
+    def route(self) -> str:
+        return get_route_template(self.request) if self.request else "unmatched"
+
+
+current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+    request_metrics = current_request.get()
+    if request_metrics is not None:
+        # added to the totals per route when the request finishes
+        request_metrics.queries += 1
+        request_metrics.db_time += elapsed
+    else:
+        # scheduler jobs and startup
+        DB_QUERIES.inc(route="background")
+        DB_QUERY_TIME.inc(elapsed, route="background")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # a failed statement never reaches after_cursor_execute
+    connection = context.connection
+    start_times = connection.info.get("query_start_times") if connection else None
+    if start_times:
+        start_times.pop()
+
+
+@contextmanager
+def time_external_call(
+    service: str, operation: str, histogram: Histogram = EXTERNAL_CALL_LATENCY
+) -> Iterator[None]:
+    """Records the latency of a call to an external service and if it failed."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        histogram.observe(
+            time.perf_counter() - start,
+            service=service,
+            operation=operation,
+            outcome=outcome,
+        )
+
+
+def get_route_template(request: Request) -> str:
+    # the path template of the matched route, raw paths would create a series
+    # per listing ID
+    # routes of included routers only know their path inside the router, the
+    # full template is on the route context FastAPI resolved for the request
+    context = request.scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def record_request_metrics(request: Request, call_next):
+    request_metrics = RequestMetrics(request)
+    token = current_request.set(request_metrics)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        current_request.reset(token)
+        elapsed = time.perf_counter() - start
+        route = get_route_template(request)
+        method = request.method
+        REQUEST_LATENCY.observe(
+            elapsed, method=method, route=route, status=str(status_code)
+        )
+        REQUEST_QUERIES.observe(request_metrics.queries, method=method, route=route)
+        REQUEST_DB_TIME.observe(request_metrics.db_time, method=method, route=route)
+        DB_QUERIES.inc(request_metrics.queries, route=route)
+        DB_QUERY_TIME.inc(request_metrics.db_time, route=route)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,165 @@
+"""
+Profiles single requests of allowlisted users on demand, for finding where the
+time of a slow route goes on production data.
+
+A request with the `X-Profile: 1` header is run under cProfile. The profile is
+written to `<directory>/<id>.prof` (open it with snakeviz or pstats for the call
+tree) with a `<id>.json` summary, and the response carries the `X-Profile-Id`
+and a `Server-Timing` header with the wall and CPU time and the time spent in
+route code, SQLAlchemy, pydantic and Firebase.
+
+cProfile sees every thread of the process, so coroutines of other requests
+running at the same time are in the profile as well. One request is profiled at
+a time. The middleware is only installed when an allowlist is configured.
+"""
+
+import asyncio
+import cProfile
+import json
+import pstats
+import time
+import uuid
+from pathlib import Path
+from typing import Sequence
+
+from fastapi import Request
+
+from app.core.metrics import get_route_template
+
+PROFILE_HEADER = "X-Profile"
+
+APP_DIR = str(Path(__file__).resolve().parents[1])
+
+# the first matching part of the file path decides the category, statements are
+# built and compiled in sqlalchemy/sql, run in sqlalchemy/engine and the drivers
+CATEGORIES = (
+    ("/sqlalchemy/sql/", "sqlalchemy_compile"),
+    ("/sqlalchemy/orm/", "sqlalchemy_orm"),
+    ("/sqlmodel/", "sqlalchemy_orm"),
+    ("/sqlalchemy/", "sqlalchemy_execute"),
+    ("/aiosqlite/", "sqlalchemy_execute"),
+    ("/asyncpg/", "sqlalchemy_execute"),
+    ("/pydantic/", "pydantic"),
+    ("/pydantic_core/", "pydantic"),
+    ("/firebase_admin/", "firebase"),
+    ("/google/", "firebase"),
+    (f"{APP_DIR}/providers/", "firebase"),
+    (f"{APP_DIR}/", "app"),
+)
+
+
+def categorize(filename: str) -> str:
+    for part, category in CATEGORIES:
+        if part in filename:
+            return category
+    # FastAPI, Starlette, asyncio and the rest of the standard library
+    return "other"
+
+
+def _builtin_category(name: str) -> str | None:
+    # C functions have no file, pydantic-core validators are known by their name
+    return "pydantic" if "pydantic_core" in name else None
+
+
+def summarize(stats: pstats.Stats, top: int = 30) -> tuple[dict, list]:
+    """Self time per category in seconds, and the functions with the most
+    cumulative time."""
+    categories: dict[str, float] = {}
+    for (filename, line, name), (_, _, tottime, _, callers) in stats.stats.items():
+        if filename != "~":
+            category = categorize(filename)
+        else:
+            category = _builtin_category(name)
+        if category is not None:
+            categories[category] = categories.get(category, 0.0) + tottime
+            continue
+
+        # other C functions are counted in the category of their callers
+        total = sum(caller[2] for caller in callers.values())
+        for (caller_file, _, _), caller in callers.items():
+            share = tottime * caller[2] / total if total else tottime / len(callers)
+            category = categorize(caller_file) if caller_file != "~" else "other"
+            categories[category] = categories.get(category, 0.0) + share
+        if not callers:
+            categories["other"] = categories.get("other", 0.0) + tottime
+
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    top_functions = [
+        {
+            "function": pstats.func_std_string(func),
+            "category": (
+                categorize(func[0])
+                if func[0] != "~"
+                else _builtin_category(func[2]) or "other"
+            ),
+            "calls": calls,
+            "self_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3),
+        }
+        for func, (_, calls, tottime, cumtime, _) in functions[:top]
+    ]
+    return categories, top_functions
+
+
+class RequestProfiler:
+    """HTTP middleware, runs after the authentication to know the user."""
+
+    def __init__(self, allowed_emails: Sequence[str], directory: str) -> None:
+        self.allowed_emails = set(allowed_emails)
+        self.directory = Path(directory)
+        self._active = False
+
+    def _is_requested(self, request: Request) -> bool:
+        if request.headers.get(PROFILE_HEADER) != "1" or self._active:
+            return False
+        user = getattr(request.state, "user", None) or {}
+        return user.get("email") in self.allowed_emails
+
+    async def __call__(self, request: Request, call_next):
+        if not self._is_requested(request):
+            return await call_next(request)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        profiler.enable()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._active = False
+
+        profile_id = uuid.uuid4().hex
+        categories, top_functions = summarize(pstats.Stats(profiler))
+        summary = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.url.path,
+            "route": get_route_template(request),
+            "status": response.status_code,
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "categories_ms": {
+                category: round(seconds * 1000, 3)
+                for category, seconds in sorted(categories.items())
+            },
+            "top_functions": top_functions,
+        }
+        await asyncio.to_thread(self._save, profiler, summary)
+
+        timings = {"total": wall, "cpu": cpu, **categories}
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings.items()
+        )
+        return response
+
+    def _save(self, profiler: cProfile.Profile, summary: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / f"{summary['id']}.prof")
+        (self.directory / f"{summary['id']}.json").write_text(
+            json.dumps(summary, indent=2)
+        )
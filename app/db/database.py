@@ -7,6 +7,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
 from app.core import config
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW
+from app.db.pool import InstrumentedQueuePool
+from app.db.slow_query_log import SlowQueryLog
 
 # this constructs a connection string to our database
 db_url = URL.create(
@@ -16,6 +19,7 @@ db_url = URL.create(
     host=config.config.db_host,
     port=config.config.db_port,
     database=config.config.db_name,
+    query={"prepared_statement_cache_size": str(config.config.db_statement_cache_size)},
 )
 
 # configuration for asynchronous connection to database
@@ -24,7 +28,7 @@ db_url = URL.create(
 # (sessionmaker)
 
 # upgrade connection to use SSL
-connect_args = {}
+connect_args = {"statement_cache_size": config.config.db_statement_cache_size}
 if config.config.render_env == config.Environment.PRODUCTION:
     ssl_ctx = ssl.create_default_context()
 
@@ -36,13 +40,34 @@ if config.config.render_env == config.Environment.PRODUCTION:
 
 engine = create_async_engine(
     db_url,
-    echo=True,
+    echo=config.config.db_echo,
     future=True,
     connect_args=connect_args,
+    poolclass=InstrumentedQueuePool,
+    pool_size=config.config.db_pool_size,
+    max_overflow=config.config.db_max_overflow,
+    pool_timeout=config.config.db_pool_timeout,
+    pool_recycle=config.config.db_pool_recycle,
+    pool_pre_ping=config.config.db_pool_pre_ping,
 )
 
 print(db_url)
 
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+# negative overflow means the pool is not filled up to pool_size yet
+DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
+
+# opt-in log of slow statements with their query plans
+slow_query_log = None
+if config.config.slow_query_threshold_ms is not None:
+    slow_query_log = SlowQueryLog(
+        engine,
+        threshold=config.config.slow_query_threshold_ms / 1000,
+        path=config.config.slow_query_log_path,
+        explain=config.config.slow_query_explain,
+    )
+    slow_query_log.install()
+
 # factory for creating  asynchronous sessions (AsyncSession)
 async_session = sessionmaker(
     # connection configuration0     -
@@ -54,6 +79,10 @@ async_session = sessionmaker(
 )
 
 
+def get_pool_statistics() -> dict:
+    return engine.pool.statistics()
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
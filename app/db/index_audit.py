@@ -0,0 +1,36 @@
+from typing import List
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, UniqueConstraint
+
+
+def _leading_column_sets(table: Table) -> List[List[str]]:
+    """Column lists of every index-backed structure on the table."""
+    column_lists = [
+        [column.name for column in index.columns] for index in table.indexes
+    ]
+    for constraint in table.constraints:
+        # primary keys and unique constraints are enforced with an index
+        if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint)):
+            column_lists.append([column.name for column in constraint.columns])
+    return column_lists
+
+
+def find_unindexed_foreign_keys(metadata: MetaData) -> List[str]:
+    """
+    Returns "table(column, ...)" for every foreign key whose columns do not lead
+    any index, primary key or unique constraint.
+
+    Postgres does not index foreign keys on its own, so joins on them and the
+    checks done when a referenced row is deleted scan the whole table.
+    """
+    missing = []
+    for table in metadata.sorted_tables:
+        column_lists = _leading_column_sets(table)
+        for foreign_key in table.foreign_key_constraints:
+            fk_columns = {column.name for column in foreign_key.columns}
+            if not any(
+                set(columns[: len(fk_columns)]) == fk_columns
+                for columns in column_lists
+            ):
+                missing.append(f"{table.name}({', '.join(sorted(fk_columns))})")
+    return missing
@@ -0,0 +1,74 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+# QueuePool._do_get calls itself when it loses a race for an overflow slot,
+# only the outermost call is measured
+_measuring_checkout: ContextVar[bool] = ContextVar("measuring_checkout", default=False)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long requests wait to get a connection.
+    The wait includes opening a new connection when the pool is not full yet.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        if _measuring_checkout.get():
+            return super()._do_get()
+
+        token = _measuring_checkout.set(True)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            _measuring_checkout.reset(token)
+            self._record_wait(time.perf_counter() - start)
+
+    def _record_wait(self, elapsed: float) -> None:
+        with self._stats_lock:
+            self.checkout_count += 1
+            self.wait_time_total += elapsed
+            self.wait_time_max = max(self.wait_time_max, elapsed)
+        DB_POOL_WAIT.observe(elapsed)
+
+    def statistics(self) -> dict:
+        with self._stats_lock:
+            checkout_count = self.checkout_count
+            wait_time_total = self.wait_time_total
+            wait_time_max = self.wait_time_max
+            checkout_timeouts = self.checkout_timeouts
+
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            # negative overflow means the pool is not filled up to pool_size yet
+            "overflow": max(self.overflow(), 0),
+            "checkout_count": checkout_count,
+            "checkout_timeouts": checkout_timeouts,
+            "wait_time_total": wait_time_total,
+            "wait_time_avg": (
+                wait_time_total / checkout_count if checkout_count else 0.0
+            ),
+            "wait_time_max": wait_time_max,
+        }
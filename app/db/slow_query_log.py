@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import current_request
+
+# statements run by the slow query log itself are not logged again
+_explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+
+# values that identify nothing on their own and help to reproduce a plan
+_KEPT_TYPES = (bool, int, Decimal, date, type(None))
+
+
+def redact(value: Any) -> Any:
+    """Replaces bind parameters that may hold personal data by their type and size."""
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, _KEPT_TYPES):
+        return value.isoformat() if isinstance(value, date) else value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class SlowQueryLog:
+    """
+    Writes statements slower than `threshold` seconds as JSON lines to a rotating
+    file, with redacted parameters and the route template of the request.
+
+    With `explain` set, slow SELECT statements are run again in the background
+    with EXPLAIN (ANALYZE, BUFFERS) on Postgres, or EXPLAIN QUERY PLAN on SQLite,
+    and the plan is written with the entry. The plan is captured once a connection
+    is returned to the pool, so the connection of the slow statement is never
+    shared with a request still using it. A statement is explained at most once
+    per `explain_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        threshold: float,
+        path: str,
+        explain: bool = True,
+        explain_interval: float = 60.0,
+        explain_timeout: float = 30.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        max_explained: int = 1000,
+    ) -> None:
+        self.engine = engine
+        self.threshold = threshold
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.explain_timeout = explain_timeout
+        self.max_explained = max_explained
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(f"app.slow_queries.{path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+        # statement hash -> when it was last explained, oldest first
+        self._explained_at: OrderedDict[str, float] = OrderedDict()
+        # entries waiting for their plan, (entry, statement, parameters)
+        self._pending: list[tuple[dict, str, Any]] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def install(self) -> None:
+        event.listen(
+            self.engine.sync_engine, "before_cursor_execute", self._before_execute
+        )
+        event.listen(
+            self.engine.sync_engine, "after_cursor_execute", self._after_execute
+        )
+        event.listen(self.engine.sync_engine, "checkin", self._on_checkin)
+
+    def remove(self) -> None:
+        event.remove(
+            self.engine.sync_engine, "before_cursor_execute", self._before_execute
+        )
+        event.remove(
+            self.engine.sync_engine, "after_cursor_execute", self._after_execute
+        )
+        event.remove(self.engine.sync_engine, "checkin", self._on_checkin)
+
+    async def wait(self) -> None:
+        """Waits for the plans being captured, for tests and shutdown."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if not _explaining.get():
+            conn.info["slow_query_start"] = time.perf_counter()
+
+    def _after_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if _explaining.get():
+            return
+        start = conn.info.pop("slow_query_start", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        if duration < self.threshold:
+            return
+
+        request_metrics = current_request.get()
+        entry = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "route": request_metrics.route if request_metrics else "background",
+            "statement": statement,
+            "parameters": redact(parameters),
+        }
+
+        if self.explain and not executemany and self._should_explain(statement):
+            # the connection is still in use, the plan is captured after it is
+            # returned to the pool
+            self._pending.append((entry, statement, parameters))
+        else:
+            self._write(entry)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        if not self._pending or _explaining.get():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # returned by garbage collection outside the event loop, the plans
+            # are captured on the next checkin
+            return
+        pending, self._pending = self._pending, []
+        task = loop.create_task(self._explain_and_write(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, statement: str) -> bool:
+        # EXPLAIN ANALYZE executes the statement, only plain reads are repeated,
+        # a WITH statement may contain a data-modifying CTE
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        key = hashlib.sha256(statement.encode()).hexdigest()
+        now = time.monotonic()
+
+        # dynamic filters create many statement shapes, forget the ones that
+        # may be explained again
+        while self._explained_at and (
+            len(self._explained_at) >= self.max_explained
+            or now - next(iter(self._explained_at.values())) >= self.explain_interval
+        ):
+            self._explained_at.popitem(last=False)
+
+        if key in self._explained_at:
+            return False
+        self._explained_at[key] = now
+        return True
+
+    async def _explain_and_write(self, pending: list[tuple[dict, str, Any]]) -> None:
+        _explaining.set(True)
+        for entry, statement, parameters in pending:
+            try:
+                entry["plan"] = await self._explain(statement, parameters)
+            except Exception as e:
+                entry["explain_error"] = f"{type(e).__name__}: {e}"
+            self._write(entry)
+
+    async def _explain(self, statement: str, parameters) -> Any:
+        async with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                timeout_ms = int(self.explain_timeout * 1000)
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {timeout_ms}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar_one()
+                return json.loads(plan) if isinstance(plan, str) else plan
+
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            return [list(row) for row in result.all()]
+
+    def _write(self, entry: dict) -> None:
+        self.logger.info(json.dumps(entry, default=str))
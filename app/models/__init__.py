@@ -10,5 +10,6 @@ from .listing_model import Listing
 from .rent_listing_model import RentListing
 from .sale_listing_model import SaleListing
 from .user_model import User
+from .user_rating_model import UserRating
 from .user_review_model import UserReview
 from .user_search_alert_model import UserSearchAlert
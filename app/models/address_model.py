@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship
 
 from app.schemas.address_schema import AddressBase
@@ -14,11 +15,16 @@ if TYPE_CHECKING:
 
 class Address(AddressBase, table=True):
     __tablename__ = "addresses"
+    __table_args__ = (
+        # bounding box prefilter of distance searches
+        Index("ix_addresses_latitude", "latitude"),
+        Index("ix_addresses_longitude", "longitude"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Foreign keys
-    user_id: int = Field(foreign_key="users.id")
+    user_id: int = Field(foreign_key="users.id", index=True)
 
     # Relationships
     users: "User" = Relationship(back_populates="addresses")
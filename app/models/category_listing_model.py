@@ -6,4 +6,4 @@ class CategoryListing(SQLModel, table=True):
 
     # Foreign keys
     category_id: int = Field(foreign_key="categories.id", primary_key=True)
-    listing_id: int = Field(foreign_key="listings.id", primary_key=True)
+    listing_id: int = Field(foreign_key="listings.id", primary_key=True, index=True)
@@ -13,7 +13,7 @@ class FirebaseCloudToken(SQLModel, table=True):
     token: str = Field(index=True, nullable=False)
 
     # Foreign keys
-    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE")
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", index=True)
 
     # Relationships
     user: "User" = Relationship(back_populates="firebase_cloud_tokens")
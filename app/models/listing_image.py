@@ -12,6 +12,6 @@ class ListingImage(ListingImageBase, table=True):
     __tablename__ = "listing_images"
 
     id: int = Field(default=None, primary_key=True)
-    listing_id: int = Field(foreign_key="listings.id")
+    listing_id: int = Field(foreign_key="listings.id", index=True)
 
     listing: Listing = Relationship(back_populates="images")
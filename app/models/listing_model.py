@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import TIMESTAMP, Column, func
+from sqlalchemy import TIMESTAMP, Column, Index, func
 from sqlmodel import Field, Relationship
 
 from app.models.rent_listing_model import RentListing
@@ -22,9 +22,30 @@ if TYPE_CHECKING:
 
 class Listing(ListingBase, ListingTransactionBase, table=True):
     __tablename__ = "listings"
+    __table_args__ = (
+        # pg_trgm indexes answering ILIKE '%term%' searches
+        Index(
+            "ix_listings_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_listings_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        # newest active listings, used by the listing search and search alerts
+        Index("ix_listings_listing_status_created_at", "listing_status", "created_at"),
+        # keyset pages of the listing search sorted by NOT NULL columns, scanned
+        # in either direction
+        Index("ix_listings_created_at_id", "created_at", "id"),
+        Index("ix_listings_price_id", "price", "id"),
+    )
     id: int = Field(default=None, primary_key=True)
-    seller_id: int = Field(foreign_key="users.id")
-    address_id: int = Field(foreign_key="addresses.id")
+    seller_id: int = Field(foreign_key="users.id", index=True)
+    address_id: int = Field(foreign_key="addresses.id", index=True)
 
     images: List["ListingImage"] = Relationship(back_populates="listing")
 
@@ -15,9 +15,9 @@ class RentListing(SQLModel, ListingTransactionBase, table=True):
     id: int = Field(default=None, primary_key=True)
 
     # Foreign keys
-    buyer_id: int = Field(foreign_key="users.id")
-    listing_id: int = Field(foreign_key="listings.id")
-    address_id: int = Field(foreign_key="addresses.id")
+    buyer_id: int = Field(foreign_key="users.id", index=True)
+    listing_id: int = Field(foreign_key="listings.id", index=True)
+    address_id: int = Field(foreign_key="addresses.id", index=True)
 
     start_date: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -16,8 +16,8 @@ class SaleListing(SQLModel, ListingTransactionBase, table=True):
 
     # Foreign keys
     buyer_id: int = Field(foreign_key="users.id")
-    listing_id: int = Field(foreign_key="listings.id")
-    address_id: int = Field(foreign_key="addresses.id")
+    listing_id: int = Field(foreign_key="listings.id", index=True)
+    address_id: int = Field(foreign_key="addresses.id", index=True)
 
     sold_date: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -0,0 +1,20 @@
+from decimal import Decimal
+
+from sqlmodel import Field, SQLModel
+
+
+class UserRating(SQLModel, table=True):
+    """
+    Aggregate of the reviews a user received.
+    It is kept up to date by the UserReview flush listener, so reading a seller
+    rating does not need to aggregate the whole userReviews table.
+    """
+
+    __tablename__ = "userRatings"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True, ondelete="CASCADE")
+    rating_sum: int = Field(default=0)
+    rating_count: int = Field(default=0)
+    avg_rating: Decimal | None = Field(
+        default=None, max_digits=3, decimal_places=2, index=True
+    )
@@ -1,9 +1,14 @@
+from collections import defaultdict
 from datetime import UTC, datetime, timezone
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import TIMESTAMP, Column
+from sqlalchemy import TIMESTAMP, Column, event, func, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
 from sqlmodel import Field, Relationship, SQLModel
 
+from .user_rating_model import UserRating
+
 if TYPE_CHECKING:
     from .user_model import User
 
@@ -24,8 +29,12 @@ class UserReview(SQLModel, table=True):
         default=None, sa_column=Column(TIMESTAMP(timezone=True), nullable=True)
     )
     # Foreign keys
-    reviewer_id: int | None = Field(foreign_key="users.id", ondelete="SET NULL")
-    reviewee_id: int | None = Field(foreign_key="users.id", ondelete="SET NULL")
+    reviewer_id: int | None = Field(
+        foreign_key="users.id", ondelete="SET NULL", index=True
+    )
+    reviewee_id: int | None = Field(
+        foreign_key="users.id", ondelete="SET NULL", index=True
+    )
 
     # Relationships
     reviewer: Optional["User"] = Relationship(
@@ -37,3 +46,78 @@ class UserReview(SQLModel, table=True):
         back_populates="reviews_received",
         sa_relationship_kwargs={"primaryjoin": "UserReview.reviewee_id == User.id"},
     )
+
+
+def _original_value(review: UserReview, key: str):
+    """Returns the value the attribute had in the database before this flush."""
+    history = inspect(review).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def update_user_ratings(session: Session, flush_context) -> None:
+    """
+    Applies the rating changes of flushed reviews to the userRatings aggregate.
+    Runs inside the flush, so the aggregate is committed together with the reviews.
+    """
+    # reviewee_id -> [rating sum delta, rating count delta]
+    deltas: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+
+    for review in session.new:
+        if isinstance(review, UserReview) and review.reviewee_id is not None:
+            deltas[review.reviewee_id][0] += review.rating
+            deltas[review.reviewee_id][1] += 1
+
+    for review in session.deleted:
+        if isinstance(review, UserReview):
+            reviewee_id = _original_value(review, "reviewee_id")
+            if reviewee_id is not None:
+                deltas[reviewee_id][0] -= _original_value(review, "rating")
+                deltas[reviewee_id][1] -= 1
+
+    for review in session.dirty:
+        if not isinstance(review, UserReview):
+            continue
+        old_reviewee_id = _original_value(review, "reviewee_id")
+        old_rating = _original_value(review, "rating")
+        if old_reviewee_id == review.reviewee_id and old_rating == review.rating:
+            continue
+        if old_reviewee_id is not None:
+            deltas[old_reviewee_id][0] -= old_rating
+            deltas[old_reviewee_id][1] -= 1
+        if review.reviewee_id is not None:
+            deltas[review.reviewee_id][0] += review.rating
+            deltas[review.reviewee_id][1] += 1
+
+    if not deltas:
+        return
+
+    connection = session.connection()
+    dialect_insert = (
+        postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    )
+    for user_id, (sum_delta, count_delta) in deltas.items():
+        if sum_delta == 0 and count_delta == 0:
+            continue
+        # make sure the aggregate row exists, concurrent flushes may race on it
+        connection.execute(
+            dialect_insert(UserRating)
+            .values(user_id=user_id, rating_sum=0, rating_count=0)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        # relative update keeps the aggregate correct under concurrent reviews
+        new_sum = UserRating.rating_sum + sum_delta
+        new_count = UserRating.rating_count + count_delta
+        connection.execute(
+            update(UserRating)
+            .where(UserRating.user_id == user_id)
+            .values(
+                rating_sum=new_sum,
+                rating_count=new_count,
+                avg_rating=func.round(new_sum * 1.0 / func.nullif(new_count, 0), 2),
+            )
+        )
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import TIMESTAMP, Column
+from sqlalchemy import TIMESTAMP, Column, Index
 from sqlmodel import Field, Relationship
 
 from app.schemas.user_search_alerts import UserSearchAlertBase
@@ -12,6 +12,14 @@ if TYPE_CHECKING:
 
 class UserSearchAlert(UserSearchAlertBase, table=True):
     __tablename__ = "userSearchAlerts"
+    __table_args__ = (
+        # due alerts polled by the scheduler
+        Index(
+            "ix_userSearchAlerts_is_active_last_notified_at",
+            "is_active",
+            "last_notified_at",
+        ),
+    )
 
     id: int = Field(default=None, primary_key=True)
     created_at: datetime = Field(
@@ -24,7 +32,7 @@ class UserSearchAlert(UserSearchAlertBase, table=True):
     )  # Used to track the last time the user was notified about new listings that match their search alert.
 
     # Foreign keys
-    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE")
+    user_id: int = Field(foreign_key="users.id", ondelete="CASCADE", index=True)
 
     # Relationships
     user: "User" = Relationship(back_populates="search_alerts")
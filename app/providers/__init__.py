@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+from app.core import config
+from app.providers.base import AuthProvider, StorageProvider
+from app.providers.fake import (
+    FakeAuthProvider,
+    FakeMessagingSender,
+    FakeStorageProvider,
+    FaultInjector,
+    load_or_create_key,
+)
+from app.providers.firebase import FirebaseAuthProvider, FirebaseStorageProvider
+from app.services.notifications.senders import FirebaseSender, NotificationSender
+
+
+@dataclass
+class Providers:
+    """External services used by the app, selected by the `firebase_provider` setting."""
+
+    auth: AuthProvider
+    storage: StorageProvider
+    messaging: NotificationSender
+
+    def initialize(self) -> None:
+        self.auth.initialize()
+
+
+def create_providers(settings: config.Settings) -> Providers:
+    if settings.firebase_provider == "fake":
+        key = load_or_create_key(settings.fake_firebase_key_path)
+
+        # every service gets its own injector, so failures are counted per service
+        def faults() -> FaultInjector:
+            return FaultInjector(
+                settings.fake_firebase_latency, settings.fake_firebase_error_rate
+            )
+
+        return Providers(
+            auth=FakeAuthProvider(key, faults()),
+            storage=FakeStorageProvider(
+                key, faults(), directory=settings.fake_firebase_storage_dir
+            ),
+            messaging=FakeMessagingSender(faults()),
+        )
+
+    return Providers(
+        auth=FirebaseAuthProvider(),
+        storage=FirebaseStorageProvider(),
+        messaging=FirebaseSender(),
+    )
+
+
+providers = create_providers(config.config)
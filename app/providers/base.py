@@ -0,0 +1,23 @@
+from datetime import timedelta
+from typing import Any, Protocol
+
+
+class AuthProvider(Protocol):
+    """Verifies ID tokens sent by the clients."""
+
+    def initialize(self) -> None: ...
+
+    def verify_id_token(self, token: str) -> dict[str, Any]:
+        """
+        Returns the decoded claims of a valid token, including `uid`.
+        Blocking, the token verifier runs it in a worker thread.
+        """
+        ...
+
+
+class StorageProvider(Protocol):
+    """Image storage, the clients upload images directly and read them by signed URLs."""
+
+    def sign_url(self, path: str, expiration: timedelta) -> str: ...
+
+    def delete(self, path: str) -> None: ...
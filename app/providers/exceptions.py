@@ -0,0 +1,14 @@
+# exceptions.py
+
+from firebase_admin import exceptions
+
+
+class ProviderUnavailable(exceptions.UnavailableError):
+    """
+    Raised by the fake providers when a failure is injected. It is a Firebase
+    error, so callers handle it the same way as an outage of the real service.
+    """
+
+    def __init__(self, operation: str) -> None:
+        super().__init__(f"Injected failure of {operation}.")
+        self.operation = operation
@@ -0,0 +1,238 @@
+"""
+In-process stand-ins for Firebase auth, storage and messaging.
+
+They do the same kind of work as the real services (RSA signed JWTs and URLs)
+without any network access, and can add latency and fail on purpose, so load
+tests can run offline and measure how the API behaves when the services are slow.
+"""
+
+import base64
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, List
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import jwt
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from firebase_admin import auth
+
+from app.providers.exceptions import ProviderUnavailable
+from app.services.notifications.senders import (
+    FakeSender,
+    PushNotification,
+    TokenResponse,
+)
+
+PROJECT_ID = "mtaa-project-fake"
+ISSUER = f"https://securetoken.google.com/{PROJECT_ID}"
+
+
+def load_or_create_key(path: str | None = None) -> rsa.RSAPrivateKey:
+    """
+    Returns the RSA key from the PEM file at `path`, creating the file when it
+    does not exist. Processes sharing the file accept each other's tokens.
+    Without a path the key only lives in this process.
+    """
+    if path is not None and Path(path).exists():
+        return serialization.load_pem_private_key(Path(path).read_bytes(), None)
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if path is not None:
+        Path(path).write_bytes(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return key
+
+
+class FaultInjector:
+    """Adds latency to every call and fails a share of them."""
+
+    def __init__(
+        self, latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: Counter[str] = Counter()
+        self.failures: Counter[str] = Counter()
+
+    def __call__(self, operation: str) -> None:
+        """Raises ProviderUnavailable when the call of `operation` should fail."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[operation] += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.failures[operation] += 1
+        if failed:
+            raise ProviderUnavailable(operation)
+
+
+class FakeAuthProvider:
+    """Issues and verifies ID tokens signed by a local RSA key."""
+
+    def __init__(
+        self, private_key: rsa.RSAPrivateKey, faults: FaultInjector | None = None
+    ) -> None:
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        self.faults = faults or FaultInjector()
+
+    def initialize(self) -> None:
+        pass
+
+    def issue_token(
+        self,
+        email: str,
+        uid: str | None = None,
+        expires_in: timedelta = timedelta(hours=1),
+    ) -> str:
+        """Returns an ID token with the same claims as a Firebase one."""
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER,
+            "aud": PROJECT_ID,
+            "sub": uid or email,
+            "email": email,
+            "email_verified": True,
+            "auth_time": now,
+            "iat": now,
+            "exp": now + int(expires_in.total_seconds()),
+        }
+        return jwt.encode(
+            claims, self.private_key, algorithm="RS256", headers={"kid": "fake"}
+        )
+
+    def verify_id_token(self, token: str) -> dict[str, Any]:
+        self.faults("auth.verify_id_token")
+        try:
+            claims = jwt.decode(
+                token,
+                self.public_key,
+                algorithms=["RS256"],
+                audience=PROJECT_ID,
+                issuer=ISSUER,
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise auth.ExpiredIdTokenError("Token expired.", e)
+        except jwt.InvalidTokenError as e:
+            raise auth.InvalidIdTokenError(f"Invalid token: {e}", e)
+        # the same as firebase_admin.auth.verify_id_token
+        claims["uid"] = claims["sub"]
+        return claims
+
+
+class FakeStorageProvider:
+    """
+    Blob store kept in memory, or on disk when `directory` is set, with URLs
+    signed by a local RSA key. Deleting a missing blob is ignored, so datasets
+    with generated image paths work without the image files.
+    """
+
+    def __init__(
+        self,
+        private_key: rsa.RSAPrivateKey,
+        faults: FaultInjector | None = None,
+        directory: str | None = None,
+        base_url: str = "https://storage.fake.local",
+    ) -> None:
+        self.private_key = private_key
+        self.faults = faults or FaultInjector()
+        self.directory = Path(directory) if directory else None
+        self.base_url = base_url
+        self._blobs: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, path: str) -> Path:
+        return self.directory / quote(path, safe="")
+
+    def put(self, path: str, data: bytes) -> None:
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file(path).write_bytes(data)
+        else:
+            with self._lock:
+                self._blobs[path] = data
+
+    def get(self, path: str) -> bytes:
+        """Raises KeyError if the blob doesn't exist."""
+        if self.directory:
+            try:
+                return self._file(path).read_bytes()
+            except FileNotFoundError:
+                raise KeyError(path)
+        with self._lock:
+            return self._blobs[path]
+
+    def exists(self, path: str) -> bool:
+        if self.directory:
+            return self._file(path).exists()
+        with self._lock:
+            return path in self._blobs
+
+    def delete(self, path: str) -> None:
+        self.faults("storage.delete")
+        if self.directory:
+            self._file(path).unlink(missing_ok=True)
+        else:
+            with self._lock:
+                self._blobs.pop(path, None)
+
+    def _signature(self, path: str, expires: int) -> bytes:
+        return self.private_key.sign(
+            f"{path}\n{expires}".encode(), padding.PKCS1v15(), hashes.SHA256()
+        )
+
+    def sign_url(self, path: str, expiration: timedelta) -> str:
+        self.faults("storage.sign_url")
+        expires = int(time.time() + expiration.total_seconds())
+        signature = base64.urlsafe_b64encode(self._signature(path, expires)).decode()
+        return f"{self.base_url}/{quote(path)}?expires={expires}&signature={signature}"
+
+    def verify_url(self, url: str) -> str:
+        """Returns the blob path of a valid signed URL, raises ValueError otherwise."""
+        parts = urlsplit(url)
+        path = unquote(parts.path.removeprefix(urlsplit(self.base_url).path + "/"))
+        query = parse_qs(parts.query)
+        try:
+            expires = int(query["expires"][0])
+            signature = base64.urlsafe_b64decode(query["signature"][0])
+            self.private_key.public_key().verify(
+                signature,
+                f"{path}\n{expires}".encode(),
+                padding.PKCS1v15(),
+                hashes.SHA256(),
+            )
+        except (KeyError, ValueError, InvalidSignature):
+            raise ValueError("Invalid URL signature.")
+        if expires < time.time():
+            raise ValueError("Signed URL expired.")
+        return path
+
+
+class FakeMessagingSender(FakeSender):
+    """Records sent notifications, see FakeSender, with injected latency and errors."""
+
+    def __init__(
+        self,
+        faults: FaultInjector | None = None,
+        invalid_tokens: set[str] | None = None,
+    ) -> None:
+        super().__init__(invalid_tokens=invalid_tokens)
+        self.faults = faults or FaultInjector()
+
+    def send(self, notification: PushNotification) -> List[TokenResponse]:
+        self.faults("messaging.send")
+        return super().send(notification)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from typing import Any
+
+from firebase_admin import _apps, auth, credentials, initialize_app, storage
+
+SERVICE_ACCOUNT_PATH = "./mtaa-project-service-account.json"
+# https://firebase.google.com/docs/storage/admin/start
+STORAGE_BUCKET = "mtaa-project-5235a.firebasestorage.app"
+
+
+class FirebaseAuthProvider:
+    """Verifies Firebase ID tokens, initializes the default Firebase app."""
+
+    def initialize(self) -> None:
+        if not _apps:
+            cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
+            initialize_app(cred, {"storageBucket": STORAGE_BUCKET})
+
+    def verify_id_token(self, token: str) -> dict[str, Any]:
+        # the auth client of the app keeps Google's public certificates cached in
+        # memory (honoring their max-age), so only the first verification after
+        # a key rotation downloads them
+        return auth.verify_id_token(token)
+
+
+class FirebaseStorageProvider:
+    """Images in the default bucket of Firebase Storage."""
+
+    def sign_url(self, path: str, expiration: timedelta) -> str:
+        blob = storage.bucket().blob(path)
+        return blob.generate_signed_url(
+            version="v4", expiration=expiration, method="GET"
+        )
+
+    def delete(self, path: str) -> None:
+        """Raises google.cloud.exceptions.NotFound if the blob doesn't exist."""
+        storage.bucket().blob(path).delete()
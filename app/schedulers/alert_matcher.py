@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, List
+
+from app.models.enums.listing_status import ListingStatus
+from app.models.enums.offer_type import OfferType
+
+
+@dataclass
+class ListingCandidate:
+    """Fields of a new listing needed to evaluate search alert filters."""
+
+    id: int
+    title: str
+    description: str
+    price: Decimal
+    offer_type: OfferType
+    listing_status: ListingStatus
+    created_at: datetime
+    seller_rating: float = 0
+    category_ids: set[int] = field(default_factory=set)
+    country: str | None = None
+    city: str | None = None
+    street: str | None = None
+
+
+def listing_matches_filters(
+    listing: ListingCandidate, product_filters: dict[str, Any], since: datetime
+) -> bool:
+    """
+    Evaluates the product filters of a search alert against one listing in memory.
+    Mirrors the filters the listing search applies in SQL.
+    """
+    # listings created after the last notification, compared with second precision
+    if listing.created_at.replace(microsecond=0) < since.replace(microsecond=0):
+        return False
+
+    for key, value in product_filters.items():
+        if key == "category_ids":
+            if isinstance(value, list) and value:
+                # at least one of the selected categories
+                if listing.category_ids.isdisjoint(value):
+                    return False
+        elif key == "offer_type":
+            if listing.offer_type != value:
+                return False
+        elif key == "listing_status":
+            if listing.listing_status != value:
+                return False
+        elif key == "min_price":
+            if listing.price < value:
+                return False
+        elif key == "max_price":
+            if listing.price > value:
+                return False
+        elif key == "search":
+            term = value.lower()
+            if (
+                term not in listing.title.lower()
+                and term not in listing.description.lower()
+            ):
+                return False
+        elif key == "min_rating":
+            if listing.seller_rating < value:
+                return False
+        elif key == "country":
+            if listing.country != value:
+                return False
+        elif key == "city":
+            if listing.city != value:
+                return False
+        elif key == "street":
+            if listing.street != value:
+                return False
+
+    return True
+
+
+def find_matching_listings(
+    listings: Iterable[ListingCandidate],
+    product_filters: dict[str, Any],
+    since: datetime,
+) -> List[ListingCandidate]:
+    return [
+        listing
+        for listing in listings
+        if listing_matches_filters(listing, product_filters, since)
+    ]
@@ -2,128 +2,124 @@ import urllib.parse
 from datetime import UTC, datetime, timedelta
 from typing import List
 
-from firebase_admin import exceptions, messaging
-from sqlalchemy import asc, desc, func, or_, select
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.db.database import async_session
 from app.models import Listing, UserSearchAlert
 from app.models.address_model import Address
-from app.models.category_model import Category
+from app.models.category_listing_model import CategoryListing
 from app.models.enums.listing_status import ListingStatus
 from app.models.user_model import User
+from app.providers import providers
+from app.schedulers.alert_matcher import ListingCandidate, find_matching_listings
+from app.services.notifications.dispatcher import (
+    NotificationDispatcher,
+    delete_invalid_tokens,
+)
+from app.services.notifications.senders import PushNotification
 from app.services.user.user_service import UserService
 
 
-async def notify_user_search_alerts():
+async def get_listing_candidates(
+    session: AsyncSession, since: datetime
+) -> List[ListingCandidate]:
+    """
+    Loads the active listings created since `since` with everything the alert
+    filters need, using one query for listings and one for their categories.
+    """
+    rating_subquery = UserService.get_seller_rating_subquery()
+    rating_val = func.coalesce(rating_subquery.c.avg_rating, 0).label("seller_rating")
+    new_listing_conditions = (
+        Listing.listing_status == ListingStatus.ACTIVE,
+        # second precision, the same as the per alert comparison
+        Listing.created_at >= since.replace(microsecond=0),
+    )
+
+    result = await session.execute(
+        select(
+            Listing.id,
+            Listing.title,
+            Listing.description,
+            Listing.price,
+            Listing.offer_type,
+            Listing.listing_status,
+            Listing.created_at,
+            rating_val,
+            Address.country,
+            Address.city,
+            Address.street,
+        )
+        .outerjoin(Address, Address.id == Listing.address_id)
+        .outerjoin(rating_subquery, rating_subquery.c.seller_id == Listing.seller_id)
+        .where(*new_listing_conditions)
+    )
+    candidates = {row.id: ListingCandidate(**row._mapping) for row in result.all()}
+    if not candidates:
+        return []
+
+    result = await session.execute(
+        select(CategoryListing.listing_id, CategoryListing.category_id)
+        .join(Listing, Listing.id == CategoryListing.listing_id)
+        .where(*new_listing_conditions)
+    )
+    for listing_id, category_id in result.all():
+        if listing_id in candidates:
+            candidates[listing_id].category_ids.add(category_id)
+
+    return list(candidates.values())
+
+
+def get_due_alerts_query(time_limit: datetime):
+    """Returns the active alerts last notified before `time_limit`, with user tokens."""
+    return (
+        select(UserSearchAlert)
+        .options(
+            selectinload(UserSearchAlert.user).selectinload(User.firebase_cloud_tokens)
+        )
+        .where(
+            UserSearchAlert.last_notified_at < time_limit,
+            UserSearchAlert.is_active == True,
+        )
+    )
+
+
+notification_dispatcher = NotificationDispatcher(providers.messaging)
+
+
+async def notify_user_search_alerts(
+    dispatcher: NotificationDispatcher = notification_dispatcher,
+):
     async with async_session() as session:
         now = datetime.now(UTC)
         time_limits = now - timedelta(minutes=1)  # 1 minute
         # Fetch user search alerts that haven't been notified in the last 2 hours
-        result = await session.execute(
-            select(UserSearchAlert)
-            .options(
-                selectinload(UserSearchAlert.user).selectinload(
-                    User.firebase_cloud_tokens
-                )
-            )
-            .where(
-                UserSearchAlert.last_notified_at < time_limits,
-                UserSearchAlert.is_active == True,
-            )
-        )
+        result = await session.execute(get_due_alerts_query(time_limits))
         search_alerts: List[UserSearchAlert] = result.scalars().all()
+        if not search_alerts:
+            return
+
+        # Listings are loaded once for all alerts, starting at the oldest
+        # notification, and every alert is then matched against them in memory.
+        since = min(s_alert.last_notified_at for s_alert in search_alerts)
+        candidates = await get_listing_candidates(session, since)
+        print(f"Evaluating {len(search_alerts)} alerts on {len(candidates)} listings")
 
+        notifications: List[PushNotification] = []
+        notified_alerts: List[UserSearchAlert] = []
         for s_alert in search_alerts:
             if not s_alert.is_active:
                 s_alert.last_notified_at = now
                 continue
-            # Build the query to find new listings that match the search alert
-            rating_subquery = UserService.get_seller_rating_subquery()
-            rating_val = func.coalesce(
-                func.round(rating_subquery.c.avg_rating, 2), 0
-            ).label("seller_rating")
-
-            query = (
-                select(Listing, rating_val)
-                .outerjoin(
-                    rating_subquery,
-                    rating_subquery.c.seller_id == Listing.seller_id,
-                )
-                .options(
-                    selectinload(Listing.address),
-                    selectinload(Listing.categories),
-                    selectinload(Listing.seller),
-                )
-                .where(
-                    Listing.listing_status == ListingStatus.ACTIVE,
-                    func.date_trunc("second", Listing.created_at)
-                    >= func.date_trunc(
-                        "second", s_alert.last_notified_at
-                    ),  # Listing created after last notified time
-                )
-            )
-
-            # Iterate over each key in product_filters and build a condition based on the key name
-            for key, value in s_alert.product_filters.items():
-                if key == "category_ids" and len(value) > 0:
-                    # Filter listings that have at least one category with the given IDs.
-                    if isinstance(value, list) and value:
-                        query = query.where(
-                            Listing.categories.any(Category.id.in_(value))
-                        )
-                elif key == "offer_type":
-                    query = query.where(Listing.offer_type == value)
-                elif key == "listing_status":
-                    query = query.where(Listing.listing_status == value)
-                elif key == "min_price":
-                    query = query.where(Listing.price >= value)
-                elif key == "max_price":
-                    query = query.where(Listing.price <= value)
-                elif key == "search":
-                    # Assuming Listing has title and description fields
-                    query = query.where(
-                        Listing.title.ilike(f"%{value}%")
-                        # or_(
-                        #     Listing.title.ilike(f"%{value}%"),
-                        #     # Listing.description.ilike(f"%{value}%"),
-                        # )
-                    )
 
-                elif key == "min_rating":
-                    query = query.where(rating_val >= value)
-                elif key == "country":
-                    query = query.where(Listing.address.has(Address.country == value))
-                elif key == "city":
-                    query = query.where(Listing.address.has(Address.city == value))
-                elif key == "street":
-                    query = query.where(Listing.address.has(Address.street == value))
-
-                # Sorting:
-                sort_columns = {
-                    "created_at": Listing.created_at,
-                    "updated_at": Listing.updated_at,
-                    "price": Listing.price,
-                    "rating": rating_val,
-                }
-                if key == "sort_by":
-                    if value == "asc":
-                        query = query.order_by(
-                            asc(sort_columns.get(value, Listing.updated_at))
-                        )
-                    elif value == "desc":
-                        query = query.order_by(
-                            desc(sort_columns.get(value, Listing.updated_at))
-                        )
-
-            # Execute the query to find matching listings
-            result = await session.execute(query)
-            listings: List[Listing] = result.scalars().all()
+            listings = find_matching_listings(
+                candidates, s_alert.product_filters, s_alert.last_notified_at
+            )
             print("----------------------------------")
             print(f"Found {len(listings)} listings matching the search alert.")
             print(f"Search Alert ID: {s_alert.id}")
             print(f"Search Alert Filters: {s_alert.product_filters}")
-            print(listings)
             print("----------------------------------")
 
             if listings:
@@ -142,44 +138,29 @@ async def notify_user_search_alerts():
                     for t in s_alert.user.firebase_cloud_tokens
                     if isinstance(t.token, str) and t.token
                 ]
-                messaging.AndroidConfig(
-                    priority="high",
-                    notification=messaging.AndroidNotification(
-                        channel_id="default",
-                        sound="default",
-                    ),
-                )
-                message = messaging.MulticastMessage(
-                    notification=messaging.Notification(
+                notifications.append(
+                    PushNotification(
+                        tokens=token_strings,
                         title="New Listings Alert",
                         body=f"{len(listings)} new listings match your search criteria. Tap to view details.",
-                    ),
-                    data={
-                        "deep_link": deep_link_url,
-                        # "offer_type": s_alert.product_filters.get(
-                        #     "offer_type", "Unknown offer type"
-                        # ),
-                    },
-                    android=messaging.AndroidConfig(
-                        priority="high",
-                        notification=messaging.AndroidNotification(
-                            channel_id="high-priority-alerts",
-                            sound="default",
-                        ),
-                    ),
-                    tokens=token_strings,
-                )
-                try:
-                    # https://firebase.google.com/docs/reference/admin/python/firebase_admin.messaging
-                    response = messaging.send_each_for_multicast(message)
-                    print(
-                        f"Successfully sent multicast: {response.success_count} messages"
+                        data={"deep_link": deep_link_url},
                     )
-                    s_alert.last_notified_at = now
-                except exceptions.FirebaseError as firebase_error:
-                    print(f"Error sending to FCM: {firebase_error}")
-                # Update the last notified time
-                except ValueError as value_error:
-                    print("Invalid message parameters: ", value_error)
+                )
+                notified_alerts.append(s_alert)
+
+            # Every evaluated alert starts from here on the next run, an alert
+            # left behind would load the listings since its time on every run
+            s_alert.last_notified_at = now
+
+        # All notifications are sent concurrently, off the event loop
+        results = await dispatcher.dispatch(notifications)
+        invalid_tokens = []
+        for s_alert, result in zip(notified_alerts, results):
+            print(
+                f"Alert {s_alert.id}: sent {result.success_count} messages, "
+                f"{result.failure_count} failed"
+            )
+            invalid_tokens.extend(result.invalid_tokens)
 
+        await delete_invalid_tokens(session, invalid_tokens)
         await session.commit()
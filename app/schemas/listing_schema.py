@@ -111,7 +111,7 @@ class AlertQuery(BaseModel):
     time_from: datetime | None = Field(default=None)  # filter by timestamp)
 
     # sort by options
-    sort_by: str = "created_at"  # updated_at, price, rating, location
+    sort_by: str = "created_at"  # updated_at, price, rating, location, relevance
     sort_order: str = "desc"  # asc, desc
     search: str | None = None
 
@@ -131,6 +131,8 @@ class AlertQueryCreate(AlertQuery):
 class ListingQueryParameters(AlertQuery):
     limit: int = 10
     offset: int = 0
+    # opaque keyset cursor returned in the X-Next-Cursor header, replaces offset
+    cursor: str | None = None
 
     user_latitude: Latitude | None = None
     user_longitude: Longitude | None = None
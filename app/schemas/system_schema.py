@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class PoolStatistics(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkout_count: int  # connections handed out since start
+    checkout_timeouts: int
+    # seconds spent waiting for a connection
+    wait_time_total: float
+    wait_time_avg: float
+    wait_time_max: float
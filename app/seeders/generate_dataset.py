@@ -0,0 +1,604 @@
+"""
+Generates a synthetic dataset at a configurable scale for load tests and benchmarks.
+
+Run with:
+    python -m app.seeders.generate_dataset --users 100000 --listings 2000000 --seed 42
+
+Rows are written with multi-row inserts, or with COPY on Postgres, in batches.
+The same seed always produces the same dataset, so benchmark runs are comparable.
+Tables are appended to, IDs continue after the existing rows.
+"""
+
+import argparse
+import asyncio
+import bisect
+import enum
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models import (
+    Address,
+    Category,
+    CategoryListing,
+    FavoriteListing,
+    FirebaseCloudToken,
+    Listing,
+    ListingImage,
+    ListingStatus,
+    OfferType,
+    RentListing,
+    SaleListing,
+    User,
+    UserReview,
+    UserSearchAlert,
+)
+
+# (city, latitude, longitude, share of users)
+CITIES = [
+    ("Bratislava", 48.1486, 17.1077, 0.30),
+    ("Košice", 48.7164, 21.2611, 0.15),
+    ("Prešov", 48.9985, 21.2339, 0.08),
+    ("Žilina", 49.2231, 18.7394, 0.08),
+    ("Nitra", 48.3069, 18.0864, 0.07),
+    ("Banská Bystrica", 48.7395, 19.1535, 0.07),
+    ("Trnava", 48.3774, 17.5883, 0.06),
+    ("Trenčín", 48.8945, 18.0444, 0.05),
+    ("Martin", 49.0665, 18.9238, 0.04),
+    ("Poprad", 49.0614, 20.2980, 0.04),
+    ("Vienna", 48.2082, 16.3738, 0.03),
+    ("Prague", 50.0755, 14.4378, 0.03),
+]
+# standard deviation of addresses around the city center, in degrees
+CITY_SPREAD = 0.04
+
+CATEGORY_NAMES = [
+    "Elektronika",
+    "Bicykle",
+    "Nábytok",
+    "Oblečenie",
+    "Šport",
+    "Knihy",
+    "Hračky",
+    "Záhrada",
+    "Autá",
+    "Náradie",
+    "Hudba",
+    "Kuchyňa",
+    "Nehnuteľnosti",
+    "Zvieratá",
+    "Hobby",
+]
+FIRST_NAMES = ["Adam", "Anna", "Boris", "Eva", "Filip", "Jana", "Marek", "Zuzana"]
+LAST_NAMES = ["Novák", "Horváth", "Kováč", "Varga", "Tóth", "Nagy", "Baláž", "Szabó"]
+ADJECTIVES = ["Nový", "Zachovalý", "Starší", "Horský", "Detský", "Elektrický", "Veľký"]
+NOUNS = ["bicykel", "stôl", "telefón", "notebook", "stan", "gauč", "bunda", "vŕtačka"]
+
+LISTING_STATUS_WEIGHTS = {
+    ListingStatus.ACTIVE: 0.80,
+    ListingStatus.SOLD: 0.08,
+    ListingStatus.RENTED: 0.05,
+    ListingStatus.HIDDEN: 0.05,
+    ListingStatus.REMOVED: 0.02,
+}
+OFFER_TYPE_WEIGHTS = {OfferType.BUY: 0.6, OfferType.RENT: 0.3, OfferType.BOTH: 0.1}
+# reviews lean positive, as on most marketplaces
+RATING_WEIGHTS = {1: 0.03, 2: 0.05, 3: 0.12, 4: 0.35, 5: 0.45}
+
+
+@dataclass
+class DatasetConfig:
+    users: int = 1_000
+    listings: int = 20_000
+    seed: int = 42
+    batch_size: int = 5_000
+    reviews_per_user: float = 2.0
+    favorites_per_user: float = 5.0
+    alert_ratio: float = 0.1  # share of users with a search alert
+    # skew of seller activity and listing popularity, higher is more skewed
+    zipf_exponent: float = 1.1
+    # email of the first generated user, e.g. the user of the TESTING auth bypass
+    first_user_email: str | None = None
+
+
+def zipf_cum_weights(count: int, exponent: float) -> List[float]:
+    """Cumulative weights where item `i` is chosen proportionally to 1 / (i + 1)^s."""
+    return list(
+        itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count))
+    )
+
+
+def choose(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_categories(first_id: int, existing: Iterable[str]) -> Iterator[dict]:
+    names = [name for name in CATEGORY_NAMES if name not in set(existing)]
+    for offset, name in enumerate(names):
+        yield {"id": first_id + offset, "name": name}
+
+
+def generate_users(
+    rng: random.Random, first_id: int, count: int, first_email: str | None = None
+) -> Iterator[dict]:
+    for user_id in range(first_id, first_id + count):
+        email = f"user{user_id}@dataset.test"
+        if first_email and user_id == first_id:
+            email = first_email
+        yield {
+            "id": user_id,
+            "firstname": rng.choice(FIRST_NAMES),
+            "lastname": rng.choice(LAST_NAMES),
+            "email": email,
+            "phone_number": f"+4219{rng.randrange(10**8):08d}",
+        }
+
+
+def generate_addresses(
+    rng: random.Random, first_id: int, user_ids: range
+) -> Iterator[dict]:
+    """One primary address per user, clustered around the cities."""
+    city_weights = [share for *_, share in CITIES]
+    for address_id, user_id in zip(itertools.count(first_id), user_ids):
+        city, latitude, longitude, _ = rng.choices(CITIES, weights=city_weights)[0]
+        yield {
+            "id": address_id,
+            "user_id": user_id,
+            "is_primary": True,
+            "visibility": True,
+            "country": "SK",
+            "city": city,
+            "street": f"Ulica {rng.randrange(1, 200)}",
+            "postal_code": f"{rng.randrange(80000, 99999)}",
+            "latitude": round(rng.gauss(latitude, CITY_SPREAD), 6),
+            "longitude": round(rng.gauss(longitude, CITY_SPREAD), 6),
+        }
+
+
+def generate_listings(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    user_ids: range,
+    first_address_id: int,
+    seller_cum_weights: List[float],
+    now: datetime,
+) -> Iterator[dict]:
+    """Listings of skewed sellers, newer listings are more frequent."""
+    for listing_id in range(first_id, first_id + count):
+        seller_index = rng.choices(
+            range(len(user_ids)), cum_weights=seller_cum_weights
+        )[0]
+        created_at = now - timedelta(days=min(rng.expovariate(1 / 60), 365))
+        yield {
+            "id": listing_id,
+            "title": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {listing_id}",
+            "description": " ".join(rng.choices(NOUNS + ADJECTIVES, k=20)),
+            "price": Decimal(f"{rng.lognormvariate(4, 1.2):.2f}").min(
+                Decimal("99999999.99")
+            ),
+            "offer_type": choose(rng, OFFER_TYPE_WEIGHTS),
+            "listing_status": choose(rng, LISTING_STATUS_WEIGHTS),
+            "seller_id": user_ids[seller_index],
+            # sellers list from their primary address
+            "address_id": first_address_id + seller_index,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def generate_listing_relations(
+    rng: random.Random,
+    listings: List[dict],
+    first_image_id: int,
+    category_ids: List[int],
+) -> tuple[List[dict], List[dict]]:
+    """Images and category links of a batch of listings."""
+    images, categories = [], []
+    image_ids = itertools.count(first_image_id)
+    for listing in listings:
+        for position in range(rng.randint(1, 5)):
+            images.append(
+                {
+                    "id": next(image_ids),
+                    "listing_id": listing["id"],
+                    "path": f"dataset/{listing['id']}/{position}.jpg",
+                }
+            )
+        for category_id in rng.sample(category_ids, rng.choice((1, 1, 2, 3))):
+            categories.append({"category_id": category_id, "listing_id": listing["id"]})
+    return images, categories
+
+
+def generate_transactions(
+    rng: random.Random,
+    listings: List[dict],
+    user_ids: range,
+    first_sale_id: int,
+    first_rent_id: int,
+) -> tuple[List[dict], List[dict]]:
+    """Sale and rent records of sold and rented listings."""
+    sales, rents = [], []
+    for listing in listings:
+        status = listing["listing_status"]
+        if status not in (ListingStatus.SOLD, ListingStatus.RENTED):
+            continue
+        buyer_id = rng.choice(user_ids)
+        record = {
+            "buyer_id": buyer_id,
+            "listing_id": listing["id"],
+            "address_id": listing["address_id"],
+            "title": listing["title"],
+            "description": listing["description"],
+            "price": listing["price"],
+        }
+        if status == ListingStatus.SOLD:
+            sales.append(
+                {
+                    **record,
+                    "id": first_sale_id + len(sales),
+                    "sold_date": listing["updated_at"],
+                }
+            )
+        else:
+            rents.append(
+                {
+                    **record,
+                    "id": first_rent_id + len(rents),
+                    "start_date": listing["updated_at"],
+                    "end_date": listing["updated_at"] + timedelta(days=7),
+                }
+            )
+    return sales, rents
+
+
+def generate_reviews(
+    rng: random.Random,
+    first_id: int,
+    count: int,
+    user_ids: range,
+    seller_cum_weights: List[float],
+    now: datetime,
+) -> Iterator[dict]:
+    """Reviews follow seller activity, power sellers collect most of them."""
+    for review_id in range(first_id, first_id + count):
+        reviewee_id = rng.choices(user_ids, cum_weights=seller_cum_weights)[0]
+        reviewer_id = rng.choice(user_ids)
+        if reviewer_id == reviewee_id:
+            reviewer_id = user_ids[(user_ids.index(reviewer_id) + 1) % len(user_ids)]
+        yield {
+            "id": review_id,
+            "text": "Generated review",
+            "rating": choose(rng, RATING_WEIGHTS),
+            "reviewer_id": reviewer_id,
+            "reviewee_id": reviewee_id,
+            "created_at": now - timedelta(days=rng.uniform(0, 365)),
+        }
+
+
+def generate_favorites(
+    rng: random.Random,
+    user_ids: range,
+    listing_ids: range,
+    listing_cum_weights: List[float],
+    mean_per_user: float,
+) -> Iterator[dict]:
+    """
+    Favorites per user are geometrically distributed and popular listings
+    collect most of them.
+    """
+    total = listing_cum_weights[-1]
+    for user_id in user_ids:
+        wanted = min(int(rng.expovariate(1 / mean_per_user)), len(listing_ids))
+        liked = set()
+        while len(liked) < wanted:
+            index = bisect.bisect(listing_cum_weights, rng.random() * total)
+            liked.add(listing_ids[min(index, len(listing_ids) - 1)])
+        for listing_id in sorted(liked):
+            yield {"user_id": user_id, "listing_id": listing_id}
+
+
+def generate_alerts(
+    rng: random.Random,
+    first_alert_id: int,
+    first_token_id: int,
+    user_ids: range,
+    category_ids: List[int],
+    ratio: float,
+    now: datetime,
+) -> tuple[List[dict], List[dict]]:
+    """Search alerts with a device token for a share of the users."""
+    alerts, tokens = [], []
+    for user_id in user_ids:
+        if rng.random() >= ratio:
+            continue
+        product_filters = {"offer_type": choose(rng, OFFER_TYPE_WEIGHTS).value}
+        if rng.random() < 0.6:
+            product_filters["search"] = rng.choice(NOUNS)
+        if rng.random() < 0.5:
+            product_filters["category_ids"] = [rng.choice(category_ids)]
+        if rng.random() < 0.3:
+            product_filters["max_price"] = rng.choice((50, 100, 500, 1000))
+        alerts.append(
+            {
+                "id": first_alert_id + len(alerts),
+                "user_id": user_id,
+                "is_active": rng.random() < 0.9,
+                "product_filters": product_filters,
+                "created_at": now - timedelta(days=rng.uniform(0, 90)),
+                "last_notified_at": now - timedelta(minutes=rng.uniform(0, 120)),
+            }
+        )
+        tokens.append(
+            {
+                "id": first_token_id + len(tokens),
+                "user_id": user_id,
+                "token": f"dataset-device-{user_id}",
+            }
+        )
+    return alerts, tokens
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class BulkWriter:
+    """Writes row dictionaries in batches, with COPY on asyncpg connections."""
+
+    def __init__(self, conn: AsyncConnection, batch_size: int) -> None:
+        self.conn = conn
+        self.batch_size = batch_size
+        self.use_copy = conn.dialect.driver == "asyncpg"
+        self.counts: dict[str, int] = {}
+
+    async def write(self, table: Table, rows: Iterable[dict]) -> None:
+        for batch in batched(rows, self.batch_size):
+            if self.use_copy:
+                await self._copy(table, batch)
+            else:
+                await self.conn.execute(insert(table), batch)
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(batch)
+
+    async def _copy(self, table: Table, batch: List[dict]) -> None:
+        columns = list(batch[0])
+        raw = await self.conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            columns=columns,
+            records=[
+                tuple(self._copy_value(row[column]) for column in columns)
+                for row in batch
+            ],
+        )
+
+    @staticmethod
+    def _copy_value(value):
+        # enums are stored by name, JSON columns take the encoded text
+        if isinstance(value, enum.Enum):
+            return value.name
+        if isinstance(value, dict):
+            return json.dumps(value)
+        return value
+
+
+async def next_id(conn: AsyncConnection, table: Table) -> int:
+    result = await conn.execute(select(func.coalesce(func.max(table.c.id), 0)))
+    return result.scalar_one() + 1
+
+
+async def rebuild_user_ratings(conn: AsyncConnection) -> None:
+    """Bulk inserts bypass the ORM hooks, so the rating aggregate is rebuilt."""
+    await conn.execute(text('DELETE FROM "userRatings"'))
+    await conn.execute(
+        text(
+            """
+            INSERT INTO "userRatings" (user_id, rating_sum, rating_count, avg_rating)
+            SELECT reviewee_id, SUM(rating), COUNT(*), ROUND(AVG(rating), 2)
+            FROM "userReviews"
+            WHERE reviewee_id IS NOT NULL
+            GROUP BY reviewee_id
+            """
+        )
+    )
+
+
+async def reset_sequences(conn: AsyncConnection, tables: Iterable[Table]) -> None:
+    """IDs are written explicitly, so Postgres sequences have to catch up."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        await conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                f'(SELECT max(id) FROM "{table.name}"))'
+            )
+        )
+
+
+async def generate_dataset(engine: AsyncEngine, config: DatasetConfig) -> dict:
+    """
+    Writes a dataset described by `config` and returns the number of rows
+    written per table.
+    """
+    rng = random.Random(config.seed)
+    # a fixed reference time keeps the dataset reproducible
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    tables = {
+        model: model.__table__
+        for model in (
+            Category,
+            User,
+            Address,
+            Listing,
+            ListingImage,
+            CategoryListing,
+            SaleListing,
+            RentListing,
+            UserReview,
+            FavoriteListing,
+            UserSearchAlert,
+            FirebaseCloudToken,
+        )
+    }
+
+    async with engine.connect() as conn:
+        writer = BulkWriter(conn, config.batch_size)
+        first = {
+            model: await next_id(conn, table)
+            for model, table in tables.items()
+            if "id" in table.c
+        }
+
+        # categories are shared, so the ones seeded before are reused
+        existing = dict((await conn.execute(select(Category.name, Category.id))).all())
+        categories = list(generate_categories(first[Category], existing))
+        await writer.write(tables[Category], categories)
+        category_ids = sorted(
+            [existing[name] for name in CATEGORY_NAMES if name in existing]
+            + [row["id"] for row in categories]
+        )
+
+        user_ids = range(first[User], first[User] + config.users)
+        await writer.write(
+            tables[User],
+            generate_users(rng, first[User], config.users, config.first_user_email),
+        )
+        await writer.write(
+            tables[Address], generate_addresses(rng, first[Address], user_ids)
+        )
+        await conn.commit()
+
+        seller_cum_weights = zipf_cum_weights(config.users, config.zipf_exponent)
+        image_id, sale_id, rent_id = (
+            first[ListingImage],
+            first[SaleListing],
+            first[RentListing],
+        )
+        listings = generate_listings(
+            rng,
+            first[Listing],
+            config.listings,
+            user_ids,
+            first[Address],
+            seller_cum_weights,
+            now,
+        )
+        for batch in batched(listings, config.batch_size):
+            images, category_links = generate_listing_relations(
+                rng, batch, image_id, category_ids
+            )
+            sales, rents = generate_transactions(rng, batch, user_ids, sale_id, rent_id)
+            image_id, sale_id, rent_id = (
+                image_id + len(images),
+                sale_id + len(sales),
+                rent_id + len(rents),
+            )
+            await writer.write(tables[Listing], batch)
+            await writer.write(tables[ListingImage], images)
+            await writer.write(tables[CategoryListing], category_links)
+            await writer.write(tables[SaleListing], sales)
+            await writer.write(tables[RentListing], rents)
+            await conn.commit()
+
+        await writer.write(
+            tables[UserReview],
+            generate_reviews(
+                rng,
+                first[UserReview],
+                int(config.users * config.reviews_per_user),
+                user_ids,
+                seller_cum_weights,
+                now,
+            ),
+        )
+        await rebuild_user_ratings(conn)
+
+        listing_ids = range(first[Listing], first[Listing] + config.listings)
+        if config.listings:
+            await writer.write(
+                tables[FavoriteListing],
+                generate_favorites(
+                    rng,
+                    user_ids,
+                    listing_ids,
+                    zipf_cum_weights(config.listings, config.zipf_exponent),
+                    config.favorites_per_user,
+                ),
+            )
+
+        alerts, tokens = generate_alerts(
+            rng,
+            first[UserSearchAlert],
+            first[FirebaseCloudToken],
+            user_ids,
+            category_ids,
+            config.alert_ratio,
+            now,
+        )
+        await writer.write(tables[UserSearchAlert], alerts)
+        await writer.write(tables[FirebaseCloudToken], tokens)
+
+        await reset_sequences(
+            conn, [table for table in tables.values() if "id" in table.c]
+        )
+        await conn.commit()
+
+    return writer.counts
+
+
+async def main(config: DatasetConfig) -> None:
+    from app.db.database import engine
+
+    start = time.perf_counter()
+    counts = await generate_dataset(engine, config)
+    for table, count in counts.items():
+        print(f"{table:>20}: {count} rows")
+    print(f"Generated in {time.perf_counter() - start:.1f} s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=DatasetConfig.users)
+    parser.add_argument("--listings", type=int, default=DatasetConfig.listings)
+    parser.add_argument("--seed", type=int, default=DatasetConfig.seed)
+    parser.add_argument("--batch-size", type=int, default=DatasetConfig.batch_size)
+    parser.add_argument(
+        "--reviews-per-user", type=float, default=DatasetConfig.reviews_per_user
+    )
+    parser.add_argument(
+        "--favorites-per-user", type=float, default=DatasetConfig.favorites_per_user
+    )
+    parser.add_argument("--alert-ratio", type=float, default=DatasetConfig.alert_ratio)
+    parser.add_argument(
+        "--first-user-email",
+        help="email of the first user, e.g. test@example.com for the TESTING auth bypass",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            DatasetConfig(
+                users=args.users,
+                listings=args.listings,
+                seed=args.seed,
+                batch_size=args.batch_size,
+                reviews_per_user=args.reviews_per_user,
+                favorites_per_user=args.favorites_per_user,
+                alert_ratio=args.alert_ratio,
+                first_user_email=args.first_user_email,
+            )
+        )
+    )
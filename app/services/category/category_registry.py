@@ -0,0 +1,117 @@
+import hashlib
+import json
+import time
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from app.models.category_model import Category
+from app.services.category.exceptions import CategoryNotFound
+
+
+class CategoryRegistry:
+    """
+    Process-local copy of the categories table.
+
+    Categories almost never change, so they are loaded once and category IDs are
+    validated in memory. The copy is reloaded after the TTL, or right away when
+    this process commits a change to a category. A category created by another
+    process is found by reloading once when an unknown ID is validated, at most
+    every `miss_reload_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        miss_reload_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self.clock = clock
+        self._names: dict[int, str] = {}
+        self._body = b"[]"
+        self._etag = ""
+        self._loaded_at: float | None = None
+        self.loads = 0
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or self.clock() - self._loaded_at >= self.ttl
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.execute(select(Category.id, Category.name))
+        categories = [
+            {"id": category_id, "name": name}
+            for category_id, name in sorted(result.all())
+        ]
+
+        self._names = {category["id"]: category["name"] for category in categories}
+        self._body = json.dumps(categories, ensure_ascii=False).encode()
+        self._etag = f'"{hashlib.sha256(self._body).hexdigest()[:32]}"'
+        self._loaded_at = self.clock()
+        self.loads += 1
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        # requests expiring the copy together may each reload it, which is one
+        # small query and cheaper than a lock bound to an event loop
+        if self.is_stale:
+            await self.load(session)
+
+    async def get_body(self, session: AsyncSession) -> tuple[bytes, str]:
+        """Returns the serialized category list and its ETag."""
+        await self.ensure_loaded(session)
+        return self._body, self._etag
+
+    async def validate_ids(self, session: AsyncSession, category_ids: Iterable[int]):
+        """
+        Checks that every category exists.
+
+        :raises CategoryNotFound: For the first unknown category ID.
+        """
+        await self.ensure_loaded(session)
+        category_ids = list(category_ids)
+        missing = self._unknown(category_ids)
+        if missing and self.clock() - self._loaded_at >= self.miss_reload_interval:
+            # the category may have been created by another process, unknown
+            # IDs sent again and again do not reload more often than this
+            await self.load(session)
+            missing = self._unknown(category_ids)
+        if missing:
+            raise CategoryNotFound(missing[0])
+
+    def _unknown(self, category_ids: list[int]) -> list[int]:
+        return [
+            category_id
+            for category_id in category_ids
+            if category_id not in self._names
+        ]
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+category_registry = CategoryRegistry()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_category_changes(session: Session, flush_context) -> None:
+    if any(
+        isinstance(obj, Category)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info["categories_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_category_registry(session: Session) -> None:
+    if session.info.pop("categories_changed", False):
+        category_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_category_changes(session: Session) -> None:
+    session.info.pop("categories_changed", None)
@@ -0,0 +1,9 @@
+# exceptions.py
+
+
+class CategoryNotFound(Exception):
+    """Raised when a category ID does not exist."""
+
+    def __init__(self, category_id: int) -> None:
+        super().__init__(f"Category with ID {category_id} not found.")
+        self.category_id = category_id
@@ -0,0 +1,136 @@
+from sqlalchemy import JSON, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.address_model import Address
+from app.models.category_listing_model import CategoryListing
+from app.models.listing_image import ListingImage
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.models.user_rating_model import UserRating
+from app.schemas.address_schema import AddressGet
+from app.schemas.listing_schema import (
+    ListingCardDetails,
+    ListingCardProfile,
+    SellerInfoCard,
+)
+
+ADDRESS_FIELDS = list(AddressGet.model_fields)
+
+# unrated sellers are shown with a rating of 0
+seller_rating = func.coalesce(UserRating.avg_rating, 0)
+
+
+class json_array_agg(FunctionElement):
+    """
+    Aggregates the values into a JSON array, empty when there are no rows.
+    Arguments are (value, order by).
+    """
+
+    type = JSON()
+    name = "json_array_agg"
+    inherit_cache = True
+
+
+@compiles(json_array_agg, "postgresql")
+def _compile_json_array_agg_postgresql(element, compiler, **kw):
+    value, order_by = element.clauses
+    return "coalesce(json_agg(%s ORDER BY %s), '[]'::json)" % (
+        compiler.process(value, **kw),
+        compiler.process(order_by, **kw),
+    )
+
+
+@compiles(json_array_agg)
+def _compile_json_array_agg_default(element, compiler, **kw):
+    # SQLite aggregates in the order rows are read, which is the index order
+    value, _ = element.clauses
+    return "json_group_array(%s)" % compiler.process(value, **kw)
+
+
+def get_card_query(liked_expr):
+    """
+    Returns a query selecting everything a listing card needs in one row per
+    listing: listing fields, seller, seller rating, address, category ids and
+    image paths. Related rows are aggregated into JSON arrays by the database,
+    so no follow-up queries or ORM objects are needed.
+    """
+    category_ids = (
+        select(json_array_agg(CategoryListing.category_id, CategoryListing.category_id))
+        .where(CategoryListing.listing_id == Listing.id)
+        .scalar_subquery()
+    )
+    image_paths = (
+        select(json_array_agg(ListingImage.path, ListingImage.id))
+        .where(ListingImage.listing_id == Listing.id)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            Listing.id,
+            Listing.title,
+            Listing.description,
+            Listing.price,
+            Listing.listing_status,
+            Listing.offer_type,
+            Listing.created_at,
+            User.id.label("seller_id"),
+            User.firstname.label("seller_firstname"),
+            User.lastname.label("seller_lastname"),
+            seller_rating.label("seller_rating"),
+            liked_expr,
+            *[
+                getattr(Address, field).label(f"address_{field}")
+                for field in ADDRESS_FIELDS
+            ],
+            category_ids.label("category_ids"),
+            image_paths.label("image_paths"),
+        )
+        .select_from(Listing)
+        .join(User, User.id == Listing.seller_id)
+        .join(Address, Address.id == Listing.address_id)
+        .outerjoin(UserRating, UserRating.user_id == Listing.seller_id)
+    )
+
+
+def build_card_details(
+    row, image_urls: list[str], distance: float | None = None
+) -> ListingCardDetails:
+    """Builds a listing card from a row of `get_card_query`."""
+    rating = row.seller_rating
+    return ListingCardDetails(
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        price=row.price,
+        listing_status=row.listing_status,
+        offer_type=row.offer_type,
+        liked=row.liked,
+        seller=SellerInfoCard(
+            id=row.seller_id,
+            firstname=row.seller_firstname,
+            lastname=row.seller_lastname,
+            rating=round(rating, 2) if rating else None,
+        ),
+        address=AddressGet(
+            **{field: getattr(row, f"address_{field}") for field in ADDRESS_FIELDS}
+        ),
+        category_ids=row.category_ids,
+        created_at=row.created_at,
+        image_paths=image_urls,
+        distance_from_user=distance,
+    )
+
+
+def build_card_profile(row, image_url: str) -> ListingCardProfile:
+    """Builds a profile listing card from a row of `get_card_query`."""
+    return ListingCardProfile(
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        price=row.price,
+        listing_status=row.listing_status,
+        offer_type=row.offer_type,
+        image_path=image_url,
+    )
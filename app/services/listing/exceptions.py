@@ -0,0 +1,7 @@
+# exceptions.py
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded or does not match the query."""
+
+    pass
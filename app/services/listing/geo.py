@@ -0,0 +1,61 @@
+import math
+from typing import List, NamedTuple
+
+from sqlalchemy import and_, or_
+
+EARTH_RADIUS_KM = 6371
+
+
+class BoundingBox(NamedTuple):
+    min_lat: float
+    max_lat: float
+    min_lng: float
+    max_lng: float
+
+
+def get_bounding_boxes(lat: float, lng: float, radius_km: float) -> List[BoundingBox]:
+    """
+    Returns latitude/longitude boxes containing every point within `radius_km`
+    of (lat, lng), so indexed range conditions can discard far away rows before
+    the exact haversine distance is computed.
+
+    A circle crossing the antimeridian is covered by two boxes, a circle reaching
+    a pole covers all longitudes.
+    http://janmatuschek.de/LatitudeLongitudeBoundingCoordinates
+    """
+    radius_km = max(radius_km, 0)
+    # angular radius of the circle in degrees
+    angle = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - angle, lat + angle
+
+    if min_lat <= -90 or max_lat >= 90:
+        return [BoundingBox(max(min_lat, -90), min(max_lat, 90), -180, 180)]
+
+    lng_delta = math.degrees(
+        math.asin(math.sin(math.radians(angle)) / math.cos(math.radians(lat)))
+    )
+    min_lng, max_lng = lng - lng_delta, lng + lng_delta
+
+    if min_lng < -180:
+        return [
+            BoundingBox(min_lat, max_lat, min_lng + 360, 180),
+            BoundingBox(min_lat, max_lat, -180, max_lng),
+        ]
+    if max_lng > 180:
+        return [
+            BoundingBox(min_lat, max_lat, min_lng, 180),
+            BoundingBox(min_lat, max_lat, -180, max_lng - 360),
+        ]
+    return [BoundingBox(min_lat, max_lat, min_lng, max_lng)]
+
+
+def get_bounding_box_condition(lat_column, lng_column, boxes: List[BoundingBox]):
+    return or_(
+        *[
+            and_(
+                lat_column.between(box.min_lat, box.max_lat),
+                lng_column.between(box.min_lng, box.max_lng),
+            )
+            for box in boxes
+        ]
+    )
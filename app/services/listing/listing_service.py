@@ -1,21 +1,35 @@
 import math
 from datetime import timedelta
-from typing import List, Literal, Optional
+from typing import Iterable, List, Literal, Optional
 from urllib.parse import unquote
 
 from fastapi import Depends, HTTPException, Request, status
-from firebase_admin import storage
 from pydantic_extra_types.coordinate import Latitude, Longitude
-from sqlalchemy import delete, func
+from sqlalchemy import asc, delete, desc, exists, func, null
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from app.api.dependencies import get_async_session
-from app.api.middleware import firebase_app
+from app.core.metrics import time_external_call
 from app.models.address_model import Address
+from app.models.category_model import Category
+from app.models.enums.listing_status import ListingStatus
+from app.models.favorite_listing_model import FavoriteListing
 from app.models.listing_image import ListingImage
 from app.models.listing_model import Listing
+from app.models.user_rating_model import UserRating
+from app.providers import providers
+from app.schemas.listing_schema import (
+    ListingCardDetails,
+    ListingCardProfile,
+    ListingQueryParameters,
+)
+from app.services.listing import cards
+from app.services.listing.geo import get_bounding_box_condition, get_bounding_boxes
+from app.services.listing.pagination import NULLABLE_SORT_KEYS
+from app.services.listing.search import get_relevance_expr, get_search_condition
+from app.services.listing.signed_url_cache import SignedUrlCache
 
 AllowedListingDependencies = Literal[
     "favorite_by", "address", "categories", "seller", "buyer", "renters", "images"
@@ -23,27 +37,29 @@ AllowedListingDependencies = Literal[
 DependenciesList = Optional[List[AllowedListingDependencies]]
 
 
+def sign_image_url(image_path: str, expiration: timedelta) -> str:
+    with time_external_call("storage", "sign_url"):
+        return providers.storage.sign_url(image_path, expiration)
+
+
+# signing is CPU-bound RSA work, so signed URLs are reused until shortly before
+# they expire
+signed_url_cache = SignedUrlCache(sign_image_url, expiration=timedelta(minutes=60))
+
+
 def generate_signed_url(image_path: str) -> str:
-    bucket = storage.bucket()
-    blob = bucket.blob(image_path)
-    signed_url = blob.generate_signed_url(
-        version="v4", expiration=timedelta(minutes=60), method="GET"
-    )
-    return signed_url
+    return signed_url_cache.get(image_path)
 
 
 def delete_image(image_path: str) -> None:
     """
-    Delete a single image from Firebase Storage.
+    Delete a single image from the image storage.
     Raises google.cloud.exceptions.NotFound if the blob doesn't exist.
     """
     print("removing: ", image_path)
-    bucket = storage.bucket()  # alebo bez argumentu, ak je default správny
-
-    # bucket = storage.bucket()
-    blob = bucket.blob(image_path)  # ak by path prišla s %2F
-    print("blob: ", blob)
-    blob.delete()
+    with time_external_call("storage", "delete"):
+        providers.storage.delete(image_path)
+    signed_url_cache.invalidate(image_path)
 
 
 class ListingService:
@@ -132,11 +148,160 @@ class ListingService:
         stmt = delete(ListingImage).where(ListingImage.listing_id == listing_id)
         await self.session.execute(stmt)
 
-    def get_listing_distance_subquery(self, user_lat: float, user_lng: float):
+    async def get_liked_listing_ids(
+        self, user_id: int, listing_ids: Iterable[int]
+    ) -> set[int]:
+        """
+        Returns the IDs from `listing_ids` that the user has in favorites,
+        with one lookup in the favorites link table.
+        """
+        listing_ids = set(listing_ids)
+        if not listing_ids:
+            return set()
+
+        result = await self.session.execute(
+            select(FavoriteListing.listing_id).where(
+                FavoriteListing.user_id == user_id,
+                FavoriteListing.listing_id.in_(listing_ids),
+            )
+        )
+        return set(result.scalars().all())
+
+    async def is_liked(self, user_id: int, listing_id: int) -> bool:
+        return listing_id in await self.get_liked_listing_ids(user_id, [listing_id])
+
+    def get_liked_expr(self, user_id: int):
+        """
+        Returns a boolean column telling if the user has the listing in favorites,
+        to be selected together with `Listing`.
+        """
+        return (
+            exists()
+            .where(
+                FavoriteListing.user_id == user_id,
+                FavoriteListing.listing_id == Listing.id,
+            )
+            .label("liked")
+        )
+
+    def get_card_query(self, user_id: int):
+        """Returns the listing card query for the user, see `cards.get_card_query`."""
+        return cards.get_card_query(self.get_liked_expr(user_id))
+
+    def build_card_details(
+        self, row, distance: float | None = None
+    ) -> ListingCardDetails:
+        image_urls = [generate_signed_url(path) for path in row.image_paths]
+        return cards.build_card_details(row, image_urls, distance)
+
+    def build_card_profile(self, row) -> ListingCardProfile:
+        # the first image is the title image of the listing
+        image_url = generate_signed_url(row.image_paths[0]) if row.image_paths else ""
+        return cards.build_card_profile(row, image_url)
+
+    def get_search_query(self, user_id: int, params: ListingQueryParameters):
+        """
+        Returns the listing card query filtered and sorted by the search parameters,
+        together with its sort expression. Pagination is left to the caller.
+        The parameters have to be validated beforehand.
+        """
+        # one row with everything a listing card needs per listing
+        query = self.get_card_query(user_id).where(
+            Listing.listing_status.in_([ListingStatus.ACTIVE, ListingStatus.RENTED]),
+        )  # only available and possibly available listings
+
+        # Filtering:
+        if params.category_ids is not None:
+            query = query.where(
+                Listing.categories.any(Category.id.in_(params.category_ids))
+            )
+        if params.offer_type is not None:
+            query = query.where(Listing.offer_type == params.offer_type)
+        if params.sale_min is not None:
+            query = query.where(Listing.price >= params.sale_min)
+        if params.sale_max is not None and params.sale_max > 0:
+            query = query.where(Listing.price <= params.sale_max)
+
+        if params.search is not None:
+            query = query.where(get_search_condition(params.search))
+        if params.min_rating is not None and params.min_rating > 0:
+            # unrated sellers count as 0, so they never pass a positive minimum and
+            # the raw aggregate column can be compared (and its index used)
+            query = query.where(UserRating.avg_rating >= params.min_rating)
+        if params.country is not None:
+            query = query.where(Address.country == params.country)
+        if params.city is not None:
+            query = query.where(Address.city.ilike(f"%{params.city}%"))  # partial match
+        if params.street is not None:
+            query = query.where(Address.street == params.street)
+        if params.time_from is not None:
+            # second precision for created_at filtering, truncating the parameter
+            # instead of the column keeps the condition usable by the created_at index
+            query = query.where(
+                Listing.created_at >= params.time_from.replace(microsecond=0)
+            )
+
+        # Sorting:
+        sort_columns = {
+            "created_at": Listing.created_at,
+            "updated_at": Listing.updated_at,
+            "price": Listing.price,
+            # the raw aggregate column keeps its index usable, unrated sellers
+            # are NULL and ordered last
+            "rating": UserRating.avg_rating,
+        }
+
+        # Location filtering and calculating:
+        if params.user_latitude is not None and params.user_longitude is not None:
+            distance_subquery = self.get_listing_distance_subquery(
+                params.user_latitude, params.user_longitude, params.max_distance
+            )
+            if params.max_distance is not None:
+                # the subquery only has listings inside the bounding box of the radius
+                query = query.join(
+                    distance_subquery, distance_subquery.c.listing_id == Listing.id
+                ).where(distance_subquery.c.distance <= params.max_distance)
+            else:
+                query = query.outerjoin(
+                    distance_subquery, distance_subquery.c.listing_id == Listing.id
+                )
+
+            # Add distance to the select statement
+            query = query.add_columns(distance_subquery.c.distance.label("distance"))
+            sort_columns["location"] = distance_subquery.c.distance
+        else:
+            # fill the distance column with None if user coordinates are not provided
+            query = query.add_columns(null().label("distance"))
+
+        if params.search is not None:
+            sort_columns["relevance"] = get_relevance_expr(params.search)
+
+        sort_expr = sort_columns.get(params.sort_by, Listing.updated_at)
+
+        # listing id breaks ties, so every row has a unique position for the cursor
+        direction = asc if params.sort_order == "asc" else desc
+        if params.sort_by in NULLABLE_SORT_KEYS:
+            query = query.order_by(direction(sort_expr).nulls_last())
+        else:
+            # without NULLS LAST the order matches a (sort key, id) index in both
+            # directions
+            query = query.order_by(direction(sort_expr))
+        query = query.order_by(direction(Listing.id))
+        query = query.add_columns(sort_expr.label("sort_key"))
+
+        return query, sort_expr
+
+    def get_listing_distance_subquery(
+        self, user_lat: float, user_lng: float, max_distance: float | None = None
+    ):
         """
         Returns a subquery that computes the distance (in kilometers) from a provided
         (user_lat, user_lng) point to the listing's address using the haversine formula.
         It assumes that a Listing is associated with an Address having 'latitude' and 'longitude' fields.
+
+        When `max_distance` is set, only addresses inside its bounding box are returned,
+        which is answered by the latitude and longitude indexes. The caller still has
+        to filter on the exact distance.
         """
         # Haversine formula:
         # distance = 2 * R * asin(sqrt(
@@ -159,15 +324,19 @@ class ListingService:
             )
         ).label("distance")
 
-        distance_subquery = (
-            select(
-                Listing.id.label("listing_id"),
-                distance_expr,
+        distance_subquery = select(
+            Listing.id.label("listing_id"),
+            distance_expr,
+        ).join(Address, Listing.address_id == Address.id)
+        if max_distance is not None:
+            distance_subquery = distance_subquery.where(
+                get_bounding_box_condition(
+                    Address.latitude,
+                    Address.longitude,
+                    get_bounding_boxes(user_lat, user_lng, max_distance),
+                )
             )
-            .join(Address, Listing.address_id == Address.id)
-            .subquery()
-        )
-        return distance_subquery
+        return distance_subquery.subquery()
 
     def get_user_listing_distance(
         self,
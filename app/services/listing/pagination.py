@@ -0,0 +1,126 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+
+from app.services.listing.exceptions import InvalidCursor
+
+# how the sort key of each sort_by option is restored from the cursor
+CURSOR_VALUE_PARSERS = {
+    "created_at": datetime.fromisoformat,
+    "updated_at": datetime.fromisoformat,
+    "price": Decimal,
+    "rating": Decimal,
+    "location": float,
+    "relevance": float,
+}
+
+# sort keys that can be NULL, they are ordered NULLS LAST and need an extra
+# keyset branch, the others are compared as (sort key, id) row values that
+# a (sort key, id) index answers with a range scan
+NULLABLE_SORT_KEYS = {"updated_at", "rating", "location"}
+
+
+def _serialize_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(
+    sort_by: str,
+    sort_order: str,
+    sort_value: Any,
+    listing_id: int,
+    coordinates: Tuple[float, float] | None = None,
+) -> str:
+    """
+    Encodes the position of the last returned listing into an opaque cursor.
+
+    The cursor keeps the sort key of the row together with its ID, so the next page
+    can continue right after it instead of skipping `offset` rows. The user
+    coordinates the distances were computed from are kept as well.
+    """
+    payload = {
+        "sort_by": sort_by,
+        "sort_order": sort_order,
+        "coordinates": list(coordinates) if coordinates else None,
+        "value": _serialize_value(sort_value),
+        "id": listing_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    sort_by: str,
+    sort_order: str,
+    coordinates: Tuple[float, float] | None = None,
+) -> Tuple[Any, int]:
+    """
+    Decodes a cursor created by `encode_cursor`.
+
+    :return: Tuple of (sort value, listing id) of the last row of the previous page.
+    :raises InvalidCursor: If the cursor is malformed or was issued for another sort
+        or other user coordinates.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        listing_id = int(payload["id"])
+        value = payload["value"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Malformed pagination cursor.") from e
+
+    if payload.get("sort_by") != sort_by or payload.get("sort_order") != sort_order:
+        raise InvalidCursor("Pagination cursor does not match sort_by and sort_order.")
+
+    # distances and the radius filter depend on the coordinates
+    expected = list(coordinates) if coordinates else None
+    if payload.get("coordinates") != expected:
+        raise InvalidCursor("Pagination cursor does not match the user coordinates.")
+
+    if value is not None:
+        parser = CURSOR_VALUE_PARSERS.get(sort_by, float)
+        try:
+            value = parser(value)
+        except (ValueError, TypeError, InvalidOperation) as e:
+            raise InvalidCursor("Malformed pagination cursor.") from e
+
+    return value, listing_id
+
+
+def get_keyset_condition(
+    sort_expr, id_column, sort_order: str, value, listing_id, nullable: bool = True
+):
+    """
+    Returns a WHERE condition selecting the rows that come after (value, listing_id)
+    when ordering by `sort_expr, id_column` in the given direction, with NULL sort
+    keys last when `nullable` is set.
+    """
+    ascending = sort_order == "asc"
+
+    if not nullable:
+        row, last_row = tuple_(sort_expr, id_column), tuple_(value, listing_id)
+        return row > last_row if ascending else row < last_row
+
+    after_id = id_column > listing_id if ascending else id_column < listing_id
+
+    # NULL sort keys are ordered last, so once we reach them only ids move forward
+    if value is None:
+        return and_(sort_expr.is_(None), after_id)
+
+    return or_(
+        sort_expr > value if ascending else sort_expr < value,
+        and_(sort_expr == value, after_id),
+        sort_expr.is_(None),
+    )
@@ -0,0 +1,73 @@
+from sqlalchemy import Float, case, func, literal, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.listing_model import Listing
+
+# matches in the description count less than matches in the title
+DESCRIPTION_WEIGHT = 0.5
+
+
+def get_search_pattern(search: str) -> str:
+    """Returns a LIKE pattern matching `search` literally anywhere in the text."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def get_search_condition(search: str):
+    """
+    Matches listings containing the search term in the title or description.
+
+    On Postgres both `ILIKE '%term%'` conditions are answered by the pg_trgm GIN
+    indexes on the columns, other databases scan.
+    """
+    pattern = get_search_pattern(search)
+    return or_(
+        Listing.title.ilike(pattern, escape="\\"),
+        Listing.description.ilike(pattern, escape="\\"),
+    )
+
+
+class listing_relevance(FunctionElement):
+    """
+    Relevance of a listing for a search term, higher is better.
+    Arguments are (term, LIKE pattern, title, description).
+    """
+
+    type = Float()
+    name = "listing_relevance"
+    inherit_cache = True
+
+
+@compiles(listing_relevance, "postgresql")
+def _compile_relevance_postgresql(element, compiler, **kw):
+    term, _, title, description = element.clauses
+    expr = func.greatest(
+        func.word_similarity(term, title),
+        func.word_similarity(term, description) * DESCRIPTION_WEIGHT,
+    )
+    return compiler.process(expr, **kw)
+
+
+@compiles(listing_relevance)
+def _compile_relevance_default(element, compiler, **kw):
+    # without pg_trgm, rank title matches above description matches
+    _, pattern, title, description = element.clauses
+    expr = case(
+        (func.lower(title).like(func.lower(pattern), escape="\\"), 1.0),
+        (
+            func.lower(description).like(func.lower(pattern), escape="\\"),
+            DESCRIPTION_WEIGHT,
+        ),
+        else_=0.0,
+    )
+    return compiler.process(expr, **kw)
+
+
+def get_relevance_expr(search: str):
+    return listing_relevance(
+        literal(search),
+        literal(get_search_pattern(search)),
+        Listing.title,
+        Listing.description,
+    )
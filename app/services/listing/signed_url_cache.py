@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable
+
+
+class SignedUrlCache:
+    """
+    Process-wide LRU cache of signed image URLs.
+
+    A cached URL is returned until `safety_margin` before it expires, so clients
+    always get a URL that is still valid for a while. When the cache is full,
+    the least recently used image path is evicted.
+    """
+
+    def __init__(
+        self,
+        signer: Callable[[str, timedelta], str],
+        expiration: timedelta = timedelta(minutes=60),
+        safety_margin: timedelta = timedelta(minutes=5),
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if safety_margin >= expiration:
+            raise ValueError("Safety margin must be shorter than URL expiration.")
+
+        self.signer = signer
+        self.expiration = expiration
+        self.safety_margin = safety_margin
+        self.max_size = max_size
+        self.clock = clock
+
+        # image path -> (signed url, time after which it must be re-signed)
+        self._urls: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, image_path: str) -> str:
+        """Returns a still valid signed URL for the image, signing it if needed."""
+        now = self.clock()
+        with self._lock:
+            cached = self._urls.get(image_path)
+            if cached is not None and now < cached[1]:
+                self._urls.move_to_end(image_path)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        # sign outside of the lock, signing is the slow part
+        signed_url = self.signer(image_path, self.expiration)
+        refresh_at = now + (self.expiration - self.safety_margin).total_seconds()
+
+        with self._lock:
+            self._urls[image_path] = (signed_url, refresh_at)
+            self._urls.move_to_end(image_path)
+            while len(self._urls) > self.max_size:
+                self._urls.popitem(last=False)
+                self.evictions += 1
+
+        return signed_url
+
+    def invalidate(self, image_path: str) -> None:
+        with self._lock:
+            self._urls.pop(image_path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._urls.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._urls),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,115 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Iterable, List
+
+from firebase_admin import exceptions
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import time_external_call
+from app.models.firebase_cloud_token_model import FirebaseCloudToken
+from app.services.notifications.senders import (
+    NotificationSender,
+    PushNotification,
+    TokenResponse,
+)
+
+# FCM accepts at most 500 tokens in one multicast message
+MAX_TOKENS_PER_MULTICAST = 500
+
+
+@dataclass
+class DispatchResult:
+    notification: PushNotification
+    success_count: int = 0
+    failure_count: int = 0
+    invalid_tokens: List[str] = field(default_factory=list)
+    errors: List[Exception] = field(default_factory=list)
+
+    @property
+    def delivered(self) -> bool:
+        """Every batch was accepted by the sender, individual tokens may still fail."""
+        return not self.errors
+
+
+class NotificationDispatcher:
+    """
+    Sends push notifications with a bounded number of concurrent senders.
+
+    Senders are blocking, so every batch runs in a worker thread and the event loop
+    keeps serving requests while notifications are sent.
+    """
+
+    def __init__(
+        self,
+        sender: NotificationSender,
+        max_concurrency: int = 4,
+        batch_size: int = MAX_TOKENS_PER_MULTICAST,
+    ) -> None:
+        if not 0 < batch_size <= MAX_TOKENS_PER_MULTICAST:
+            raise ValueError(
+                f"Batch size must be between 1 and {MAX_TOKENS_PER_MULTICAST}."
+            )
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    def _split(self, notification: PushNotification) -> List[PushNotification]:
+        return [
+            PushNotification(
+                tokens=notification.tokens[i : i + self.batch_size],
+                title=notification.title,
+                body=notification.body,
+                data=notification.data,
+            )
+            for i in range(0, len(notification.tokens), self.batch_size)
+        ]
+
+    def _send(self, batch: PushNotification) -> List[TokenResponse]:
+        with time_external_call("messaging", "send"):
+            return self.sender.send(batch)
+
+    async def dispatch(
+        self, notifications: Iterable[PushNotification]
+    ) -> List[DispatchResult]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = [DispatchResult(notification) for notification in notifications]
+        for result in results:
+            if not result.notification.tokens:
+                result.errors.append(ValueError("Notification has no device tokens."))
+
+        async def send_batch(result: DispatchResult, batch: PushNotification):
+            async with semaphore:
+                try:
+                    responses = await asyncio.to_thread(self._send, batch)
+                except (exceptions.FirebaseError, ValueError) as e:
+                    print(f"Error sending notification batch: {e}")
+                    result.errors.append(e)
+                    result.failure_count += len(batch.tokens)
+                    return
+
+            for response in responses:
+                if response.success:
+                    result.success_count += 1
+                else:
+                    result.failure_count += 1
+                    if response.invalid_token:
+                        result.invalid_tokens.append(response.token)
+
+        await asyncio.gather(
+            *[
+                send_batch(result, batch)
+                for result in results
+                for batch in self._split(result.notification)
+            ]
+        )
+        return results
+
+
+async def delete_invalid_tokens(session: AsyncSession, tokens: Iterable[str]) -> None:
+    """Removes device tokens that FCM reported as no longer registered."""
+    tokens = set(tokens)
+    if tokens:
+        await session.execute(
+            delete(FirebaseCloudToken).where(FirebaseCloudToken.token.in_(tokens))
+        )
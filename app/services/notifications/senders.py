@@ -0,0 +1,99 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Protocol
+
+from firebase_admin import messaging
+
+
+@dataclass
+class PushNotification:
+    tokens: List[str]
+    title: str
+    body: str
+    data: dict[str, str]
+
+
+@dataclass
+class TokenResponse:
+    token: str
+    success: bool
+    # the token is no longer valid and should be removed from the database
+    invalid_token: bool = False
+    error: Exception | None = None
+
+
+class NotificationSender(Protocol):
+    """
+    Sends one notification to at most 500 device tokens.
+    Implementations are blocking, the dispatcher runs them in worker threads.
+    """
+
+    def send(self, notification: PushNotification) -> List[TokenResponse]: ...
+
+
+class FirebaseSender:
+    """Sends notifications with Firebase Cloud Messaging."""
+
+    # errors meaning the device token will never work again
+    INVALID_TOKEN_ERRORS = (
+        messaging.UnregisteredError,
+        messaging.SenderIdMismatchError,
+    )
+
+    def send(self, notification: PushNotification) -> List[TokenResponse]:
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(
+                title=notification.title,
+                body=notification.body,
+            ),
+            data=notification.data,
+            android=messaging.AndroidConfig(
+                priority="high",
+                notification=messaging.AndroidNotification(
+                    channel_id="high-priority-alerts",
+                    sound="default",
+                ),
+            ),
+            tokens=notification.tokens,
+        )
+        # https://firebase.google.com/docs/reference/admin/python/firebase_admin.messaging
+        batch_response = messaging.send_each_for_multicast(message)
+        return [
+            TokenResponse(
+                token=token,
+                success=response.success,
+                invalid_token=isinstance(response.exception, self.INVALID_TOKEN_ERRORS),
+                error=response.exception,
+            )
+            for token, response in zip(notification.tokens, batch_response.responses)
+        ]
+
+
+class FakeSender:
+    """
+    Records notifications instead of sending them, for tests and benchmarks.
+    Tokens in `invalid_tokens` are reported as unregistered.
+    """
+
+    def __init__(
+        self, invalid_tokens: set[str] | None = None, latency: float = 0.0
+    ) -> None:
+        self.invalid_tokens = invalid_tokens or set()
+        self.latency = latency
+        self.sent: List[PushNotification] = []
+        self._lock = threading.Lock()
+
+    def send(self, notification: PushNotification) -> List[TokenResponse]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.append(notification)
+        return [
+            TokenResponse(
+                token=token,
+                success=token not in self.invalid_tokens,
+                invalid_token=token in self.invalid_tokens,
+            )
+            for token in notification.tokens
+        ]
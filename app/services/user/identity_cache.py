@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User
+
+
+class Identity(NamedTuple):
+    """The current user's ID and card fields, without an ORM instance."""
+
+    id: int
+    email: str
+    firstname: str
+    lastname: str
+    phone_number: str | None
+
+
+class IdentityCache:
+    """
+    Bounded TTL cache from the email in the token claims to the user's identity.
+
+    Entries are dropped when this process commits a change to the user. Other
+    processes see the change at the latest when the TTL runs out.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        # email -> (identity, expiration)
+        self._identities: OrderedDict[str, tuple[Identity, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> Identity | None:
+        with self._lock:
+            cached = self._identities.get(email)
+            if cached is not None:
+                identity, expires_at = cached
+                if self.clock() < expires_at:
+                    self._identities.move_to_end(email)
+                    self.hits += 1
+                    return identity
+                del self._identities[email]
+            self.misses += 1
+            return None
+
+    def set(self, identity: Identity) -> None:
+        with self._lock:
+            self._identities[identity.email] = (identity, self.clock() + self.ttl)
+            self._identities.move_to_end(identity.email)
+            while len(self._identities) > self.max_size:
+                self._identities.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._identities.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._identities.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._identities),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+identity_cache = IdentityCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_changes(session: Session, flush_context) -> None:
+    emails = session.info.setdefault("changed_user_emails", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            # the old email too, when the email itself changed
+            history = inspect(obj).attrs.email.history
+            emails.update(e for e in (*history.deleted, obj.email) if e)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_identities(session: Session) -> None:
+    for email in session.info.pop("changed_user_emails", ()):
+        identity_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session: Session) -> None:
+    session.info.pop("changed_user_emails", None)
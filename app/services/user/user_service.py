@@ -1,19 +1,22 @@
-from typing import List, Literal, Optional
+from decimal import Decimal
+from typing import List, Literal, NamedTuple, Optional
 
 from fastapi import Depends, HTTPException, Request, status
-from sqlalchemy import func
+from sqlalchemy import and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
 from app.api.dependencies import get_async_session
+from app.models.address_model import Address
 from app.models.enums.listing_status import ListingStatus
 from app.models.listing_model import Listing
 from app.models.rent_listing_model import RentListing
 from app.models.sale_listing_model import SaleListing
 from app.models.user_model import User
-from app.models.user_review_model import UserReview
+from app.models.user_rating_model import UserRating
 from app.services.user.exceptions import UserEmailNotFound, UserNotFound
+from app.services.user.identity_cache import Identity, identity_cache
 
 AllowedUserDependencies = Literal[
     "reviews_written",
@@ -29,6 +32,14 @@ AllowedUserDependencies = Literal[
 DependenciesList = Optional[List[AllowedUserDependencies]]
 
 
+class ProfileSummary(NamedTuple):
+    user: User
+    address: Address | None  # primary address
+    sold_count: int
+    rented_count: int
+    rating: Decimal | None
+
+
 class UserService:
     def __init__(self, session: AsyncSession, request: Request) -> None:
         self.session = session
@@ -84,9 +95,48 @@ class UserService:
         Retrieve the user using the email stored in the request state.
         You can optionally provide a list of relationships to be preloaded.
         """
-        return await self.get_user_by_email(
+        db_user = await self.get_user_by_email(
             self.user_metadata.get("email"), dependencies=dependencies
         )
+        identity_cache.set(
+            Identity(
+                id=db_user.id,
+                email=db_user.email,
+                firstname=db_user.firstname,
+                lastname=db_user.lastname,
+                phone_number=db_user.phone_number,
+            )
+        )
+        return db_user
+
+    async def get_current_identity(self) -> Identity:
+        """
+        Returns the current user's ID and card fields without loading the ORM object.
+        Served from the identity cache, the users table is only queried on a miss.
+
+        :raises UserEmailNotFound: If the email is missing in the request metadata.
+        :raises UserNotFound: If the user does not exist.
+        """
+        email = self.user_metadata.get("email")
+        if not email:
+            raise UserEmailNotFound("User email not found in metadata.")
+
+        identity = identity_cache.get(email)
+        if identity is not None:
+            return identity
+
+        result = await self.session.execute(
+            select(
+                User.id, User.email, User.firstname, User.lastname, User.phone_number
+            ).where(User.email == email)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise UserNotFound("User not found in the database.")
+
+        identity = Identity(*row)
+        identity_cache.set(identity)
+        return identity
 
     # async def get_seller_rating(self, seller_id: int) -> float | None:
     #     """
@@ -109,23 +159,15 @@ class UserService:
 
     async def get_seller_rating(self, seller_id: int) -> float | None:
         """
-        Calculates the seller's rating using the seller rating subquery.
+        Reads the seller's rating from the maintained rating aggregate.
 
         :param seller_id: The ID of the seller.
         :return: The average rating rounded to 2 decimal places or None if no reviews exist.
         """
-        # Retrieve the subquery that calculates average ratings for all sellers.
-        rating_subquery = self.get_seller_rating_subquery()
-
-        # Filter the subquery for the specific seller.
-        stmt = select(rating_subquery.c.avg_rating).where(
-            rating_subquery.c.seller_id == seller_id
-        )
+        stmt = select(UserRating.avg_rating).where(UserRating.user_id == seller_id)
 
         result = await self.session.execute(stmt)
-        avg_rating = (
-            result.scalar()
-        )  # Get the computed average rating from the subquery
+        avg_rating = result.scalar()
 
         # Return the rounded average rating, if available.
         return round(avg_rating, 2) if avg_rating is not None else None
@@ -150,23 +192,85 @@ class UserService:
         result = await self.session.execute(
             select(Listing).join(RentListing).where(Listing.seller_id == seller_id)
         )
-        print(result.scalars().all())
         return result.scalars().all()
 
-    @classmethod
-    def get_seller_rating_subquery(cls):
+    def _get_profile_summary_query(self):
         """
-        Returns a subquery that computes the average rating for each seller.
-        Sellers are identified by the reviewee_id in the UserReview model.
+        Builds a query returning the user, primary address, sold and rented counts
+        and rating in one row. Counts are computed by the database, so listings
+        are never loaded.
         """
-        rating_subquery = (
+        sold_count = (
+            select(func.count(Listing.id))
+            .where(
+                Listing.seller_id == User.id,
+                Listing.listing_status == ListingStatus.SOLD,
+            )
+            .scalar_subquery()
+        )
+        rented_count = (
+            select(func.count(RentListing.id))
+            .join(Listing, RentListing.listing_id == Listing.id)
+            .where(Listing.seller_id == User.id)
+            .scalar_subquery()
+        )
+
+        return (
             select(
-                UserReview.reviewee_id.label("seller_id"),
-                func.avg(UserReview.rating).label("avg_rating"),
+                User,
+                Address,
+                sold_count.label("sold_count"),
+                rented_count.label("rented_count"),
+                UserRating.avg_rating,
             )
-            .group_by(UserReview.reviewee_id)
-            .subquery()
+            .outerjoin(
+                Address, and_(Address.user_id == User.id, Address.is_primary.is_(True))
+            )
+            .outerjoin(UserRating, UserRating.user_id == User.id)
+            .limit(1)
+        )
+
+    async def _get_profile_summary(self, condition) -> ProfileSummary:
+        result = await self.session.execute(
+            self._get_profile_summary_query().where(condition)
         )
+        row = result.one_or_none()
+        if row is None:
+            raise UserNotFound("User not found in the database.")
+
+        return ProfileSummary(*row)
+
+    async def get_profile_summary(self, user_id: int) -> ProfileSummary:
+        """
+        Returns the profile data of a user in a single round trip.
+
+        :raises UserNotFound: If the user does not exist.
+        """
+        return await self._get_profile_summary(User.id == user_id)
+
+    async def get_current_user_profile_summary(self) -> ProfileSummary:
+        """
+        Returns the profile data of the current user in a single round trip.
+
+        :raises UserEmailNotFound: If the email is missing in the request metadata.
+        :raises UserNotFound: If the user does not exist.
+        """
+        email = self.user_metadata.get("email")
+        if not email:
+            raise UserEmailNotFound("User email not found in metadata.")
+        return await self._get_profile_summary(User.email == email)
+
+    @classmethod
+    def get_seller_rating_subquery(cls):
+        """
+        Returns a subquery with the average rating of each seller.
+        Ratings are read from the userRatings aggregate, which is updated whenever
+        a UserReview is written, so no aggregation over userReviews is needed.
+        """
+        rating_subquery = select(
+            UserRating.user_id.label("seller_id"),
+            UserRating.avg_rating.label("avg_rating"),
+        ).subquery()
         return rating_subquery
 
     @classmethod
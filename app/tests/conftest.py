@@ -1,15 +1,22 @@
 import os
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, List
 
 os.environ["TESTING"] = "1"
+# tests never reach the real Firebase services
+os.environ.setdefault("FIREBASE_PROVIDER", "fake")
 
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import StaticPool
+from sqlalchemy import StaticPool, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
 
 from app.api.dependencies import get_async_session, get_user
 from app.api.main import app
+from app.services.category.category_registry import category_registry
+from app.services.user.identity_cache import identity_cache
 
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(
@@ -40,6 +47,9 @@ app.dependency_overrides[get_user] = override_get_user
 async def prepare_database():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    # every test module starts with an empty database
+    category_registry.invalidate()
+    identity_cache.clear()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.drop_all)
@@ -53,3 +63,45 @@ async def async_client() -> AsyncClient:
         transport=ASGITransport(app=app), base_url="http://test", headers=headers
     ) as client:
         yield client
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """Collects the statements run on the test engine inside the block."""
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", record)
+
+
+@pytest.fixture()
+def query_budget() -> Callable[[int], ContextManager[List[str]]]:
+    """
+    Fails the test when the block runs more than `max_queries` statements,
+    listing all of them:
+
+        with query_budget(3):
+            await async_client.get("/listings/")
+    """
+
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[List[str]]:
+        with count_queries() as statements:
+            yield statements
+        if len(statements) > max_queries:
+            listed = "\n\n".join(
+                f"{i}. {statement}" for i, statement in enumerate(statements, 1)
+            )
+            pytest.fail(
+                f"{len(statements)} queries run, the budget is {max_queries}:"
+                f"\n\n{listed}",
+                pytrace=False,
+            )
+
+    return budget
@@ -0,0 +1,159 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+from app.models.address_model import Address
+from app.models.category_model import Category
+from app.models.enums.listing_status import ListingStatus
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.schedulers.alert_matcher import (
+    ListingCandidate,
+    find_matching_listings,
+    listing_matches_filters,
+)
+from app.models.user_search_alert_model import UserSearchAlert
+from app.schedulers import run_user_searches
+from app.schedulers.run_user_searches import (
+    get_listing_candidates,
+    notify_user_search_alerts,
+)
+from app.services.notifications.dispatcher import NotificationDispatcher
+from app.services.notifications.senders import FakeSender
+from app.tests.conftest import TestSessionLocal
+
+NOW = datetime(2025, 5, 1, 12, 0, 0, tzinfo=UTC)
+
+
+def make_candidate(**kwargs) -> ListingCandidate:
+    data = dict(
+        id=1,
+        title="Bicykel Author",
+        description="Horsky bicykel",
+        price=Decimal("250.00"),
+        offer_type=OfferType.BUY,
+        listing_status=ListingStatus.ACTIVE,
+        created_at=NOW,
+        seller_rating=Decimal("4.50"),
+        category_ids={2},
+        country="SK",
+        city="Bratislava",
+        street="Hlavna 1",
+    )
+    data.update(kwargs)
+    return ListingCandidate(**data)
+
+
+@pytest.mark.parametrize(
+    "product_filters,expected",
+    [
+        ({}, True),
+        ({"search": "bicykel"}, True),
+        ({"search": "auto"}, False),
+        ({"category_ids": [1, 2]}, True),
+        ({"category_ids": [3]}, False),
+        ({"category_ids": []}, True),
+        ({"offer_type": "buy"}, True),
+        ({"offer_type": "rent"}, False),
+        ({"min_price": 100, "max_price": 300}, True),
+        ({"max_price": 200}, False),
+        ({"min_rating": 4}, True),
+        ({"min_rating": 4.6}, False),
+        ({"country": "SK", "city": "Bratislava"}, True),
+        ({"city": "Kosice"}, False),
+        ({"sort_by": "price", "sort_order": "asc"}, True),
+    ],
+)
+def test_listing_matches_filters(product_filters: dict, expected: bool):
+    since = NOW - timedelta(minutes=2)
+    assert listing_matches_filters(make_candidate(), product_filters, since) is expected
+
+
+def test_only_listings_created_since_last_notification_match():
+    listings = [
+        make_candidate(id=1, created_at=NOW - timedelta(minutes=5)),
+        # same second as the last notification still counts
+        make_candidate(id=2, created_at=NOW.replace(microsecond=100)),
+        make_candidate(id=3, created_at=NOW + timedelta(minutes=1)),
+    ]
+
+    matching = find_matching_listings(listings, {}, NOW.replace(microsecond=900))
+
+    assert [listing.id for listing in matching] == [2, 3]
+
+
+seller = User(firstname="Test", lastname="Seller", email="test@example.com")
+category = Category(name="Bicykle")
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        address = Address(is_primary=True, postal_code="81101", city="Bratislava")
+        seller.addresses = [address]
+        session.add_all([seller, category])
+        await session.commit()
+
+        for i, listing_status in enumerate(
+            [ListingStatus.ACTIVE, ListingStatus.ACTIVE, ListingStatus.SOLD]
+        ):
+            session.add(
+                Listing(
+                    title=f"Bicykel {i}",
+                    description="Alert test listing",
+                    price=Decimal(100),
+                    offer_type=OfferType.BUY,
+                    listing_status=listing_status,
+                    seller_id=seller.id,
+                    address_id=address.id,
+                    categories=[category] if i == 0 else [],
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_listing_candidates():
+    async with TestSessionLocal() as session:
+        candidates = await get_listing_candidates(
+            session, datetime.now(UTC) - timedelta(hours=1)
+        )
+
+    assert len(candidates) == 2
+    by_title = {candidate.title: candidate for candidate in candidates}
+    assert by_title["Bicykel 0"].category_ids == {category.id}
+    assert by_title["Bicykel 1"].category_ids == set()
+    assert by_title["Bicykel 0"].city == "Bratislava"
+
+
+@pytest.mark.asyncio
+async def test_alerts_without_matches_are_advanced(monkeypatch):
+    last_notified_at = datetime.now(UTC) - timedelta(hours=3)
+    async with TestSessionLocal() as session:
+        alerts = [
+            UserSearchAlert(
+                user_id=seller.id,
+                product_filters=product_filters,
+                last_notified_at=last_notified_at,
+            )
+            for product_filters in ({"search": "auto"}, {"search": "bicykel"})
+        ]
+        session.add_all(alerts)
+        await session.commit()
+        alert_ids = [alert.id for alert in alerts]
+
+    monkeypatch.setattr(run_user_searches, "async_session", TestSessionLocal)
+    sender = FakeSender()
+    await notify_user_search_alerts(NotificationDispatcher(sender))
+
+    async with TestSessionLocal() as session:
+        without_matches, with_matches = [
+            await session.get(UserSearchAlert, alert_id) for alert_id in alert_ids
+        ]
+    # the seller has no device tokens, the notification is not sent
+    assert len(sender.sent) == 0
+    assert without_matches.last_notified_at > last_notified_at.replace(tzinfo=None)
+    assert with_matches.last_notified_at > last_notified_at.replace(tzinfo=None)
@@ -0,0 +1,46 @@
+import pytest
+
+from app.benchmarks.hot_paths import Benchmark, compare_results
+
+
+def test_compare_results():
+    baseline = {
+        "slower": {"median_us": 100.0},
+        "faster": {"median_us": 100.0},
+        "same": {"median_us": 100.0},
+    }
+    results = {
+        "slower": {"median_us": 130.0},
+        "faster": {"median_us": 70.0},
+        "same": {"median_us": 110.0},
+        "added": {"median_us": 5.0},
+    }
+
+    comparison = {
+        row["name"]: row["status"]
+        for row in compare_results(results, baseline, threshold=0.2)
+    }
+
+    assert comparison == {
+        "slower": "regression",
+        "faster": "improvement",
+        "same": "unchanged",
+        "added": "new",
+    }
+
+
+@pytest.mark.asyncio
+async def test_benchmark_records_per_call_timings():
+    benchmark = Benchmark(repeat=3, min_sample_time=0.001)
+    calls = []
+
+    async def noop():
+        calls.append(1)
+
+    benchmark.run("sum", lambda: sum(range(100)))
+    await benchmark.run_async("noop", noop)
+
+    for result in benchmark.results.values():
+        assert result["min_us"] <= result["median_us"] <= result["p95_us"]
+        assert result["calls_per_sample"] >= 1
+    assert len(calls) >= 3 * benchmark.results["noop"]["calls_per_sample"]
@@ -0,0 +1,101 @@
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.category_model import Category
+from app.models.user_model import User
+from app.services.category.category_registry import (
+    CategoryRegistry,
+    category_registry,
+)
+from app.services.category.exceptions import CategoryNotFound
+from app.tests.conftest import TestSessionLocal
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="User", email="test@example.com")
+        session.add_all([user, Category(name="Bicykle"), Category(name="Elektronika")])
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_categories_are_served_from_registry(async_client: AsyncClient):
+    response = await async_client.get("/categories/")
+    assert response.status_code == status.HTTP_200_OK
+    assert [category["name"] for category in response.json()] == [
+        "Bicykle",
+        "Elektronika",
+    ]
+    loads = category_registry.loads
+
+    etag = response.headers["ETag"]
+    response = await async_client.get("/categories/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert category_registry.loads == loads
+
+
+@pytest.mark.asyncio
+async def test_registry_reloads_after_category_change(async_client: AsyncClient):
+    etag = (await async_client.get("/categories/")).headers["ETag"]
+
+    async with TestSessionLocal() as session:
+        session.add(Category(name="Nábytok"))
+        await session.commit()
+
+    response = await async_client.get("/categories/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert "Nábytok" in [category["name"] for category in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_unknown_category_is_rejected():
+    async with TestSessionLocal() as session:
+        await category_registry.validate_ids(session, [1, 2])
+        with pytest.raises(CategoryNotFound, match="Category with ID 999 not found."):
+            await category_registry.validate_ids(session, [1, 999])
+
+
+@pytest.mark.asyncio
+async def test_registry_expires_after_ttl():
+    now = [0.0]
+    registry = CategoryRegistry(ttl=60, clock=lambda: now[0])
+    async with TestSessionLocal() as session:
+        await registry.validate_ids(session, [1])
+        now[0] = 59
+        await registry.validate_ids(session, [2])
+        assert registry.loads == 1
+        now[0] = 60
+        await registry.validate_ids(session, [1])
+        assert registry.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_category_reloads_once_per_interval():
+    now = [0.0]
+    registry = CategoryRegistry(ttl=300, miss_reload_interval=5, clock=lambda: now[0])
+    async with TestSessionLocal() as session:
+        await registry.validate_ids(session, [1])
+
+        # created by another process, this one has no reason to reload
+        category = Category(name="Záhrada")
+        session.add(category)
+        await session.commit()
+        assert registry.loads == 1
+
+        # too soon after the load, the ID is rejected without a query
+        with pytest.raises(CategoryNotFound):
+            await registry.validate_ids(session, [category.id])
+        assert registry.loads == 1
+
+        now[0] = 5
+        await registry.validate_ids(session, [category.id])
+        assert registry.loads == 2
+
+        now[0] = 6
+        with pytest.raises(CategoryNotFound):
+            await registry.validate_ids(session, [999])
+        assert registry.loads == 2
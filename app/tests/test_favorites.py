@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.address_model import Address
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal
+
+listing_ids: list[int] = []
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="User", email="test@example.com")
+        seller = User(firstname="Other", lastname="Seller", email="seller@example.com")
+        address = Address(is_primary=True, postal_code="81101", country="SK")
+        seller.addresses = [address]
+        session.add_all([user, seller])
+        await session.commit()
+
+        for i in range(3):
+            listing = Listing(
+                title=f"Favorite {i}",
+                description="Favorites test listing",
+                price=Decimal(10),
+                offer_type=OfferType.BUY,
+                seller_id=seller.id,
+                address_id=address.id,
+            )
+            session.add(listing)
+            await session.commit()
+            listing_ids.append(listing.id)
+
+
+async def liked_in_search(async_client: AsyncClient) -> dict[int, bool]:
+    response = await async_client.get("/listings/", params={"offer_type": "buy"})
+    assert response.status_code == status.HTTP_200_OK
+    return {listing["id"]: listing["liked"] for listing in response.json()}
+
+
+@pytest.mark.asyncio
+async def test_favorite_flow(async_client: AsyncClient):
+    liked_id = listing_ids[1]
+
+    response = await async_client.put(f"/listings/{liked_id}/favorite")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["liked"] is True
+
+    response = await async_client.put(f"/listings/{liked_id}/favorite")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    assert await liked_in_search(async_client) == {
+        listing_id: listing_id == liked_id for listing_id in listing_ids
+    }
+    response = await async_client.get(f"/listings/{liked_id}")
+    assert response.json()["liked"] is True
+    response = await async_client.get("/listings/favorites/my")
+    assert [listing["id"] for listing in response.json()] == [liked_id]
+
+    response = await async_client.delete(f"/listings/{liked_id}/favorite")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["liked"] is False
+
+    response = await async_client.delete(f"/listings/{liked_id}/favorite")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not any((await liked_in_search(async_client)).values())
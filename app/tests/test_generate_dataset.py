@@ -0,0 +1,75 @@
+import random
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import FavoriteListing, Listing, User, UserRating, UserReview
+from app.seeders.generate_dataset import (
+    DatasetConfig,
+    generate_dataset,
+    generate_listings,
+    zipf_cum_weights,
+)
+from app.tests.conftest import TestSessionLocal, engine
+
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def test_same_seed_generates_same_rows():
+    def listings(seed: int) -> list[dict]:
+        return list(
+            generate_listings(
+                random.Random(seed),
+                first_id=1,
+                count=20,
+                user_ids=range(1, 11),
+                first_address_id=1,
+                seller_cum_weights=zipf_cum_weights(10, 1.1),
+                now=NOW,
+            )
+        )
+
+    assert listings(7) == listings(7)
+    assert listings(7) != listings(8)
+
+
+@pytest.mark.asyncio
+async def test_generate_dataset():
+    config = DatasetConfig(
+        users=50, listings=400, batch_size=64, first_user_email="test@example.com"
+    )
+    counts = await generate_dataset(engine, config)
+
+    assert counts["users"] == 50
+    assert counts["listings"] == 400
+    assert counts["userReviews"] == 100
+
+    async with TestSessionLocal() as session:
+        first_user = await session.scalar(select(User).order_by(User.id).limit(1))
+        assert first_user.email == "test@example.com"
+
+        # the rating aggregate matches the generated reviews
+        reviews = await session.execute(
+            select(UserReview.reviewee_id, func.count()).group_by(
+                UserReview.reviewee_id
+            )
+        )
+        ratings = await session.execute(
+            select(UserRating.user_id, UserRating.rating_count)
+        )
+        assert dict(reviews.all()) == dict(ratings.all())
+
+        # power sellers have many more listings than the median seller
+        per_seller = sorted(
+            (
+                await session.execute(
+                    select(func.count(Listing.id)).group_by(Listing.seller_id)
+                )
+            ).scalars(),
+            reverse=True,
+        )
+        assert per_seller[0] > 5 * per_seller[len(per_seller) // 2]
+
+        favorites = await session.scalar(select(func.count(FavoriteListing.user_id)))
+        assert favorites == counts["favoriteListings"]
@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.address_model import Address
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.services.listing.geo import BoundingBox, get_bounding_boxes
+from app.tests.conftest import TestSessionLocal
+
+# Bratislava, Vienna (~55 km) and Kosice (~315 km)
+CITIES = {
+    "Bratislava": (48.1486, 17.1077),
+    "Vienna": (48.2082, 16.3738),
+    "Kosice": (48.7164, 21.2611),
+}
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="Seller", email="test@example.com")
+        session.add(user)
+        await session.commit()
+
+        for city, (latitude, longitude) in CITIES.items():
+            address = Address(
+                postal_code="00000",
+                city=city,
+                latitude=latitude,
+                longitude=longitude,
+                user_id=user.id,
+            )
+            session.add(address)
+            await session.commit()
+            session.add(
+                Listing(
+                    title=city,
+                    description="Geo test listing",
+                    price=Decimal(10),
+                    offer_type=OfferType.BUY,
+                    seller_id=user.id,
+                    address_id=address.id,
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "max_distance,expected",
+    [(10, ["Bratislava"]), (100, ["Bratislava", "Vienna"]), (1000, list(CITIES))],
+)
+async def test_max_distance(async_client: AsyncClient, max_distance, expected):
+    latitude, longitude = CITIES["Bratislava"]
+    response = await async_client.get(
+        "/listings/",
+        params={
+            "offer_type": "buy",
+            "user_latitude": latitude,
+            "user_longitude": longitude,
+            "max_distance": max_distance,
+            "sort_by": "location",
+            "sort_order": "asc",
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [listing["title"] for listing in response.json()] == expected
+
+
+def test_bounding_box_contains_radius():
+    [box] = get_bounding_boxes(48.0, 17.0, 111.195)  # one degree of latitude
+    assert box.min_lat == pytest.approx(47.0)
+    assert box.max_lat == pytest.approx(49.0)
+    # a degree of longitude is shorter away from the equator
+    assert box.max_lng - 17.0 > 1.0
+
+
+def test_bounding_box_across_antimeridian():
+    boxes = get_bounding_boxes(0.0, 179.5, 111.195)
+    assert boxes == [
+        BoundingBox(pytest.approx(-1.0), pytest.approx(1.0), pytest.approx(178.5), 180),
+        BoundingBox(
+            pytest.approx(-1.0), pytest.approx(1.0), -180, pytest.approx(-179.5)
+        ),
+    ]
+
+
+def test_bounding_box_around_pole():
+    [box] = get_bounding_boxes(89.5, 0.0, 111.195)
+    assert (box.min_lng, box.max_lng, box.max_lat) == (-180, 180, 90)
@@ -0,0 +1,79 @@
+import pytest
+import pytest_asyncio
+from sqlmodel import select
+
+from app.models.user_model import User
+from app.services.user.identity_cache import Identity, IdentityCache, identity_cache
+from app.tests.conftest import TestSessionLocal
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_identity(email: str) -> Identity:
+    return Identity(id=1, email=email, firstname="A", lastname="B", phone_number=None)
+
+
+def test_identity_expires_after_ttl():
+    clock = FakeClock()
+    cache = IdentityCache(ttl=60, clock=clock)
+    cache.set(make_identity("a@example.com"))
+
+    clock.now = 59
+    assert cache.get("a@example.com") is not None
+    clock.now = 60
+    assert cache.get("a@example.com") is None
+
+
+def test_cache_size_is_bounded():
+    cache = IdentityCache(max_size=2, clock=FakeClock())
+    for email in ("a", "b", "c"):
+        cache.set(make_identity(email))
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 2
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        session.add(User(firstname="Test", lastname="User", email="test@example.com"))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_committed_user_change_invalidates_identity():
+    async with TestSessionLocal() as session:
+        user = (
+            await session.execute(select(User).where(User.email == "test@example.com"))
+        ).scalar_one()
+        identity_cache.set(
+            Identity(user.id, user.email, user.firstname, user.lastname, None)
+        )
+
+        user.firstname = "Renamed"
+        await session.flush()
+        # not committed yet, the cached identity is still valid for other requests
+        assert identity_cache.get("test@example.com") is not None
+
+        await session.commit()
+        assert identity_cache.get("test@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_change_keeps_identity():
+    identity_cache.set(make_identity("test@example.com"))
+    async with TestSessionLocal() as session:
+        user = (
+            await session.execute(select(User).where(User.email == "test@example.com"))
+        ).scalar_one()
+        user.lastname = "Changed"
+        await session.flush()
+        await session.rollback()
+
+    assert identity_cache.get("test@example.com") is not None
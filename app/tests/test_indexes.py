@@ -0,0 +1,39 @@
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+from sqlmodel import SQLModel
+
+import app.models  # noqa: F401 registers every table in the metadata
+from app.db.index_audit import find_unindexed_foreign_keys
+
+
+def test_every_foreign_key_is_indexed():
+    assert find_unindexed_foreign_keys(SQLModel.metadata) == []
+
+
+def test_hot_filter_columns_have_composite_indexes():
+    indexes = {
+        index.name: [column.name for column in index.columns]
+        for table in SQLModel.metadata.tables.values()
+        for index in table.indexes
+    }
+    assert indexes["ix_listings_listing_status_created_at"] == [
+        "listing_status",
+        "created_at",
+    ]
+    assert indexes["ix_listings_created_at_id"] == ["created_at", "id"]
+    assert indexes["ix_listings_price_id"] == ["price", "id"]
+    assert indexes["ix_userSearchAlerts_is_active_last_notified_at"] == [
+        "is_active",
+        "last_notified_at",
+    ]
+
+
+def test_unindexed_foreign_key_is_reported():
+    metadata = MetaData()
+    Table("parents", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "children",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", ForeignKey("parents.id")),
+    )
+    assert find_unindexed_foreign_keys(metadata) == ["children(parent_id)"]
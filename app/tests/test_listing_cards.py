@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import false
+from sqlalchemy.dialects import postgresql
+
+from app.models.address_model import Address
+from app.models.category_model import Category
+from app.models.enums.offer_type import OfferType
+from app.models.listing_image import ListingImage
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.models.user_review_model import UserReview
+from app.services.listing.cards import build_card_details, get_card_query
+from app.tests.conftest import TestSessionLocal
+
+listing_ids: list[int] = []
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        seller = User(firstname="Card", lastname="Seller", email="seller@example.com")
+        reviewer = User(firstname="Test", lastname="User", email="test@example.com")
+        address = Address(is_primary=True, postal_code="81101", city="Bratislava")
+        seller.addresses = [address]
+        categories = [Category(name="Bicykle"), Category(name="Sport")]
+        session.add_all([seller, reviewer, *categories])
+        await session.commit()
+
+        session.add(
+            UserReview(
+                text="Great", rating=4, reviewer_id=reviewer.id, reviewee_id=seller.id
+            )
+        )
+        with_relations = Listing(
+            title="Bicykel",
+            description="Card test listing",
+            price=Decimal(100),
+            offer_type=OfferType.BUY,
+            seller_id=seller.id,
+            address_id=address.id,
+            categories=categories,
+            images=[ListingImage(path="a.jpg"), ListingImage(path="b.jpg")],
+        )
+        without_relations = Listing(
+            title="Stan",
+            description="Card test listing",
+            price=Decimal(50),
+            offer_type=OfferType.BUY,
+            seller_id=seller.id,
+            address_id=address.id,
+        )
+        session.add_all([with_relations, without_relations])
+        await session.commit()
+        listing_ids.extend([with_relations.id, without_relations.id])
+
+
+@pytest.mark.asyncio
+async def test_card_query_returns_whole_card_in_one_row():
+    async with TestSessionLocal() as session:
+        result = await session.execute(
+            get_card_query(false().label("liked")).order_by(Listing.id)
+        )
+        rows = result.all()
+
+    full, empty = rows
+    assert sorted(full.category_ids) == [1, 2]
+    assert full.image_paths == ["a.jpg", "b.jpg"]
+    assert (empty.category_ids, empty.image_paths) == ([], [])
+
+    card = build_card_details(full, image_urls=["signed-a", "signed-b"])
+    assert card.seller.firstname == "Card"
+    assert card.seller.rating == 4
+    assert card.address.city == "Bratislava"
+    assert card.image_paths == ["signed-a", "signed-b"]
+
+
+def test_postgres_aggregates_with_json_agg():
+    sql = str(
+        get_card_query(false().label("liked")).compile(dialect=postgresql.dialect())
+    )
+    assert "json_agg(" in sql
+    assert "'[]'::json" in sql
@@ -0,0 +1,115 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.address_model import Address
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal
+
+NUM_LISTINGS = 7
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="Seller", email="test@example.com")
+        address = Address(is_primary=True, postal_code="81101", country="SK")
+        user.addresses = [address]
+        session.add(user)
+        await session.commit()
+
+        # two listings share every price, so the id has to break the ties
+        for i in range(NUM_LISTINGS):
+            session.add(
+                Listing(
+                    title=f"Listing {i}",
+                    description="Pagination test listing",
+                    price=Decimal(10 * (i // 2)),
+                    offer_type=OfferType.BUY,
+                    seller_id=user.id,
+                    address_id=address.id,
+                )
+            )
+        await session.commit()
+
+
+async def collect_pages(async_client: AsyncClient, params: dict) -> list[dict]:
+    pages = []
+    cursor = None
+    while True:
+        page_params = dict(params, limit=3)
+        if cursor:
+            page_params["cursor"] = cursor
+        response = await async_client.get("/listings/", params=page_params)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort_by,sort_order",
+    [("price", "asc"), ("price", "desc"), ("created_at", "desc"), ("rating", "asc")],
+)
+async def test_cursor_pages_match_offset_order(
+    async_client: AsyncClient, sort_by: str, sort_order: str
+):
+    params = {"sort_by": sort_by, "sort_order": sort_order, "offer_type": "buy"}
+    response = await async_client.get(
+        "/listings/", params=dict(params, limit=NUM_LISTINGS)
+    )
+    expected_ids = [listing["id"] for listing in response.json()]
+
+    pages = await collect_pages(async_client, params)
+    cursor_ids = [listing["id"] for page in pages for listing in page]
+
+    assert cursor_ids == expected_ids
+    assert len(set(cursor_ids)) == NUM_LISTINGS
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(async_client: AsyncClient):
+    response = await async_client.get("/listings/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_different_sort(async_client: AsyncClient):
+    response = await async_client.get(
+        "/listings/", params={"sort_by": "price", "offer_type": "buy", "limit": 3}
+    )
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/listings/",
+        params={"sort_by": "created_at", "offer_type": "buy", "cursor": cursor},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_different_coordinates(async_client: AsyncClient):
+    params = {"sort_by": "location", "sort_order": "asc", "offer_type": "buy"}
+    coordinates = {"user_latitude": 48.14, "user_longitude": 17.1}
+    response = await async_client.get(
+        "/listings/", params=dict(params, limit=3, **coordinates)
+    )
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/listings/", params=dict(params, cursor=cursor, **coordinates)
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    moved = {"user_latitude": 49.0, "user_longitude": 17.1}
+    response = await async_client.get(
+        "/listings/", params=dict(params, cursor=cursor, **moved)
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.models.address_model import Address
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.services.listing.search import get_relevance_expr, get_search_pattern
+from app.tests.conftest import TestSessionLocal
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="Seller", email="test@example.com")
+        address = Address(is_primary=True, postal_code="81101", country="SK")
+        user.addresses = [address]
+        session.add(user)
+        await session.commit()
+
+        for title, description in [
+            ("Horsky bicykel", "Takmer novy"),
+            ("Kolobezka", "Vymenim za bicykel"),
+            ("Stan", "100% vodotesny"),
+        ]:
+            session.add(
+                Listing(
+                    title=title,
+                    description=description,
+                    price=Decimal(100),
+                    offer_type=OfferType.BUY,
+                    seller_id=user.id,
+                    address_id=address.id,
+                )
+            )
+        await session.commit()
+
+
+async def search(async_client: AsyncClient, **params) -> list[str]:
+    response = await async_client.get(
+        "/listings/", params=dict(params, offer_type="buy")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return [listing["title"] for listing in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_search_matches_title_and_description(async_client: AsyncClient):
+    titles = await search(async_client, search="BICYKEL")
+    assert sorted(titles) == ["Horsky bicykel", "Kolobezka"]
+
+
+@pytest.mark.asyncio
+async def test_search_wildcards_are_literal(async_client: AsyncClient):
+    assert await search(async_client, search="100%") == ["Stan"]
+    assert await search(async_client, search="%") == ["Stan"]
+
+
+@pytest.mark.asyncio
+async def test_sort_by_relevance_ranks_title_matches_first(async_client: AsyncClient):
+    for sort_order, expected in [
+        ("desc", ["Horsky bicykel", "Kolobezka"]),
+        ("asc", ["Kolobezka", "Horsky bicykel"]),
+    ]:
+        titles = await search(
+            async_client, search="bicykel", sort_by="relevance", sort_order=sort_order
+        )
+        assert titles == expected
+
+
+@pytest.mark.asyncio
+async def test_sort_by_relevance_requires_search(async_client: AsyncClient):
+    response = await async_client.get("/listings/", params={"sort_by": "relevance"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_relevance_uses_trigram_similarity_on_postgres():
+    sql = str(get_relevance_expr("bike").compile(dialect=postgresql.dialect()))
+    assert "word_similarity" in sql
+
+
+def test_search_pattern_escapes_wildcards():
+    assert get_search_pattern("50%_off") == "%50\\%\\_off%"
@@ -0,0 +1,55 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.api.main import app
+from app.benchmarks.load_test import LoadTest, parse_mix, percentile, run_load
+from app.models.address_model import Address
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="User", email="test@example.com")
+        user.addresses = [Address(is_primary=True, postal_code="81101")]
+        session.add(user)
+        await session.commit()
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 99) == 3
+    assert percentile([], 50) == 0
+
+
+def test_parse_mix():
+    assert parse_mix("search=3,profile=1") == {"search": 3, "profile": 1}
+    with pytest.raises(Exception, match="Unknown scenario"):
+        parse_mix("checkout=1")
+
+
+@pytest.mark.asyncio
+async def test_run_load_reports_per_route():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        load_test = LoadTest(client, listing_ids=[], category_ids=[])
+        await run_load(
+            load_test,
+            {"profile": 1},
+            concurrency=2,
+            duration=10,
+            max_requests=6,
+            seed=1,
+        )
+
+    report = load_test.report(elapsed=1.0)
+    assert report["requests"] == 6
+    assert report["errors"] == 0
+    assert report["routes"]["GET /profile"]["requests"] == 6
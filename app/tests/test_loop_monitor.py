@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import Counter, Summary
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_stack():
+    lag = Summary("lag_seconds", "Lag.")
+    blocked = Counter("blocked_total", "Blocked.")
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1, lag=lag, blocked=blocked)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    # reported once, while the loop was still blocked
+    assert blocked.value() == 1
+    assert len(monitor.stalls) == 1
+    stall = monitor.stalls[0]
+    assert stall.duration >= 0.1
+    assert "in blocking_call" in stall.stack
+    assert "time.sleep(0.3)" in stall.stack
+    # the sample taken after the blocking call records the lag
+    assert lag.quantile(0.99) >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_is_not_reported():
+    blocked = Counter("blocked_total", "Blocked.")
+    monitor = LoopLagMonitor(
+        interval=0.01, threshold=0.1, lag=Summary("lag", "Lag."), blocked=blocked
+    )
+    monitor.start()
+    await asyncio.sleep(0.3)
+    await monitor.stop()
+
+    assert blocked.value() == 0
+    assert monitor.lag.quantile(0.5) < 0.1
@@ -0,0 +1,117 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.api.main import app
+from app.core.metrics import (
+    REQUEST_QUERIES,
+    Counter,
+    Histogram,
+    Metric,
+    Summary,
+    time_external_call,
+)
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        session.add(User(firstname="Test", lastname="User", email="test@example.com"))
+        await session.commit()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value, route="/a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="5"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 14.5',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_summary_renders_window_quantiles():
+    summary = Summary("lag_seconds", "Lag.", quantiles=(0.5, 0.9), window=4)
+    assert summary.samples() == ["lag_seconds_sum 0.0", "lag_seconds_count 0"]
+
+    for value in (10, 1, 2, 3, 4):
+        summary.observe(value)
+
+    # the first value has left the window, but is still in the sum and count
+    assert summary.render() == [
+        "# HELP lag_seconds Lag.",
+        "# TYPE lag_seconds summary",
+        'lag_seconds{quantile="0.5"} 2',
+        'lag_seconds{quantile="0.9"} 4',
+        "lag_seconds_sum 20.0",
+        "lag_seconds_count 5",
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("calls_total", "Calls.", ("name",))
+    counter.inc(name='say "hi"\n')
+
+    assert counter.samples() == ['calls_total{name="say \\"hi\\"\\n"} 1']
+
+
+def test_external_call_outcome():
+    histogram = Histogram("calls", "Calls.", ("service", "operation", "outcome"))
+
+    with pytest.raises(ValueError):
+        with time_external_call("storage", "sign_url", histogram=histogram):
+            raise ValueError()
+    with time_external_call("storage", "sign_url", histogram=histogram):
+        pass
+
+    labels = dict(service="storage", operation="sign_url")
+    assert histogram.count(outcome="error", **labels) == 1
+    assert histogram.count(outcome="success", **labels) == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client: AsyncClient):
+    labels = dict(method="GET", route="/listings/{listing_id}")
+    requests_before = REQUEST_QUERIES.count(**labels)
+
+    response = await async_client.get("/listings/123456")
+    assert response.status_code == 404
+    assert REQUEST_QUERIES.count(**labels) == requests_before + 1
+
+    # scraped without authentication
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/listings/{listing_id}",status="404"}'
+    ) in response.text
+    assert 'http_request_db_queries_bucket{method="GET",' in response.text
+    assert "db_pool_wait_seconds" in response.text
+
+    # paths that only start with /metrics are authenticated
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/metrics-private")
+    assert response.status_code == 401
+
+
+def test_metric_without_samples_cannot_be_created():
+    class Incomplete(Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Incomplete.")
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+from sqlmodel import select
+
+from app.models.firebase_cloud_token_model import FirebaseCloudToken
+from app.models.user_model import User
+from app.services.notifications.dispatcher import (
+    NotificationDispatcher,
+    delete_invalid_tokens,
+)
+from app.services.notifications.senders import FakeSender, PushNotification
+from app.tests.conftest import TestSessionLocal
+
+
+def make_notification(tokens: list[str]) -> PushNotification:
+    return PushNotification(
+        tokens=tokens, title="New Listings Alert", body="2 new listings", data={}
+    )
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_sent_in_batches():
+    sender = FakeSender()
+    dispatcher = NotificationDispatcher(sender, batch_size=500)
+    tokens = [f"token-{i}" for i in range(1_201)]
+
+    [result] = await dispatcher.dispatch([make_notification(tokens)])
+
+    assert sorted(len(sent.tokens) for sent in sender.sent) == [201, 500, 500]
+    assert result.success_count == 1_201
+    assert result.delivered
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    class CountingSender(FakeSender):
+        def send(self, notification):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                return super().send(notification)
+            finally:
+                with lock:
+                    active -= 1
+
+    dispatcher = NotificationDispatcher(CountingSender(latency=0.02), max_concurrency=2)
+    results = await dispatcher.dispatch(
+        [make_notification([f"token-{i}"]) for i in range(6)]
+    )
+
+    assert all(result.delivered for result in results)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_reported_and_pruned():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Token", lastname="Owner", email="tokens@example.com")
+        user.firebase_cloud_tokens = [
+            FirebaseCloudToken(token="valid"),
+            FirebaseCloudToken(token="stale"),
+        ]
+        session.add(user)
+        await session.commit()
+
+    dispatcher = NotificationDispatcher(FakeSender(invalid_tokens={"stale"}))
+    [result] = await dispatcher.dispatch([make_notification(["valid", "stale"])])
+
+    assert result.success_count == 1
+    assert result.invalid_tokens == ["stale"]
+
+    async with TestSessionLocal() as session:
+        await delete_invalid_tokens(session, result.invalid_tokens)
+        await session.commit()
+        tokens = (await session.execute(select(FirebaseCloudToken.token))).scalars()
+        assert list(tokens) == ["valid"]
+
+
+@pytest.mark.asyncio
+async def test_notification_without_tokens_is_not_delivered():
+    sender = FakeSender()
+    [result] = await NotificationDispatcher(sender).dispatch([make_notification([])])
+
+    assert not result.delivered
+    assert sender.sent == []
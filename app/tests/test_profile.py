@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.address_model import Address
+from app.models.enums.listing_status import ListingStatus
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+from app.models.rent_listing_model import RentListing
+from app.models.user_model import User
+from app.models.user_review_model import UserReview
+from app.tests.conftest import TestSessionLocal
+
+seller = User(firstname="Test", lastname="Seller", email="test@example.com")
+buyer = User(firstname="Test", lastname="Buyer", email="buyer@example.com")
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        address = Address(is_primary=True, postal_code="81101", city="Bratislava")
+        seller.addresses = [address]
+        session.add_all([seller, buyer])
+        await session.commit()
+
+        listings = [
+            Listing(
+                title=f"Listing {i}",
+                description="Profile test listing",
+                price=Decimal(100),
+                offer_type=OfferType.BOTH,
+                listing_status=listing_status,
+                seller_id=seller.id,
+                address_id=address.id,
+            )
+            for i, listing_status in enumerate(
+                [ListingStatus.SOLD, ListingStatus.SOLD, ListingStatus.RENTED]
+                + [ListingStatus.ACTIVE] * 2
+            )
+        ]
+        session.add_all(listings)
+        await session.flush()
+
+        session.add(
+            RentListing(
+                title=listings[2].title,
+                description=listings[2].description,
+                price=listings[2].price,
+                buyer_id=buyer.id,
+                listing_id=listings[2].id,
+                address_id=address.id,
+            )
+        )
+        session.add_all(
+            UserReview(
+                text="ok", rating=rating, reviewer_id=buyer.id, reviewee_id=seller.id
+            )
+            for rating in (5, 4)
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_profile(async_client: AsyncClient):
+    response = await async_client.get("/profile")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["id"] == seller.id
+    assert data["amount_sold_listing"] == 2
+    assert data["amount_rent_listing"] == 1
+    assert data["rating"] == 4.5
+    assert data["address"]["city"] == "Bratislava"
+
+
+@pytest.mark.asyncio
+async def test_get_user_profile(async_client: AsyncClient):
+    response = await async_client.get(f"/profile/{seller.id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["amount_sold_listing"] == 2
+    assert data["amount_rent_listing"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_missing_user_profile(async_client: AsyncClient):
+    response = await async_client.get("/profile/999")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.profiling import APP_DIR, RequestProfiler, categorize
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+def create_app(directory) -> FastAPI:
+    app = FastAPI()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> Item:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT :id, 'item'"), {"id": item_id})
+        row = result.one()
+        return Item.model_validate({"id": row[0], "name": row[1]})
+
+    app.middleware("http")(RequestProfiler(["admin@example.com"], str(directory)))
+
+    # stands in for authenticate_request
+    @app.middleware("http")
+    async def authenticate(request: Request, call_next):
+        request.state.user = {"email": request.headers["X-User"]}
+        return await call_next(request)
+
+    return app
+
+
+async def get(app: FastAPI, email: str, **headers):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get("/items/7", headers={"X-User": email, **headers})
+
+
+def test_categorize():
+    assert categorize("/lib/site-packages/sqlalchemy/sql/compiler.py") == (
+        "sqlalchemy_compile"
+    )
+    assert categorize("/lib/site-packages/sqlalchemy/engine/base.py") == (
+        "sqlalchemy_execute"
+    )
+    assert categorize("/lib/site-packages/asyncpg/connection.py") == (
+        "sqlalchemy_execute"
+    )
+    assert categorize("/lib/site-packages/sqlalchemy/orm/loading.py") == (
+        "sqlalchemy_orm"
+    )
+    assert categorize("/lib/site-packages/pydantic/main.py") == "pydantic"
+    assert categorize("/lib/site-packages/firebase_admin/auth.py") == "firebase"
+    assert categorize(f"{APP_DIR}/providers/fake.py") == "firebase"
+    assert categorize(f"{APP_DIR}/api/routes/listings/base.py") == "app"
+    assert categorize("/lib/site-packages/starlette/routing.py") == "other"
+
+
+@pytest.mark.asyncio
+async def test_allowlisted_request_is_profiled(tmp_path):
+    response = await get(
+        create_app(tmp_path), "admin@example.com", **{"X-Profile": "1"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": 7, "name": "item"}
+
+    profile_id = response.headers["X-Profile-Id"]
+    assert (tmp_path / f"{profile_id}.prof").exists()
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["route"] == "/items/{item_id}"
+    assert summary["status"] == 200
+    assert summary["wall_ms"] > 0
+    categories = summary["categories_ms"]
+    for category in ("sqlalchemy_compile", "sqlalchemy_execute", "pydantic", "app"):
+        assert categories[category] > 0
+    assert any("get_item" in f["function"] for f in summary["top_functions"])
+
+    timings = response.headers["Server-Timing"]
+    assert timings.startswith("total;dur=")
+    assert "sqlalchemy_execute;dur=" in timings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "email,headers",
+    [
+        ("admin@example.com", {}),
+        ("user@example.com", {"X-Profile": "1"}),
+    ],
+)
+async def test_other_requests_are_not_profiled(tmp_path, email: str, headers: dict):
+    response = await get(create_app(tmp_path), email, **headers)
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert "Server-Timing" not in response.headers
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from firebase_admin import auth
+
+from app.core.config import Settings
+from app.providers import create_providers
+from app.providers.exceptions import ProviderUnavailable
+from app.providers.fake import (
+    FakeAuthProvider,
+    FakeMessagingSender,
+    FakeStorageProvider,
+    FaultInjector,
+    load_or_create_key,
+)
+from app.services.notifications.senders import PushNotification
+
+KEY = load_or_create_key()
+
+
+def test_issued_token_is_verified():
+    provider = FakeAuthProvider(KEY)
+
+    claims = provider.verify_id_token(provider.issue_token("alice@example.com"))
+
+    assert claims["email"] == "alice@example.com"
+    assert claims["uid"] == "alice@example.com"
+
+
+def test_expired_and_foreign_tokens_are_rejected():
+    provider = FakeAuthProvider(KEY)
+    other = FakeAuthProvider(load_or_create_key())
+
+    expired = provider.issue_token("a@example.com", expires_in=timedelta(seconds=-1))
+    with pytest.raises(auth.ExpiredIdTokenError):
+        provider.verify_id_token(expired)
+    with pytest.raises(auth.InvalidIdTokenError):
+        provider.verify_id_token(other.issue_token("a@example.com"))
+
+
+def test_key_file_is_shared(tmp_path):
+    path = str(tmp_path / "key.pem")
+    issuer = FakeAuthProvider(load_or_create_key(path))
+    verifier = FakeAuthProvider(load_or_create_key(path))
+
+    assert verifier.verify_id_token(issuer.issue_token("a@example.com"))
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_storage(tmp_path, on_disk):
+    storage = FakeStorageProvider(KEY, directory=tmp_path if on_disk else None)
+    storage.put("listings/1/a b.jpg", b"image")
+
+    url = storage.sign_url("listings/1/a b.jpg", timedelta(minutes=5))
+    assert storage.verify_url(url) == "listings/1/a b.jpg"
+    assert storage.get("listings/1/a b.jpg") == b"image"
+    with pytest.raises(ValueError):
+        storage.verify_url(url.replace("listings/1", "listings/2"))
+
+    storage.delete("listings/1/a b.jpg")
+    storage.delete("listings/1/missing.jpg")
+    assert not storage.exists("listings/1/a b.jpg")
+
+
+def test_injected_failures_and_latency():
+    faults = FaultInjector(latency=0.01, error_rate=1.0)
+    sender = FakeMessagingSender(faults)
+
+    with pytest.raises(ProviderUnavailable):
+        sender.send(PushNotification(["token"], "title", "body", {}))
+
+    assert sender.sent == []
+    assert faults.failures["messaging.send"] == 1
+
+
+def test_error_rate_is_a_share_of_calls():
+    faults = FaultInjector(error_rate=0.25, seed=1)
+
+    for _ in range(1000):
+        try:
+            faults("auth.verify_id_token")
+        except ProviderUnavailable:
+            pass
+
+    assert 200 < faults.failures["auth.verify_id_token"] < 300
+
+
+def test_create_fake_providers():
+    settings = Settings(
+        db_user="x",
+        db_password="x",
+        db_name="x",
+        db_host="localhost",
+        db_port=5432,
+        firebase_provider="fake",
+        fake_firebase_latency=0.5,
+    )
+
+    providers = create_providers(settings)
+
+    assert isinstance(providers.auth, FakeAuthProvider)
+    assert isinstance(providers.storage, FakeStorageProvider)
+    assert providers.messaging.faults.latency == 0.5
+    assert providers.auth.faults is not providers.storage.faults
@@ -0,0 +1,128 @@
+"""
+Maximum number of SQL statements per route. Listing pages are loaded with a fixed
+number of queries, so the budgets hold for any page size.
+"""
+
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.models.address_model import Address
+from app.models.category_model import Category
+from app.models.enums.offer_type import OfferType
+from app.models.listing_image import ListingImage
+from app.models.listing_model import Listing
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal, engine
+
+NUM_LISTINGS = 30
+
+ids: dict[str, int] = {}
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        user = User(firstname="Test", lastname="User", email="test@example.com")
+        user.addresses = [Address(is_primary=True, postal_code="81101", country="SK")]
+        seller = User(firstname="Other", lastname="Seller", email="seller@example.com")
+        seller.addresses = [Address(is_primary=True, postal_code="04001", country="SK")]
+        categories = [Category(name=f"Category {i}") for i in range(3)]
+        session.add_all([user, seller, *categories])
+        await session.commit()
+
+        # every listing has several categories, images and favorites, the
+        # relations that would be loaded per listing
+        for i in range(NUM_LISTINGS):
+            owner = user if i % 3 == 0 else seller
+            listing = Listing(
+                title=f"Listing {i}",
+                description="Query budget test listing",
+                price=Decimal(i),
+                offer_type=OfferType.BUY,
+                seller_id=owner.id,
+                address_id=owner.addresses[0].id,
+                categories=categories[: 1 + i % 3],
+                images=[ListingImage(path=f"listings/{i}/{j}.jpg") for j in range(2)],
+            )
+            if i % 2 == 0:
+                listing.favorite_by = [user]
+            session.add(listing)
+        await session.commit()
+
+        ids["seller"] = seller.id
+        ids["listing"] = listing.id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, NUM_LISTINGS])
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"search": "listing", "sort_by": "price"},
+        {"sort_by": "rating", "sort_order": "desc"},
+        {"user_latitude": 48.14, "user_longitude": 17.1, "sort_by": "location"},
+    ],
+)
+async def test_listing_search(
+    async_client: AsyncClient, query_budget, params: dict, limit: int
+):
+    with query_budget(3):
+        response = await async_client.get(
+            "/listings/", params=dict(params, offer_type="buy", limit=limit)
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == limit
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path,max_queries",
+    [
+        ("/listings/my-listings?limit=100", 3),
+        ("/listings/favorites/my", 3),
+        ("/listings/favorites/my?user_latitude=48.14&user_longitude=17.1", 3),
+        ("/categories/", 2),
+        ("/profile", 4),
+    ],
+)
+async def test_route_budget(
+    async_client: AsyncClient, query_budget, path: str, max_queries: int
+):
+    with query_budget(max_queries):
+        response = await async_client.get(path)
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_listing_detail(async_client: AsyncClient, query_budget):
+    # the listing and one selectinload per relation, independent of their size
+    with query_budget(7):
+        response = await async_client.get(f"/listings/{ids['listing']}")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_seller_profile(async_client: AsyncClient, query_budget):
+    with query_budget(4):
+        response = await async_client.get(f"/profile/{ids['seller']}")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_budget_failure_lists_statements(query_budget):
+    with pytest.raises(pytest.fail.Exception) as excinfo:
+        with query_budget(1):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+
+    message = str(excinfo.value)
+    assert "2 queries run, the budget is 1" in message
+    assert "1. SELECT 1" in message
+    assert "2. SELECT 2" in message
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from app.services.listing.signed_url_cache import SignedUrlCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(max_size: int = 10) -> tuple[SignedUrlCache, FakeClock, list[str]]:
+    clock = FakeClock()
+    signed: list[str] = []
+
+    def signer(image_path: str, expiration: timedelta) -> str:
+        signed.append(image_path)
+        return f"https://storage.test/{image_path}?sig={len(signed)}"
+
+    cache = SignedUrlCache(
+        signer,
+        expiration=timedelta(minutes=60),
+        safety_margin=timedelta(minutes=5),
+        max_size=max_size,
+        clock=clock,
+    )
+    return cache, clock, signed
+
+
+def test_url_is_reused_until_safety_margin():
+    cache, clock, signed = make_cache()
+
+    first = cache.get("images/1.jpg")
+    clock.now = 54 * 60
+    assert cache.get("images/1.jpg") == first
+    assert signed == ["images/1.jpg"]
+
+    # 55 minutes in, the URL has less than the safety margin left
+    clock.now = 55 * 60
+    assert cache.get("images/1.jpg") != first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_path_is_evicted():
+    cache, _, signed = make_cache(max_size=2)
+
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")  # "b" is now the least recently used
+    cache.get("c")
+
+    assert cache.stats()["evictions"] == 1
+    cache.get("a")
+    cache.get("b")
+    assert signed == ["a", "b", "c", "b"]
+
+
+def test_invalidate_forces_new_signature():
+    cache, _, signed = make_cache()
+
+    cache.get("a")
+    cache.invalidate("a")
+    cache.get("a")
+
+    assert signed == ["a", "a"]
@@ -0,0 +1,123 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.slow_query_log import SlowQueryLog, redact
+from app.models.user_model import User
+from app.tests.conftest import TestSessionLocal, engine
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        session.add(User(firstname="Test", lastname="User", email="test@example.com"))
+        await session.commit()
+
+
+def read_entries(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_redact_keeps_only_values_without_personal_data():
+    parameters = (
+        "test@example.com",
+        48.14,
+        7,
+        None,
+        Decimal("10.5"),
+        date(2026, 1, 1),
+        [b"ab", True],
+    )
+    assert redact(parameters) == [
+        "<str len=16>",
+        "<float>",
+        7,
+        None,
+        Decimal("10.5"),
+        "2026-01-01",
+        ["<bytes len=2>", True],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_with_route(
+    async_client: AsyncClient, tmp_path
+):
+    path = tmp_path / "slow.log"
+    # the test engine shares one connection between all sessions, so plans are
+    # captured on a separate engine below
+    slow_query_log = SlowQueryLog(engine, threshold=0, path=str(path), explain=False)
+    slow_query_log.install()
+    try:
+        response = await async_client.get(
+            "/listings/", params={"offer_type": "buy", "search": "bicykel"}
+        )
+        assert response.status_code == 200
+    finally:
+        slow_query_log.remove()
+
+    entries = read_entries(path)
+    search_entries = [entry for entry in entries if entry["route"] == "/listings/"]
+    assert search_entries
+    entry = search_entries[0]
+    assert entry["statement"].lstrip().upper().startswith("SELECT")
+    assert entry["duration_ms"] >= 0
+    # the search pattern is redacted
+    assert "bicykel" not in json.dumps(entry["parameters"])
+    assert "plan" not in entry
+
+
+@pytest.mark.asyncio
+async def test_statements_are_explained_once_per_interval(tmp_path):
+    path = tmp_path / "slow.log"
+    local_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    slow_query_log = SlowQueryLog(local_engine, threshold=0, path=str(path))
+    slow_query_log.install()
+    async with local_engine.connect() as conn:
+        for _ in range(2):
+            await conn.execute(text("SELECT 1 AS answer"))
+        await conn.execute(text("WITH t AS (SELECT 2 AS answer) SELECT * FROM t"))
+        # the plan waits until the connection is returned to the pool
+        assert not slow_query_log._tasks
+    await slow_query_log.wait()
+    await local_engine.dispose()
+
+    entries = [e for e in read_entries(path) if "answer" in e["statement"]]
+    assert len(entries) == 3
+    # explained once, the WITH statement is not run again
+    explained = [entry["statement"] for entry in entries if "plan" in entry]
+    assert explained == ["SELECT 1 AS answer"]
+    assert all(entry["route"] == "background" for entry in entries)
+    # the EXPLAIN of the plan itself is not logged
+    assert not any(e["statement"].startswith("EXPLAIN") for e in entries)
+
+
+def test_explained_statements_are_bounded(tmp_path):
+    local_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    slow_query_log = SlowQueryLog(
+        local_engine, threshold=0, path=str(tmp_path / "slow.log"), max_explained=3
+    )
+    for i in range(10):
+        assert slow_query_log._should_explain(f"SELECT {i}")
+    assert len(slow_query_log._explained_at) == 3
+    assert not slow_query_log._should_explain("SELECT 9")
+    assert slow_query_log._should_explain("SELECT 0")
+
+
+@pytest.mark.asyncio
+async def test_fast_statements_are_not_logged(tmp_path):
+    path = tmp_path / "slow.log"
+    local_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    slow_query_log = SlowQueryLog(local_engine, threshold=60, path=str(path))
+    slow_query_log.install()
+    async with local_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await local_engine.dispose()
+
+    assert path.read_text() == ""
@@ -0,0 +1,36 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import InstrumentedQueuePool
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkouts():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert engine.pool.statistics()["checked_out"] == 1
+
+    stats = engine.pool.statistics()
+    await engine.dispose()
+
+    assert stats["checkout_count"] == 3
+    assert stats["checked_out"] == 0
+    assert stats["wait_time_max"] >= stats["wait_time_avg"] > 0
+
+
+@pytest.mark.asyncio
+async def test_get_pool_statistics(async_client: AsyncClient):
+    response = await async_client.get("/system/pool")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {"checked_out", "overflow", "wait_time_avg"} <= response.json().keys()
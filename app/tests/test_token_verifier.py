@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.api.token_verifier import TokenVerifier
+
+
+class FakeFirebase:
+    def __init__(self, expires_at: float = 1_000.0) -> None:
+        self.expires_at = expires_at
+        self.calls: list[str] = []
+        self.threads: set[str] = set()
+
+    def verify(self, token: str) -> dict:
+        self.calls.append(token)
+        self.threads.add(threading.current_thread().name)
+        if token == "invalid":
+            raise ValueError("Invalid token")
+        return {"email": f"{token}@example.com", "exp": self.expires_at}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_claims_are_cached_until_token_expires():
+    firebase, clock = FakeFirebase(expires_at=100.0), FakeClock()
+    verifier = TokenVerifier(firebase.verify, clock=clock)
+
+    assert (await verifier.verify("alice"))["email"] == "alice@example.com"
+    clock.now = 99.0
+    await verifier.verify("alice")
+    assert firebase.calls == ["alice"]
+
+    clock.now = 100.0
+    await verifier.verify("alice")
+    assert firebase.calls == ["alice", "alice"]
+
+
+@pytest.mark.asyncio
+async def test_verification_runs_off_the_event_loop():
+    firebase = FakeFirebase()
+    verifier = TokenVerifier(firebase.verify, clock=FakeClock())
+
+    await verifier.verify("alice")
+
+    assert all(name.startswith("token-verifier") for name in firebase.threads)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_verification():
+    firebase = FakeFirebase()
+    verifier = TokenVerifier(firebase.verify, clock=FakeClock())
+
+    results = await asyncio.gather(*[verifier.verify("alice") for _ in range(10)])
+
+    assert firebase.calls == ["alice"]
+    assert all(claims["email"] == "alice@example.com" for claims in results)
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_not_cached():
+    firebase = FakeFirebase()
+    verifier = TokenVerifier(firebase.verify, clock=FakeClock())
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await verifier.verify("invalid")
+
+    assert firebase.calls == ["invalid", "invalid"]
+
+
+@pytest.mark.asyncio
+async def test_cache_size_is_bounded():
+    firebase = FakeFirebase()
+    verifier = TokenVerifier(firebase.verify, max_size=2, clock=FakeClock())
+
+    for token in ("a", "b", "c", "a"):
+        await verifier.verify(token)
+
+    assert verifier.stats()["size"] == 2
+    assert firebase.calls == ["a", "b", "c", "a"]
@@ -0,0 +1,124 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.address_model import Address
+from app.models.enums.offer_type import OfferType
+from app.models.listing_model import Listing
+
+from app.models.user_model import User
+from app.models.user_rating_model import UserRating
+from app.models.user_review_model import UserReview
+from app.tests.conftest import TestSessionLocal
+
+reviewer = User(firstname="Test", lastname="Reviewer", email="test@example.com")
+seller = User(firstname="Test", lastname="Seller", email="seller@example.com")
+other_seller = User(firstname="Other", lastname="Seller", email="other@example.com")
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_data():
+    async with TestSessionLocal() as session:
+        session.add_all([reviewer, seller, other_seller])
+        await session.commit()
+
+
+async def get_user_rating(user_id: int) -> UserRating | None:
+    async with TestSessionLocal() as session:
+        return await session.get(UserRating, user_id)
+
+
+@pytest.mark.asyncio
+async def test_rating_aggregate_follows_reviews():
+    async with TestSessionLocal() as session:
+        reviews = [
+            UserReview(
+                text="ok", rating=rating, reviewer_id=reviewer.id, reviewee_id=seller.id
+            )
+            for rating in (5, 4, 4)
+        ]
+        session.add_all(reviews)
+        await session.commit()
+
+        rating = await get_user_rating(seller.id)
+        assert (rating.rating_sum, rating.rating_count) == (13, 3)
+        assert rating.avg_rating == Decimal("4.33")
+
+        # changing the rating updates the aggregate
+        reviews[0].rating = 2
+        await session.commit()
+        rating = await get_user_rating(seller.id)
+        assert (rating.rating_sum, rating.rating_count) == (10, 3)
+
+        # moving a review to another seller updates both aggregates
+        reviews[1].reviewee_id = other_seller.id
+        await session.commit()
+        rating = await get_user_rating(seller.id)
+        assert (rating.rating_sum, rating.rating_count) == (6, 2)
+        assert (await get_user_rating(other_seller.id)).avg_rating == Decimal("4.00")
+
+        # deleting the last reviews leaves an empty aggregate without an average
+        for review in (reviews[0], reviews[2]):
+            await session.delete(review)
+        await session.commit()
+        rating = await get_user_rating(seller.id)
+        assert (rating.rating_sum, rating.rating_count) == (0, 0)
+        assert rating.avg_rating is None
+
+
+@pytest.mark.asyncio
+async def test_rating_sort_orders_unrated_sellers_last(async_client: AsyncClient):
+    async with TestSessionLocal() as session:
+        sellers = {
+            rating: User(
+                firstname="Rated", lastname=str(rating), email=f"{rating}@ex.com"
+            )
+            for rating in (1, 5, None)
+        }
+        for seller_user in sellers.values():
+            seller_user.addresses = [Address(is_primary=True, postal_code="81101")]
+        session.add_all(sellers.values())
+        await session.commit()
+
+        for rating, seller_user in sellers.items():
+            session.add(
+                Listing(
+                    title=f"Rated {rating}",
+                    description="Rating sort test listing",
+                    price=Decimal(1),
+                    offer_type=OfferType.RENT,
+                    seller_id=seller_user.id,
+                    address_id=seller_user.addresses[0].id,
+                )
+            )
+            if rating is not None:
+                session.add(
+                    UserReview(
+                        text="ok",
+                        rating=rating,
+                        reviewer_id=reviewer.id,
+                        reviewee_id=seller_user.id,
+                    )
+                )
+        await session.commit()
+
+    titles = {}
+    for sort_order in ("asc", "desc"):
+        response = await async_client.get(
+            "/listings/",
+            params={
+                "sort_by": "rating",
+                "sort_order": sort_order,
+                "offer_type": "rent",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        titles[sort_order] = [listing["title"] for listing in response.json()]
+
+    assert titles == {
+        "asc": ["Rated 1", "Rated 5", "Rated None"],
+        "desc": ["Rated 5", "Rated 1", "Rated None"],
+    }
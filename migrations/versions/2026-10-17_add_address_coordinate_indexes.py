@@ -0,0 +1,29 @@
+"""add address coordinate indexes
+
+Revision ID: 4f8a0d2b6e91
+Revises: 9c2e41f7a8d3
+Create Date: 2026-10-17 12:26:09.573104
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8a0d2b6e91"
+down_revision: Union[str, None] = "9c2e41f7a8d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_addresses_latitude", "addresses", ["latitude"], unique=False)
+    op.create_index("ix_addresses_longitude", "addresses", ["longitude"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_addresses_longitude", table_name="addresses")
+    op.drop_index("ix_addresses_latitude", table_name="addresses")
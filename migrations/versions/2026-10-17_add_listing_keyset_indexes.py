@@ -0,0 +1,29 @@
+"""add listing keyset indexes
+
+Revision ID: 6d3f2a9c1e47
+Revises: b71c5e93d04a
+Create Date: 2026-10-17 16:12:05.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d3f2a9c1e47"
+down_revision: Union[str, None] = "b71c5e93d04a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_listings_created_at_id", "listings", ["created_at", "id"], unique=False
+    )
+    op.create_index("ix_listings_price_id", "listings", ["price", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_price_id", table_name="listings")
+    op.drop_index("ix_listings_created_at_id", table_name="listings")
@@ -0,0 +1,45 @@
+"""add listing search indexes
+
+Revision ID: 9c2e41f7a8d3
+Revises: 35079baefdfb
+Create Date: 2026-10-17 11:04:52.118930
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2e41f7a8d3"
+down_revision: Union[str, None] = "35079baefdfb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_listings_title_trgm",
+        "listings",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_listings_description_trgm",
+        "listings",
+        ["description"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_description_trgm", table_name="listings")
+    op.drop_index("ix_listings_title_trgm", table_name="listings")
+    # the extension is left installed, other objects may depend on it
@@ -0,0 +1,55 @@
+"""add user rating aggregate
+
+Revision ID: 35079baefdfb
+Revises: 5cacab102fa7
+Create Date: 2026-10-17 09:12:31.402211
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "35079baefdfb"
+down_revision: Union[str, None] = "5cacab102fa7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "userRatings",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Integer(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+        sa.Column("avg_rating", sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        op.f("ix_userRatings_avg_rating"),
+        "userRatings",
+        ["avg_rating"],
+        unique=False,
+    )
+
+    # backfill the aggregate from the existing reviews
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO "userRatings" (user_id, rating_sum, rating_count, avg_rating)
+            SELECT reviewee_id, SUM(rating), COUNT(*), ROUND(AVG(rating), 2)
+            FROM "userReviews"
+            WHERE reviewee_id IS NOT NULL
+            GROUP BY reviewee_id
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_userRatings_avg_rating"), table_name="userRatings")
+    op.drop_table("userRatings")
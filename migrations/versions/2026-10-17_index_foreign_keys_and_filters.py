@@ -0,0 +1,122 @@
+"""index foreign keys and filters
+
+Revision ID: b71c5e93d04a
+Revises: 4f8a0d2b6e91
+Create Date: 2026-10-17 13:48:37.660412
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71c5e93d04a"
+down_revision: Union[str, None] = "4f8a0d2b6e91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # foreign keys
+    op.create_index(
+        op.f("ix_addresses_user_id"), "addresses", ["user_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_firebaseCloudTokens_user_id"),
+        "firebaseCloudTokens",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_userReviews_reviewer_id"), "userReviews", ["reviewer_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_userReviews_reviewee_id"), "userReviews", ["reviewee_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_userSearchAlerts_user_id"),
+        "userSearchAlerts",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_listings_seller_id"), "listings", ["seller_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_listings_address_id"), "listings", ["address_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_categoriesListing_listing_id"),
+        "categoriesListing",
+        ["listing_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_favoriteListings_listing_id"),
+        "favoriteListings",
+        ["listing_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_listing_images_listing_id"),
+        "listing_images",
+        ["listing_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_rentListings_buyer_id"), "rentListings", ["buyer_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_rentListings_listing_id"), "rentListings", ["listing_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_rentListings_address_id"), "rentListings", ["address_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_saleListings_listing_id"), "saleListings", ["listing_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_saleListings_address_id"), "saleListings", ["address_id"], unique=False
+    )
+    op.create_index(
+        "ix_listings_listing_status_created_at",
+        "listings",
+        ["listing_status", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_userSearchAlerts_is_active_last_notified_at",
+        "userSearchAlerts",
+        ["is_active", "last_notified_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_userSearchAlerts_is_active_last_notified_at",
+        table_name="userSearchAlerts",
+    )
+    op.drop_index("ix_listings_listing_status_created_at", table_name="listings")
+    op.drop_index(op.f("ix_saleListings_address_id"), table_name="saleListings")
+    op.drop_index(op.f("ix_saleListings_listing_id"), table_name="saleListings")
+    op.drop_index(op.f("ix_rentListings_address_id"), table_name="rentListings")
+    op.drop_index(op.f("ix_rentListings_listing_id"), table_name="rentListings")
+    op.drop_index(op.f("ix_rentListings_buyer_id"), table_name="rentListings")
+    op.drop_index(op.f("ix_listing_images_listing_id"), table_name="listing_images")
+    op.drop_index(op.f("ix_favoriteListings_listing_id"), table_name="favoriteListings")
+    op.drop_index(
+        op.f("ix_categoriesListing_listing_id"), table_name="categoriesListing"
+    )
+    op.drop_index(op.f("ix_listings_address_id"), table_name="listings")
+    op.drop_index(op.f("ix_listings_seller_id"), table_name="listings")
+    op.drop_index(op.f("ix_userSearchAlerts_user_id"), table_name="userSearchAlerts")
+    op.drop_index(op.f("ix_userReviews_reviewee_id"), table_name="userReviews")
+    op.drop_index(op.f("ix_userReviews_reviewer_id"), table_name="userReviews")
+    op.drop_index(
+        op.f("ix_firebaseCloudTokens_user_id"), table_name="firebaseCloudTokens"
+    )
+    op.drop_index(op.f("ix_addresses_user_id"), table_name="addresses")